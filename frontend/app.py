@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import json
 import time
 
 # --- 1. Page Configuration ---
@@ -69,6 +70,21 @@ def display_metrics(container):
         m3.metric("Graph Hits", len(st.session_state.graph_context))
         m4.metric("Latency", st.session_state.last_latency)
 
+# --- 4b. Streaming Helpers ---
+def iter_sse_events(response):
+    event, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if not line:
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+
 # --- 5. Sidebar ---
 with st.sidebar:
     st.image("https://cdn-icons-png.flaticon.com/512/2103/2103633.png", width=80)
@@ -149,15 +165,34 @@ if prompt := st.chat_input(f"Mode: {st.session_state.active_mode} | Type your qu
 
                 else: # Answer Mode
                     payload = {"text": prompt, "limit": top_k}
-                    response = requests.post("http://fastapi:8001/api/v1/index/answer", json=payload, timeout=60)
-                    result = response.json()
-                    
-                    is_cached = result.get("signal") == "cache_answer_success"
-                    answer = result.get("answer_from_cache" if is_cached else "answer", "No answer found")
+                    with requests.post("http://fastapi:8001/api/v1/index/answer/stream", json=payload, stream=True, timeout=(10, 120)) as response:
+                        response.encoding = "utf-8"
+                        events = iter_sse_events(response)
+                        metadata = {}
+
+                        def stream_tokens():
+                            for event, data in events:
+                                if event == "metadata":
+                                    metadata.update(data)
+                                    if data.get("from_cache"):
+                                        st.caption("⚡ *Retrieved from Cache*")
+                                    status.update(label="Generating answer...")
+                                elif event == "token":
+                                    yield data.get("text", "")
+                                elif event == "error":
+                                    metadata["error"] = data.get("signal")
+
+                        answer = st.write_stream(stream_tokens()) or "No answer found"
+
+                    results = metadata.get("results", [])
+                    if results:
+                        st.session_state.graph_context = results
                     
-                    status.update(label="Answer Ready!", state="complete", expanded=False)
-                    if is_cached: st.caption("⚡ *Retrieved from Cache*")
-                    st.markdown(answer)
+                    if metadata.get("error"):
+                        status.update(label="Error", state="error", expanded=False)
+                        st.error(f"The answer could not be completed: {metadata['error']}")
+                    else:
+                        status.update(label="Answer Ready!", state="complete", expanded=False)
                     st.session_state.messages.append({"role": "assistant", "content": answer})
 
                 # Post-Process: Update metrics
@@ -0,0 +1,186 @@
+"""Benchmark dense collection storage options against a Qdrant server.
+
+    python -m benchmarks.quantization --url http://localhost:6333 --points 20000 --dimension 768
+
+Each configuration is built with the same QdrantDBProvider settings the API
+uses. The report shows the estimated vector memory, search latency and
+recall@k against exact brute-force search.
+"""
+from stores.vectordb.providers.QdrantDBProvider import QdrantDBProvider
+from stores.vectordb.VectorDBEnums import QuantizationEnums
+from qdrant_client import AsyncQdrantClient, models
+import numpy as np
+import argparse
+import asyncio
+import math
+import time
+
+BENCHMARK_CONFIGS = [
+    {"name": "float32", "quantization": None},
+    {"name": "float32_on_disk", "quantization": None, "vectors_on_disk": True},
+    {"name": "scalar", "quantization": QuantizationEnums.SCALAR.value},
+    {"name": "scalar_on_disk", "quantization": QuantizationEnums.SCALAR.value, "vectors_on_disk": True},
+    {"name": "binary", "quantization": QuantizationEnums.BINARY.value, "quantization_oversampling": 3.0},
+]
+
+
+def estimate_memory_bytes(points: int, dimension: int, quantization: str = None,
+                          vectors_on_disk: bool = False, hnsw_m: int = 16):
+
+    original = 0 if vectors_on_disk else points * dimension * 4
+
+    quantized = 0
+    if quantization == QuantizationEnums.SCALAR.value:
+        quantized = points * dimension
+    elif quantization == QuantizationEnums.BINARY.value:
+        quantized = points * math.ceil(dimension / 8)
+
+    # Level-0 HNSW links: 2 * m neighbours of 4 bytes per point
+    graph = points * 2 * hnsw_m * 4
+
+    return original + quantized + graph
+
+
+async def load_vectors(client: AsyncQdrantClient, collection_name: str, points: int, vector_name: str):
+
+    vectors, offset = [], None
+
+    while len(vectors) < points:
+        records, offset = await client.scroll(
+            collection_name=collection_name,
+            limit=min(1000, points - len(vectors)),
+            offset=offset,
+            with_vectors=[vector_name],
+            with_payload=False
+        )
+        vectors.extend(record.vector[vector_name] for record in records)
+        if offset is None:
+            break
+
+    return np.asarray(vectors, dtype=np.float32)
+
+
+async def wait_for_index(client: AsyncQdrantClient, collection_name: str, timeout: float = 600):
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        info = await client.get_collection(collection_name)
+        if info.status == models.CollectionStatus.GREEN:
+            return
+        await asyncio.sleep(1)
+
+
+async def run_config(client: AsyncQdrantClient, config: dict, vectors: np.ndarray, queries: np.ndarray,
+                     truth: np.ndarray, k: int, hnsw_ef: int, hnsw_m: int, hnsw_ef_construct: int):
+
+    provider = QdrantDBProvider(
+        db_client=None,
+        qdrant_cache=None,
+        distance_method="cosine",
+        quantization=config.get("quantization"),
+        quantization_oversampling=config.get("quantization_oversampling", 2.0),
+        vectors_on_disk=config.get("vectors_on_disk", False),
+        hnsw_m=hnsw_m,
+        hnsw_ef_construct=hnsw_ef_construct
+    )
+
+    collection_name = f"benchmark_{config['name']}"
+    await client.delete_collection(collection_name)
+    await client.create_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(
+            size=vectors.shape[1],
+            distance=models.Distance.COSINE,
+            on_disk=provider.vectors_on_disk,
+            hnsw_config=provider.hnsw_config,
+            quantization_config=provider.quantization_config
+        )
+    )
+
+    for start in range(0, len(vectors), 1000):
+        batch = vectors[start:start + 1000]
+        await client.upsert(
+            collection_name=collection_name,
+            points=models.Batch(ids=list(range(start, start + len(batch))), vectors=batch.tolist()),
+            wait=True
+        )
+    await wait_for_index(client, collection_name)
+
+    latencies, hits = [], 0
+    search_params = models.SearchParams(hnsw_ef=hnsw_ef, quantization=provider.quantization_search_params)
+
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        result = await client.query_points(
+            collection_name=collection_name,
+            query=query.tolist(),
+            limit=k,
+            search_params=search_params
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len(set(point.id for point in result.points) & set(expected.tolist()))
+
+    await client.delete_collection(collection_name)
+
+    return {
+        "name": config["name"],
+        "memory_mb": estimate_memory_bytes(
+            len(vectors), vectors.shape[1], config.get("quantization"),
+            config.get("vectors_on_disk", False), hnsw_m or 16
+        ) / 2 ** 20,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "recall": hits / (len(queries) * k)
+    }
+
+
+async def main(args):
+
+    client = AsyncQdrantClient(url=args.url, api_key=args.api_key, timeout=120)
+    rng = np.random.default_rng(args.seed)
+
+    if args.source_collection:
+        vectors = await load_vectors(client, args.source_collection, args.points, args.vector_name)
+    else:
+        vectors = rng.standard_normal((args.points, args.dimension), dtype=np.float32)
+
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    # Queries are perturbed corpus vectors, ground truth is exact cosine top-k
+    queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+    queries = queries + rng.normal(0, args.query_noise, queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {args.queries} queries, k={args.k}")
+    print(f"{'config':<18}{'memory MB':>12}{'p50 ms':>10}{'p95 ms':>10}{'recall@k':>10}")
+
+    for config in BENCHMARK_CONFIGS:
+        report = await run_config(
+            client, config, vectors, queries, truth,
+            args.k, args.hnsw_ef, args.hnsw_m, args.hnsw_ef_construct
+        )
+        print(f"{report['name']:<18}{report['memory_mb']:>12.1f}{report['p50_ms']:>10.2f}"
+              f"{report['p95_ms']:>10.2f}{report['recall']:>10.3f}")
+
+    await client.close()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Benchmark Qdrant quantization and on-disk options")
+    parser.add_argument("--url", default="http://localhost:6333")
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--source-collection", default=None, help="Benchmark real vectors from this collection")
+    parser.add_argument("--vector-name", default="dense")
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--query-noise", type=float, default=0.05)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, default=128)
+    parser.add_argument("--hnsw-m", type=int, default=None)
+    parser.add_argument("--hnsw-ef-construct", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+
+    asyncio.run(main(parser.parse_args()))
@@ -37,4 +37,3 @@ class BaseController:
             os.makedirs(file_path, exist_ok=True)
         
         return file_path
-    
\ No newline at end of file
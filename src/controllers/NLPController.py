@@ -1,18 +1,40 @@
 from .BaseController import BaseController
 from stores.llm.LLMEnums import DocumentTypeEnum, LLMEnums
+from utils.entity_matcher import EntityMatcher
+from utils.graph_context import GraphContextBuilder
+from models import EntityFastPathEnums
+from utils.text_normalization import normalize_query
+from utils.content_ids import sentence_id
+from utils.indexing import StageStats, IndexingCheckpoint
+from utils.stage_timing import stage_timer, record_stage
+from utils.token_estimation import estimate_tokens
+from utils.metrics import ANSWER_CACHE_REQUESTS, SUBGRAPH_SIZE, PROMPT_SIZE, ENTITY_FAST_PATH_REQUESTS
+from stores.vectordb.RetrievalProfiles import get_retrieval_profile
 from tqdm.asyncio import tqdm
+import asyncio
 import logging
+import hashlib
 import json 
+import time
+import os
 
 class NLPController(BaseController):
 
-    def __init__(self, vector_db_client, embedding_client, generation_client, template_parser, neo4j_model):
+    def __init__(self, vector_db_client, embedding_client, generation_client, template_parser, neo4j_model,
+                 answer_cache=None, query_embedding_cache=None, embedding_cache=None, sparse_encoder=None,
+                 embedding_batcher=None, query_entity_index=None):
         super().__init__()
         self.vector_db_client = vector_db_client
         self.embedding_client = embedding_client
         self.generation_client = generation_client
         self.template_parser = template_parser
         self.neo4j_model = neo4j_model
+        self.answer_cache = answer_cache
+        self.query_embedding_cache = query_embedding_cache
+        self.embedding_cache = embedding_cache
+        self.sparse_encoder = sparse_encoder
+        self.embedding_batcher = embedding_batcher
+        self.query_entity_index = query_entity_index
         self.logger = logging.getLogger(__name__)
     
     async def reset_vector_db_collection(self):
@@ -28,27 +50,36 @@ class NLPController(BaseController):
             json.dumps(collection_info, default=lambda x: x.__dict__)
         )
     
-    def format_graph_context(self, subgraph):
-        nodes = set()
-        edges = set()  
+    def format_graph_context(self, subgraph, query: str = None):
 
-        for entry in subgraph:
-            entity = entry["entity"]
-            related = entry["related_node"]
-            relationship = entry["relationship"]
-
-            nodes.add(entity["name"])
-            nodes.add(related["name"])
+        context_builder = GraphContextBuilder(
+            token_budget=self.config.GRAPH_CONTEXT_TOKEN_BUDGET,
+            depth_weight=self.config.GRAPH_CONTEXT_DEPTH_WEIGHT,
+            similarity_weight=self.config.GRAPH_CONTEXT_SIMILARITY_WEIGHT,
+            degree_weight=self.config.GRAPH_CONTEXT_DEGREE_WEIGHT
+        )
 
-            edge = f"{entity['name']} {relationship['type']} {related['name']}"
-            edges.add(edge)
-            # edges.append(f"{entity['name']} {relationship['type']} {related['name']}")   
+        return context_builder.build(subgraph, query)
+    
+    def get_graph_expansion_params(self):
+
+        relationship_types = None
+        if self.config.GRAPH_RELATIONSHIP_TYPES:
+            relationship_types = [
+                relationship_type.strip()
+                for relationship_type in self.config.GRAPH_RELATIONSHIP_TYPES.split(",")
+                if relationship_type.strip()
+            ]
 
         return {
-            "nodes": list(nodes),
-            "edges": list(edges)
+            "max_depth": self.config.GRAPH_MAX_DEPTH,
+            "max_fanout": self.config.GRAPH_MAX_FANOUT,
+            "max_degree": self.config.GRAPH_MAX_HUB_DEGREE,
+            "relationship_types": relationship_types,
+            "max_rows": self.config.GRAPH_MAX_ROWS,
+            "max_bytes": self.config.GRAPH_MAX_BYTES
         }
-    
+
     def extract_entity_ids(self, search_results):
         seen = dict()   
 
@@ -59,36 +90,112 @@ class NLPController(BaseController):
 
         return list(seen.keys())
 
-    async def index_into_vector_db(self, sentences: list, node_id_mapping: dict, do_reset: bool = False, batch_size: int = 50):
-        embeddings = []
-        entity_ids = []
-        
-        # Calculate total number of batches for progress tracking
-        total_batches = (len(sentences) + batch_size - 1) // batch_size
-        
-        # Process batches with progress bar
-        for i in tqdm(range(0, len(sentences), batch_size), 
-                    total=total_batches,
-                    desc="Processing batches",
-                    unit="batch"):
-            batch_sentences = sentences[i:i + batch_size]
-            batch_entity_ids = []
-            
-            for sentence in batch_sentences:
-                entities_in_sentence = [
-                    node_id for entity, node_id in node_id_mapping.items() 
-                    if entity in sentence
-                ]
-                batch_entity_ids.append(entities_in_sentence)
-            
-            batch_embeddings = self.embedding_client.embed_text(
-                text=batch_sentences,
-                document_type=DocumentTypeEnum.DOCUMENT.value
-            )
-            
-            embeddings.extend(batch_embeddings)
-            entity_ids.extend(batch_entity_ids)
-        
+    def update_index_version(self, digest, sentence: str, sentence_entity_ids: list):
+        digest.update(sentence.encode("utf-8"))
+        digest.update(json.dumps(sentence_entity_ids).encode("utf-8"))
+
+    def build_entity_matcher(self, node_id_mapping: dict):
+
+        return EntityMatcher(
+            node_id_mapping,
+            normalize_arabic=self.config.ENTITY_MATCH_NORMALIZE_ARABIC
+        )
+
+    async def embed_texts(self, texts: list, document_type: str):
+
+        if self.embedding_batcher is not None:
+            return await self.embedding_batcher.embed(texts, document_type=document_type)
+
+        return await self.embedding_client.embed_text(
+            text=texts,
+            document_type=document_type
+        )
+
+    async def embed_documents(self, texts: list):
+
+        document_type = DocumentTypeEnum.DOCUMENT.value
+
+        if self.embedding_cache is None:
+            return await self.embed_texts(texts, document_type)
+
+        cache_key = {
+            "model_id": self.embedding_client.embedding_model_id,
+            "dimension": self.embedding_client.embedding_size,
+            "document_type": document_type
+        }
+
+        vectors = self.embedding_cache.get_many(texts, **cache_key)
+        missing_idx = [idx for idx, vector in enumerate(vectors) if vector is None]
+
+        if missing_idx:
+            missing_texts = [texts[idx] for idx in missing_idx]
+            missing_vectors = await self.embed_texts(missing_texts, document_type)
+
+            if not missing_vectors:
+                return None
+
+            self.embedding_cache.put_many(missing_texts, missing_vectors, **cache_key)
+
+            for idx, vector in zip(missing_idx, missing_vectors):
+                vectors[idx] = vector
+
+        return vectors
+
+    def iter_pending_batches(self, sentences, pending_ids: set, entity_ids_by_point: dict, batch_size: int):
+        """Second pass over `sentences`, yielding `(point_id, text, entity_ids)` batches."""
+        remaining = set(pending_ids)
+        batch = []
+
+        for sentence in sentences:
+            point_id = sentence_id(sentence)
+            if point_id not in remaining:
+                continue
+
+            remaining.discard(point_id)
+            batch.append((point_id, sentence, entity_ids_by_point[point_id]))
+
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    async def index_into_vector_db(self, sentences, node_id_mapping: dict, do_reset: bool = False,
+                                   batch_size: int = 50, incremental: bool = False, graph_fingerprint: str = None):
+        """Index `sentences`, a list or any re-iterable source such as a SentenceSpool.
+
+        The source is read twice, once to collect IDs and entities and once to
+        embed, so sentence text is never held in memory for the whole corpus.
+        `graph_fingerprint` goes into the index version, so a changed graph
+        invalidates cached answers even when the sentences did not change.
+        """
+        if iter(sentences) is sentences:
+            # A one-shot generator cannot be read twice
+            sentences = list(sentences)
+
+        entity_matcher = self.build_entity_matcher(node_id_mapping)
+
+        # Point IDs are derived from content, so duplicates collapse here
+        point_ids, entity_ids = [], []
+        entity_ids_by_point = {}
+        digest = hashlib.sha256()
+
+        for sentence in sentences:
+            point_id = sentence_id(sentence)
+            if point_id in entity_ids_by_point:
+                continue
+
+            sentence_entity_ids = entity_matcher.match_values(sentence)
+            entity_ids_by_point[point_id] = sentence_entity_ids
+            point_ids.append(point_id)
+            entity_ids.append(sentence_entity_ids)
+            self.update_index_version(digest, sentence, sentence_entity_ids)
+
+        corpus_version = digest.hexdigest()[:16]
+        digest.update((graph_fingerprint or "").encode("utf-8"))
+        index_version = digest.hexdigest()[:16]
+
         # Create collection
         _ = await self.vector_db_client.create_collection(
             collection_name=self.config.COLLECTION_NAME,
@@ -102,22 +209,224 @@ class NLPController(BaseController):
             embedding_size=self.embedding_client.embedding_size,
             do_reset=do_reset
         )
-        
-        self.logger.info(f"Inserting {len(sentences)} sentences into vector database...")
-        _ = await self.vector_db_client.insert_many(
+
+        pending_idx = list(range(len(point_ids)))
+
+        if incremental and not do_reset:
+            pending_idx = await self.sync_indexed_points(point_ids, entity_ids)
+
+        # A run is resumable only for the same corpus, entity mapping and model
+        run_id = f"{corpus_version}:{self.embedding_client.embedding_model_id}"
+        checkpoint = IndexingCheckpoint(
+            os.path.join(self.get_cache_path("indexing"), f"{self.config.COLLECTION_NAME}.checkpoint")
+        )
+        if do_reset:
+            checkpoint.clear()
+
+        done_ids = checkpoint.load(run_id)
+        if done_ids:
+            pending_idx = [idx for idx in pending_idx if point_ids[idx] not in done_ids]
+            self.logger.info(f"Resuming from checkpoint, {len(done_ids)} sentences already indexed")
+        checkpoint.open(run_id, resume=bool(done_ids))
+
+        self.logger.info(f"Indexing {len(pending_idx)} sentences into vector database...")
+        batches = self.iter_pending_batches(
+            sentences, {point_ids[idx] for idx in pending_idx}, entity_ids_by_point, batch_size
+        )
+
+        try:
+            stats = await self.run_indexing_pipeline(
+                batches, (len(pending_idx) + batch_size - 1) // batch_size, checkpoint
+            )
+        finally:
+            checkpoint.close()
+
+        self.logger.info(f"Indexing throughput: {stats}")
+
+        failed_batches = stats["embedding"]["failed_batches"] + stats["upsert"]["failed_batches"]
+        if failed_batches:
+            self.logger.error(f"{failed_batches} batches failed, run indexing again to resume from the checkpoint")
+            return False
+
+        checkpoint.clear()
+        _ = await self.vector_db_client.set_index_version(
             collection_name=self.config.COLLECTION_NAME,
-            texts=sentences,
-            vectors=embeddings,
-            entity_ids=entity_ids
+            index_version=index_version
+        )
+        _ = await self.vector_db_client.invalidate_cache(
+            cache_name=self.config.CACHE_NAME,
+            index_version=index_version
         )
+
+        if self.embedding_cache is not None:
+            self.logger.info(f"Embedding cache: {self.embedding_cache.stats()}")
+
         self.logger.info("Indexing complete!")
         
         return True
+
+    async def run_indexing_pipeline(self, batches, total_batches: int, checkpoint: IndexingCheckpoint):
+        """Embed and upsert `(point_id, text, entity_ids)` batches through bounded queues.
+
+        Embedding workers (with sparse encoding running alongside in the encoder's
+        process pool) feed upsert workers, so at most the queued batches of
+        vectors are held in memory at once.
+        """
+        embedding_workers = self.config.INDEXING_EMBEDDING_WORKERS
+        upsert_workers = self.config.INDEXING_UPSERT_WORKERS
+
+        embed_queue = asyncio.Queue(maxsize=self.config.INDEXING_QUEUE_SIZE)
+        upsert_queue = asyncio.Queue(maxsize=self.config.INDEXING_QUEUE_SIZE)
+
+        stats = {name: StageStats(name) for name in ("embedding", "sparse", "upsert")}
+        progress = tqdm(total=total_batches, desc="Indexing batches", unit="batch")
+        started_at = time.perf_counter()
+
+        async def timed(stage: StageStats, items: int, coroutine):
+            stage_started_at = time.perf_counter()
+            result = await coroutine
+            stage.record(items, time.perf_counter() - stage_started_at)
+            return result
+
+        async def encode_sparse(batch_texts: list):
+            if self.sparse_encoder is None:
+                return None
+            try:
+                return await timed(stats["sparse"], len(batch_texts), self.sparse_encoder.encode(batch_texts))
+            except Exception as e:
+                # The vector store falls back to encoding the batch inline
+                self.logger.warning(f"Sparse encoding failed, encoding inline: {e}")
+                stats["sparse"].failed_batches += 1
+                return None
+
+        async def embed_worker():
+            while (batch := await embed_queue.get()) is not None:
+                batch_texts = [text for _, text, _ in batch]
+
+                try:
+                    vectors, sparse_vectors = await asyncio.gather(
+                        timed(stats["embedding"], len(batch), self.embed_documents(batch_texts)),
+                        encode_sparse(batch_texts)
+                    )
+                except Exception as e:
+                    self.logger.error(f"Error while embedding batch: {e}")
+                    vectors = None
+
+                if not vectors:
+                    stats["embedding"].failed_batches += 1
+                    progress.update(1)
+                    continue
+
+                await upsert_queue.put((batch, vectors, sparse_vectors))
+
+        async def upsert_worker():
+            while (item := await upsert_queue.get()) is not None:
+                batch, vectors, sparse_vectors = item
+                batch_ids = [point_id for point_id, _, _ in batch]
+
+                try:
+                    inserted = await timed(stats["upsert"], len(batch), self.vector_db_client.insert_many(
+                        collection_name=self.config.COLLECTION_NAME,
+                        texts=[text for _, text, _ in batch],
+                        vectors=vectors,
+                        entity_ids=[batch_entity_ids for _, _, batch_entity_ids in batch],
+                        ids=batch_ids,
+                        sparse_vectors=sparse_vectors,
+                        batch_size=len(batch)
+                    ))
+                except Exception as e:
+                    self.logger.error(f"Error while upserting batch: {e}")
+                    inserted = False
+
+                if inserted:
+                    # Only batches the store has persisted are checkpointed, buffered ones wait for a flush
+                    unflushed_ids.extend(batch_ids)
+                    if not self.vector_db_client.has_pending_writes(self.config.COLLECTION_NAME):
+                        checkpoint.append(unflushed_ids)
+                        unflushed_ids.clear()
+                else:
+                    stats["upsert"].failed_batches += 1
+                progress.update(1)
+
+        unflushed_ids = []
+        embedders = [asyncio.create_task(embed_worker()) for _ in range(embedding_workers)]
+        upserters = [asyncio.create_task(upsert_worker()) for _ in range(upsert_workers)]
+
+        for batch in batches:
+            await embed_queue.put(batch)
+        for _ in embedders:
+            await embed_queue.put(None)
+        await asyncio.gather(*embedders)
+
+        for _ in upserters:
+            await upsert_queue.put(None)
+        await asyncio.gather(*upserters)
+
+        # Applies buffered upserts, and the deletes and payload updates of an incremental sync
+        if await self.vector_db_client.flush(self.config.COLLECTION_NAME):
+            if unflushed_ids:
+                checkpoint.append(unflushed_ids)
+        else:
+            stats["upsert"].failed_batches += 1
+
+        progress.close()
+        wall_seconds = time.perf_counter() - started_at
+
+        return {name: stage.report(wall_seconds) for name, stage in stats.items()}
+
+    async def sync_indexed_points(self, point_ids: list, entity_ids: list):
+        """Diff the source against the collection and apply deletes and payload updates.
+
+        Returns the indices of the sentences that still have to be embedded and inserted.
+        """
+        indexed = await self.vector_db_client.get_point_payloads(
+            collection_name=self.config.COLLECTION_NAME,
+            payload_keys=["entity_ids"]
+        )
+
+        wanted = set(point_ids)
+        pending_idx = []
+        changed_payloads = {}
+
+        for idx, (point_id, sentence_entity_ids) in enumerate(zip(point_ids, entity_ids)):
+            if point_id not in indexed:
+                pending_idx.append(idx)
+            elif indexed[point_id].get("entity_ids") != sentence_entity_ids:
+                changed_payloads[point_id] = {"entity_ids": sentence_entity_ids}
+
+        removed_ids = [point_id for point_id in indexed if point_id not in wanted]
+
+        if removed_ids:
+            _ = await self.vector_db_client.delete_points(
+                collection_name=self.config.COLLECTION_NAME,
+                ids=removed_ids
+            )
+
+        if changed_payloads:
+            _ = await self.vector_db_client.update_payloads(
+                collection_name=self.config.COLLECTION_NAME,
+                payloads=changed_payloads
+            )
+
+        self.logger.info(
+            f"Incremental indexing: {len(pending_idx)} new, {len(changed_payloads)} relinked, "
+            f"{len(removed_ids)} removed, {len(point_ids) - len(pending_idx) - len(changed_payloads)} unchanged"
+        )
+
+        return pending_idx
         
     async def query_embeddings(self, text: str):
+
+        cache_key = (self.embedding_client.embedding_model_id, normalize_query(text))
+
+        if self.query_embedding_cache is not None:
+            query_vector = self.query_embedding_cache.get(cache_key)
+            if query_vector:
+                return query_vector
         
-        vectors = self.embedding_client.embed_text(
-            text, DocumentTypeEnum.QUERY.value)
+        with stage_timer("query_embedding", self.config.EMBEDDING_BACKEND, self.embedding_client.embedding_model_id):
+            vectors = await self.embedding_client.embed_text(
+                text, DocumentTypeEnum.QUERY.value)
 
         if not vectors or len(vectors) == 0:
             return False
@@ -127,62 +436,243 @@ class NLPController(BaseController):
 
         if not query_vector:
             return False
+
+        if self.query_embedding_cache is not None:
+            self.query_embedding_cache.put(cache_key, query_vector)
         
         return query_vector
+
+    async def get_index_version(self):
+        return await self.vector_db_client.get_index_version(self.config.COLLECTION_NAME)
+
+    async def get_answer_cache_key(self, query: str):
+        return (await self.get_index_version(), normalize_query(query))
+
+    async def retrieve_answer_from_query_cache(self, query: str):
+
+        if self.answer_cache is None:
+            return None
+
+        cache_key = await self.get_answer_cache_key(query)
+        with stage_timer("answer_cache_lookup", "memory"):
+            answer = self.answer_cache.get(cache_key)
+
+        ANSWER_CACHE_REQUESTS.labels(tier="exact", result="hit" if answer else "miss").inc()
+        return answer
+
+    async def add_answer_into_query_cache(self, query: str, answer: str):
+
+        if self.answer_cache is None or not answer:
+            return False
+
+        self.answer_cache.put(await self.get_answer_cache_key(query), answer)
+        return True
     
     async def retrieve_answer_from_cache(self, query_vector: list, cache_threshold=0.3):
 
-        cache_result = await self.vector_db_client.search_cache(
-            cache_name=self.config.CACHE_NAME,
-            vector=query_vector
-        )
+        with stage_timer("semantic_cache_lookup", self.config.VECTOR_DB_BACKEND):
+            cache_result = await self.vector_db_client.search_cache(
+                cache_name=self.config.CACHE_NAME,
+                vector=query_vector,
+                index_version=await self.get_index_version()
+            )
         if cache_result:
             for s in cache_result:
                 if s.score <= cache_threshold:
+                    _ = await self.vector_db_client.touch_cache_entry(
+                        cache_name=self.config.CACHE_NAME,
+                        point_id=s.id
+                    )
+                    ANSWER_CACHE_REQUESTS.labels(tier="semantic", result="hit").inc()
                     return s.payload["response_text"]
+
+        ANSWER_CACHE_REQUESTS.labels(tier="semantic", result="miss").inc()
     
     async def add_answer_into_cache(self, query_vector: list, answer: str):
 
-        _ = await self.vector_db_client.add_to_cache(
-            cache_name=self.config.CACHE_NAME,
-            vector=query_vector,
-            response_text=answer
-        )
+        with stage_timer("semantic_cache_write", self.config.VECTOR_DB_BACKEND):
+            _ = await self.vector_db_client.add_to_cache(
+                cache_name=self.config.CACHE_NAME,
+                vector=query_vector,
+                response_text=answer,
+                index_version=await self.get_index_version()
+            )
         return True
     
-    async def search_vector_db_collection(self, query: str, limit: int = 5):
+    def get_retrieval_profile(self, profile: str = None):
+
+        default_profile = self.config.RETRIEVAL_DEFAULT_PROFILE
+        retrieval_profile = get_retrieval_profile(profile or default_profile, self.config.RETRIEVAL_PROFILES)
+
+        if retrieval_profile is None:
+            self.logger.warning(f"Unknown retrieval profile '{profile}', using '{default_profile}'")
+            retrieval_profile = get_retrieval_profile(default_profile, self.config.RETRIEVAL_PROFILES)
+
+        return retrieval_profile
+
+    async def search_vector_db_collection(self, query: str, limit: int = 5, profile: str = None):
 
         query_vector = await self.query_embeddings(text=query)
 
-        result = await self.vector_db_client.search_by_vector(
-            collection_name=self.config.COLLECTION_NAME,
-            text=query,
-            query_vector=query_vector,
-            limit=limit
-        )
+        retrieval_profile = self.get_retrieval_profile(profile)
+
+        with stage_timer("vector_search", self.config.VECTOR_DB_BACKEND) as span:
+            result = await self.vector_db_client.search_by_vector(
+                collection_name=self.config.COLLECTION_NAME,
+                text=query,
+                query_vector=query_vector,
+                limit=limit,
+                profile=retrieval_profile
+            )
+            span.set_attributes({
+                "graph_rag.retrieval_profile": profile or self.config.RETRIEVAL_DEFAULT_PROFILE,
+                "graph_rag.limit": limit,
+                "graph_rag.results": len(result or [])
+            })
 
         if not result:
             return False
         
         return result
     
-    async def graph_rag_answer_question(self, query: str, limit: int = 5):
+    def match_query_entities(self, query: str):
+        """`(name, entity_id, score)` of the entities named in `query`."""
+        if self.query_entity_index is None or self.config.ENTITY_FAST_PATH_MODE == EntityFastPathEnums.OFF.value:
+            return []
+
+        with stage_timer("entity_match", "memory") as span:
+            matches = self.query_entity_index.match(query)
+            span.set_attribute("graph_rag.matched_entities", len(matches))
+
+        return matches
+
+    def can_skip_retrieval(self, matches: list) -> bool:
+        # A single short or fuzzy hit is too weak to stand in for vector search
+        return any(
+            score >= self.config.ENTITY_FAST_PATH_SKIP_MIN_SCORE
+            and len(self.query_entity_index.prepare(name)) >= self.config.ENTITY_FAST_PATH_SKIP_MIN_CHARS
+            for name, _, score in matches
+        )
+
+    @staticmethod
+    def get_subgraph_bytes(subgraph: list) -> int:
+        # Measured like the graph models measure their byte budget
+        return sum(
+            len(f"{entry['source']}{entry['relationship']}{entry['target']}".encode("utf-8"))
+            for entry in subgraph
+        )
+
+    async def fetch_subgraph(self, entity_ids: list, max_rows: int = None, max_bytes: int = None):
+        """Expand `entity_ids`; `max_rows`/`max_bytes` override the configured budget."""
+        if not entity_ids:
+            return []
+
+        params = self.get_graph_expansion_params()
+        if max_rows is not None:
+            params["max_rows"] = max_rows
+        if max_bytes is not None:
+            params["max_bytes"] = max_bytes
+
+        with stage_timer("graph_expansion", self.config.GRAPH_BACKEND) as span:
+            subgraph = await self.neo4j_model.fetch_related_graph(entity_ids=entity_ids, **params)
+            span.set_attributes({
+                "graph_rag.seed_entities": len(entity_ids),
+                "graph_rag.subgraph_rows": len(subgraph)
+            })
+
+        return subgraph
+
+    async def extend_subgraph(self, subgraph: list, entity_ids: list):
+        """Add the expansion of `entity_ids` to `subgraph` within what is left of its budget."""
+        max_rows = self.config.GRAPH_MAX_ROWS - len(subgraph)
+        max_bytes = self.config.GRAPH_MAX_BYTES - self.get_subgraph_bytes(subgraph)
+        if not entity_ids or max_rows <= 0 or max_bytes <= 0:
+            return subgraph
+
+        seen_edges = {(entry["source"], entry["relationship"], entry["target"]) for entry in subgraph}
+        extended = list(subgraph)
 
-        answer, full_prompt, chat_history = None, None, None
+        for entry in await self.fetch_subgraph(entity_ids, max_rows=max_rows, max_bytes=max_bytes):
+            edge_key = (entry["source"], entry["relationship"], entry["target"])
+            if edge_key not in seen_edges:
+                seen_edges.add(edge_key)
+                extended.append(entry)
 
-        retrieved_graph_components = await self.search_vector_db_collection(query, limit)
+        return extended
+
+    async def retrieve_subgraph(self, query: str, limit: int = 5, profile: str = None):
+        """Seed entities from the query itself and/or vector search, then expand them.
+
+        Returns `(subgraph, retrieved_graph_components)`; the subgraph is None
+        when no seed entity was found.
+        """
+        matches = self.match_query_entities(query)
+        matched_ids = list(dict.fromkeys(entity_id for _, entity_id, _ in matches))
+
+        if matched_ids and self.config.ENTITY_FAST_PATH_MODE == EntityFastPathEnums.SKIP.value \
+                and self.can_skip_retrieval(matches):
+            subgraph = await self.fetch_subgraph(matched_ids)
+            if subgraph:
+                ENTITY_FAST_PATH_REQUESTS.labels(path="entity_match").inc()
+                return subgraph, []
+            # Matched entities without edges give no context, fall back to vector search
+
+        if matched_ids and self.config.ENTITY_FAST_PATH_MODE == EntityFastPathEnums.PARALLEL.value:
+            ENTITY_FAST_PATH_REQUESTS.labels(path="parallel").inc()
+
+            # Matched entities are expanded while the vector search runs, the entities
+            # it adds are expanded afterwards within the remaining budget
+            search_task = asyncio.create_task(self.search_vector_db_collection(query, limit, profile))
+            try:
+                subgraph = await self.fetch_subgraph(matched_ids)
+            except Exception:
+                search_task.cancel()
+                raise
+
+            retrieved_graph_components = await search_task or []
+
+            seen = set(matched_ids)
+            extra_ids = [_id for _id in self.extract_entity_ids(retrieved_graph_components) if _id not in seen]
+
+            return await self.extend_subgraph(subgraph, extra_ids), retrieved_graph_components
+
+        ENTITY_FAST_PATH_REQUESTS.labels(path="vector").inc()
+
+        retrieved_graph_components = await self.search_vector_db_collection(query, limit, profile)
 
         if not retrieved_graph_components or len(retrieved_graph_components) == 0:
-            return answer, full_prompt, chat_history
-        
+            return None, retrieved_graph_components
+
         entity_ids = self.extract_entity_ids(retrieved_graph_components)
 
-        subgraph = await self.neo4j_model.fetch_related_graph(entity_ids=entity_ids)
-        
-        graph_context = self.format_graph_context(subgraph)
+        return await self.fetch_subgraph(entity_ids), retrieved_graph_components
+
+    async def build_graph_rag_prompt(self, query: str, limit: int = 5, profile: str = None):
+
+        full_prompt, chat_history = None, None
+
+        subgraph, retrieved_graph_components = await self.retrieve_subgraph(query, limit, profile)
+
+        if subgraph is None:
+            return full_prompt, chat_history, retrieved_graph_components
+
+        with stage_timer("prompt_assembly") as span:
+            full_prompt, chat_history = self.assemble_graph_rag_prompt(query, subgraph)
+            span.set_attribute("graph_rag.prompt_chars", len(full_prompt))
+
+        return full_prompt, chat_history, retrieved_graph_components
+
+    def assemble_graph_rag_prompt(self, query: str, subgraph: list):
+
+        graph_context = self.format_graph_context(subgraph, query)
+
+        SUBGRAPH_SIZE.labels(kind="rows").observe(len(subgraph))
+        SUBGRAPH_SIZE.labels(kind="nodes").observe(len(graph_context["nodes"]))
+        SUBGRAPH_SIZE.labels(kind="edges").observe(graph_context["kept_edges"])
+        SUBGRAPH_SIZE.labels(kind="dropped_edges").observe(graph_context["dropped_edges"])
 
         nodes_str = ", ".join(graph_context["nodes"])
-        edges_str = "; ".join(graph_context["edges"])
+        edges_str = "\n".join(graph_context["edges"])
 
         chat_history = self.template_parser.get("rag", "kg_system_prompt")
 
@@ -197,6 +687,10 @@ class NLPController(BaseController):
 
         full_prompt = "\n\n".join([graph_prompt, footer_prompt])
 
+        prompt_chars = len(full_prompt) + len(chat_history or "")
+        PROMPT_SIZE.labels(unit="chars").observe(prompt_chars)
+        PROMPT_SIZE.labels(unit="estimated_tokens").observe(estimate_tokens(full_prompt) + estimate_tokens(chat_history))
+
         if self.config.GENERATION_BACKEND == LLMEnums.COHERE.value:
             chat_history = [
                 self.generation_client.construt_prompt(
@@ -205,12 +699,40 @@ class NLPController(BaseController):
                 )
             ]
 
-        answer = self.generation_client.generate_text(
-            prompt=full_prompt,
-            chat_history=chat_history
-        )
+        return full_prompt, chat_history
+
+    async def graph_rag_answer_question(self, query: str, limit: int = 5, profile: str = None):
+
+        answer = None
+
+        full_prompt, chat_history, _ = await self.build_graph_rag_prompt(query, limit, profile)
+
+        if not full_prompt:
+            return answer, full_prompt, chat_history
+
+        with stage_timer("generation", self.config.GENERATION_BACKEND, self.generation_client.generation_model_id):
+            answer = await self.generation_client.generate_text(
+                prompt=full_prompt,
+                chat_history=chat_history
+            )
 
         return answer, full_prompt, chat_history
+
+    async def graph_rag_answer_stream(self, full_prompt: str, chat_history):
+
+        provider, model = self.config.GENERATION_BACKEND, self.generation_client.generation_model_id
+
+        started_at, first_token = time.perf_counter(), True
+
+        with stage_timer("generation", provider, model):
+            async for token in self.generation_client.generate_text_stream(
+                prompt=full_prompt,
+                chat_history=chat_history
+            ):
+                if first_token:
+                    record_stage("generation_first_token", time.perf_counter() - started_at, provider, model)
+                    first_token = False
+                yield token
         
 
 
@@ -1,42 +1,129 @@
 from .BaseController import BaseController
-from langchain_community.document_loaders import TextLoader
 from stores.llm.LLMProviderFactory import LLMProviderFactory
 from stores.llm.LLMEnums import LLMEnums, CohereEnums
 from stores.llm.templates.template_parser import TemplateParser
-import uuid
+from utils.content_ids import entity_id
+from utils.text_normalization import normalize_text, WHITESPACE
+from utils.token_estimation import estimate_tokens
+from pathlib import Path
+import asyncio
+import hashlib
+import logging
+import time
+import os
 
 class ProcessController(BaseController):
 
-    def __init__(self):
+    def __init__(self, extraction_cache=None):
         super().__init__()
+        self.extraction_cache = extraction_cache
+        self.logger = logging.getLogger(__name__)
 
-    def load_txt_file(self, file_path: str):
-
-        file_path = self.get_file_path(file_path)
-        loader = TextLoader(file_path, encoding='utf-8')
-        documents = loader.load()
-        return documents
-    
     def sentence_splitting(self, raw_text: str):
 
         sentences = [sentence.strip() for sentence in raw_text.split("\n") if sentence.strip()]
 
         return sentences
 
-    def extract_entity_relationship(self, text: str):
+    def iter_source_files(self, source: str, pattern: str = "*.txt"):
+        """Files under the assets directory: `source` itself, or the files in that
+        directory matching `pattern` (use `**/*.txt` to recurse), in sorted order."""
+        source_path = Path(self.files_dir) / source
 
-        nodes = {}
-        relationships = []
+        if source_path.is_file():
+            yield str(source_path)
+            return
+
+        if not source_path.is_dir():
+            self.logger.warning(f"Ingestion source not found: {source_path}")
+            return
+
+        for file_path in sorted(source_path.glob(pattern or "*")):
+            if file_path.is_file():
+                yield str(file_path)
+
+    def iter_source_lines(self, source: str, pattern: str = "*.txt"):
+        """Stream the non-empty, stripped lines of every source file."""
+        for file_path in self.iter_source_files(source, pattern):
+            self.logger.info(f"Reading {os.path.relpath(file_path, self.files_dir)}")
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield line
+
+    def iter_chunks(self, lines, max_tokens: int):
+        """Pack whole lines from any iterable into chunks of at most `max_tokens` estimated tokens."""
+        current, current_tokens = [], 0
+
+        for line in lines:
+            line_tokens = estimate_tokens(line)
+
+            # A single oversized line is split on word boundaries
+            if line_tokens > max_tokens:
+                pieces, piece = [], []
+                for word in line.split():
+                    if piece and estimate_tokens(" ".join(piece + [word])) > max_tokens:
+                        pieces.append(" ".join(piece))
+                        piece = []
+                    piece.append(word)
+                if piece:
+                    pieces.append(" ".join(piece))
+            else:
+                pieces = [line]
+
+            for piece in pieces:
+                piece_tokens = estimate_tokens(piece)
+                if current and current_tokens + piece_tokens > max_tokens:
+                    yield "\n".join(current)
+                    current, current_tokens = [], 0
+                current.append(piece)
+                current_tokens += piece_tokens
+
+        if current:
+            yield "\n".join(current)
+
+    def create_extraction_client(self):
 
-        template_parser = TemplateParser(
-            language=self.config.PRIMARY_LANG
-        )
         llm_provider_factory = LLMProviderFactory(self.config)
         generation_client = llm_provider_factory.create_provider(
             provider_name=self.config.STRUCTURE_OUTPUT_BACKEND
         )
         generation_client.set_generation_model(model_id=self.config.GENERATION_STRUCTURE_OUTPUT_MODEL_ID)
 
+        return generation_client
+
+    def get_extraction_model_key(self):
+        return f"{self.config.STRUCTURE_OUTPUT_BACKEND}:{self.config.GENERATION_STRUCTURE_OUTPUT_MODEL_ID}"
+
+    def get_extraction_prompt_hash(self, template_parser: TemplateParser):
+
+        digest = hashlib.sha256()
+        for key in ["entity_relationship_system_prompt", "entity_relationship_user_prompt"]:
+            digest.update((template_parser.get_source("rag", key) or "").encode("utf-8"))
+
+        return digest.hexdigest()
+
+    async def generate_graph_components_cached(self, text: str, generation_client, template_parser: TemplateParser, prompt_hash: str):
+
+        if self.extraction_cache is None:
+            return await self.generate_graph_components(text, generation_client, template_parser)
+
+        model_key = self.get_extraction_model_key()
+
+        result = self.extraction_cache.get(text, model_key, prompt_hash)
+        if result is not None:
+            return result
+
+        result = await self.generate_graph_components(text, generation_client, template_parser)
+
+        if result is not None:
+            self.extraction_cache.put(text, model_key, prompt_hash, result)
+
+        return result
+
+    async def generate_graph_components(self, text: str, generation_client, template_parser: TemplateParser):
+
         chat_history = template_parser.get(
             "rag", "entity_relationship_system_prompt"
         )
@@ -55,36 +142,144 @@ class ProcessController(BaseController):
                 )
             ]
 
-        result = generation_client.generate_with_structured_output(
+        result = await generation_client.generate_with_structured_output(
             prompt=user_prompt,
             chat_history=chat_history
         )
 
         if not result or not hasattr(result, "graph"):
-            self.logger.error("No valid graph returned from LLM")
-            return {}, []
+            return None
 
-        parsed_reponse = result.graph
+        return result
 
-        for entry in parsed_reponse:
-            node = entry.node
-            target_node = entry.target_node
-            relationship = entry.relationship
+    def merge_graph_components(self, results: list):
+        """Merge per-chunk GraphComponents into one de-duplicated node/relationship set.
 
-            if node and node not in nodes:
-                nodes[node] = str(uuid.uuid4())
+        Names and relationship types are compared after normalization; the first
+        spelling seen is kept, so stored types match GRAPH_RELATIONSHIP_TYPES as emitted.
+        """
+        nodes = {}
+        canonical_names = {}
+        canonical_types = {}
+        relationships = {}
+
+        def add_node(name: str):
+            name = name.strip()
+            key = normalize_text(name)
+            if key not in canonical_names:
+                canonical_names[key] = name
+                nodes[name] = entity_id(name)
+            return nodes[canonical_names[key]]
+
+        for result in results:
+            for entry in result.graph:
+                if not entry.node:
+                    continue
+
+                source_id = add_node(entry.node)
 
-            if target_node and target_node not in nodes:
-                nodes[target_node] = str(uuid.uuid4())
+                if not entry.target_node:
+                    continue
 
-            if target_node and relationship:
-                relationships.append(
+                target_id = add_node(entry.target_node)
+
+                if not entry.relationship:
+                    continue
+
+                relationship = WHITESPACE.sub(" ", entry.relationship).strip()
+                type_key = normalize_text(relationship, arabic=False).replace(" ", "_")
+                relationship = canonical_types.setdefault(type_key, relationship)
+                relationships.setdefault(
+                    (source_id, target_id, type_key),
                     {
-                        "source": nodes[node],
-                        "target": nodes[target_node],
+                        "source": source_id,
+                        "target": target_id,
                         "relationship": relationship
                     }
                 )
 
+        return nodes, list(relationships.values())
+
+    async def extract_entity_relationship(self, text: str):
+        """Extract from one text, chunked and cached like a streamed source."""
+        nodes, relationships, _ = await self.extract_entity_relationship_streaming(
+            self.iter_chunks(self.sentence_splitting(text), self.config.EXTRACTION_CHUNK_MAX_TOKENS),
+            concurrency=self.config.EXTRACTION_CONCURRENCY
+        )
+
         return nodes, relationships
-    
\ No newline at end of file
+
+    async def extract_entity_relationship_streaming(self, chunks, concurrency: int = 4):
+        """Extract from an iterable of chunks, pulling a new chunk only when one of
+        the `concurrency` in-flight requests finishes."""
+        template_parser = TemplateParser(
+            language=self.config.PRIMARY_LANG
+        )
+        generation_client = self.create_extraction_client()
+
+        prompt_hash = self.get_extraction_prompt_hash(template_parser)
+        started_at = time.perf_counter()
+
+        if self.extraction_cache is not None and self.config.EXTRACTION_CACHE_PRUNE:
+            pruned = self.extraction_cache.prune(prompt_hash)
+            if pruned:
+                self.logger.info(f"Pruned {pruned} extraction cache entries of other prompt versions")
+
+        succeeded, failed_chunks = [], []
+        in_flight = {}
+        chunk_count = 0
+
+        def collect(task: asyncio.Task):
+            idx = in_flight.pop(task)
+            error = task.exception()
+            result = None if error else task.result()
+
+            if error is not None or result is None:
+                reason = repr(error) if error is not None else "no valid graph returned"
+                failed_chunks.append({"chunk": idx, "error": reason})
+                self.logger.error(f"Extraction failed for chunk {idx}: {reason}")
+            else:
+                succeeded.append((idx, result))
+
+        for chunk in chunks:
+            if len(in_flight) >= concurrency:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    collect(task)
+
+            task = asyncio.create_task(self.generate_graph_components_cached(
+                chunk, generation_client, template_parser, prompt_hash
+            ))
+            in_flight[task] = chunk_count
+            chunk_count += 1
+
+        if in_flight:
+            done, _ = await asyncio.wait(in_flight)
+            for task in done:
+                collect(task)
+
+        # Merge in chunk order so the kept spelling of a name does not depend on timing
+        nodes, relationships = self.merge_graph_components(
+            [result for _, result in sorted(succeeded, key=lambda item: item[0])]
+        )
+
+        elapsed = time.perf_counter() - started_at
+        stats = {
+            "chunks": chunk_count,
+            "failed_chunks": failed_chunks,
+            "nodes": len(nodes),
+            "relationships": len(relationships),
+            "seconds": elapsed,
+            "chunks_per_second": chunk_count / elapsed if elapsed > 0 else 0.0
+        }
+        if self.extraction_cache is not None:
+            stats["cache"] = self.extraction_cache.stats()
+            self.logger.info(f"Extraction cache: {stats['cache']}")
+
+        self.logger.info(
+            f"Extracted {stats['nodes']} nodes and {stats['relationships']} relationships from "
+            f"{stats['chunks']} chunks ({len(failed_chunks)} failed) in {elapsed:.2f}s "
+            f"({stats['chunks_per_second']:.2f} chunks/s)"
+        )
+
+        return nodes, relationships, stats
@@ -11,6 +11,24 @@ class Settings(BaseSettings):
     NEO4J_DATABASE: str
     AURA_INSTANCEID: str
     AURA_INSTANCENAME: str
+    NEO4J_INGEST_BATCH_SIZE: Optional[int] = 1000
+
+    INGEST_SOURCE: Optional[str] = "desiease.txt"
+    INGEST_GLOB: Optional[str] = "*.txt"
+
+    GRAPH_BACKEND: Optional[str] = "neo4j"
+    GRAPH_SNAPSHOT_REFRESH_SECONDS: Optional[int] = 60
+    GRAPH_SNAPSHOT_MAX_AGE_SECONDS: Optional[int] = 3600
+    GRAPH_MAX_DEPTH: Optional[int] = 2
+    GRAPH_MAX_FANOUT: Optional[int] = 25
+    GRAPH_MAX_HUB_DEGREE: Optional[int] = 100
+    GRAPH_RELATIONSHIP_TYPES: Optional[str] = None
+    GRAPH_MAX_ROWS: Optional[int] = 300
+    GRAPH_MAX_BYTES: Optional[int] = 16000
+    GRAPH_CONTEXT_TOKEN_BUDGET: Optional[int] = 1500
+    GRAPH_CONTEXT_DEPTH_WEIGHT: Optional[float] = 1.0
+    GRAPH_CONTEXT_SIMILARITY_WEIGHT: Optional[float] = 1.0
+    GRAPH_CONTEXT_DEGREE_WEIGHT: Optional[float] = 0.5
 
     DAFAULT_OUTPUT_MAX_TOKENS: Optional[int] = None
     DAFAULT_TEMPERATURE: Optional[float] = None
@@ -19,20 +37,83 @@ class Settings(BaseSettings):
     GENERATION_BACKEND: str
     EMBEDDING_BACKEND: str
     GENERATION_STRUCTURE_OUTPUT_MODEL_ID: Optional[str] = None
+    EXTRACTION_CHUNK_MAX_TOKENS: Optional[int] = 2000
+    EXTRACTION_CONCURRENCY: Optional[int] = 4
+    EXTRACTION_CACHE_ENABLED: Optional[bool] = True
+    EXTRACTION_CACHE_PRUNE: Optional[bool] = False
     GENERATION_MODEL_ID: Optional[str] = None
     EMBEDDING_MODEL_ID: Optional[str] = None
     EMBEDDING_MODEL_DIMENSION: Optional[str] = None
+    EMBEDDING_CACHE_ENABLED: Optional[bool] = True
+    EMBEDDING_CACHE_COMPACT: Optional[bool] = False
 
     COHERE_API_KEY: Optional[str] = None
     GEMINI_API_KEY: Optional[str] = None
+    LLM_TOKEN_PRICES: Optional[dict] = None
 
     VECTOR_DB_BACKEND: str
     QDRANT_DB_PATH: Optional[str] = None
     QDRANT_CACHE_PATH: Optional[str] = None
+    QDRANT_URL: Optional[str] = None
+    QDRANT_HOST: Optional[str] = None
+    QDRANT_PORT: Optional[int] = 6333
+    QDRANT_GRPC_PORT: Optional[int] = 6334
+    QDRANT_PREFER_GRPC: Optional[bool] = True
+    QDRANT_TIMEOUT: Optional[int] = 30
+    QDRANT_API_KEY: Optional[str] = None
+    QDRANT_POOL_SIZE: Optional[int] = 32
+    QDRANT_QUANTIZATION: Optional[str] = None
+    QDRANT_QUANTIZATION_ALWAYS_RAM: Optional[bool] = True
+    QDRANT_QUANTIZATION_RESCORE: Optional[bool] = True
+    QDRANT_QUANTIZATION_OVERSAMPLING: Optional[float] = 2.0
+    QDRANT_VECTORS_ON_DISK: Optional[bool] = False
+    QDRANT_PAYLOAD_ON_DISK: Optional[bool] = False
+    QDRANT_HNSW_M: Optional[int] = None
+    QDRANT_HNSW_EF_CONSTRUCT: Optional[int] = None
     VECTOR_DB_DISTANCE_METHOD: Optional[str] = None
+    MATRYOSHKA_COARSE_DIMENSION: Optional[int] = None
+    MATRYOSHKA_COARSE_MULTIPLIER: Optional[int] = 4
+    NUMPY_DB_PATH: Optional[str] = "numpy_db"
+    NUMPY_STORAGE_DTYPE: Optional[str] = "float32"
+    NUMPY_WRITE_BUFFER_ROWS: Optional[int] = 100000
 
     COLLECTION_NAME: Optional[str] = None
+    INCREMENTAL_INDEXING: Optional[bool] = True
+    INDEXING_QUEUE_SIZE: Optional[int] = 8
+    INDEXING_EMBEDDING_WORKERS: Optional[int] = 4
+    INDEXING_UPSERT_WORKERS: Optional[int] = 2
+    INDEXING_SPARSE_WORKERS: Optional[int] = 2
+    INDEXING_BATCH_SIZE: Optional[int] = 256
+
+    EMBEDDING_MAX_BATCH_TEXTS: Optional[int] = None
+    EMBEDDING_MAX_BATCH_TOKENS: Optional[int] = None
+    EMBEDDING_REQUESTS_PER_MINUTE: Optional[int] = None
+    EMBEDDING_TOKENS_PER_MINUTE: Optional[int] = None
+    EMBEDDING_MAX_RETRIES: Optional[int] = 5
+    EMBEDDING_TARGET_LATENCY_SECONDS: Optional[float] = 5.0
+    RETRIEVAL_DEFAULT_PROFILE: Optional[str] = "balanced"
+    RETRIEVAL_PROFILES: Optional[dict] = None
     CACHE_NAME: Optional[str] = None
+    SEMANTIC_CACHE_MAX_ENTRIES: Optional[int] = 10000
+    SEMANTIC_CACHE_TTL_SECONDS: Optional[int] = 604800
+    SEMANTIC_CACHE_COUNT_INTERVAL: Optional[int] = 100
+    INDEX_VERSION_TTL_SECONDS: Optional[int] = 10
+    QUERY_ANSWER_CACHE_SIZE: Optional[int] = 1024
+    QUERY_EMBEDDING_CACHE_SIZE: Optional[int] = 4096
+
+    ENTITY_MATCH_NORMALIZE_ARABIC: Optional[bool] = True
+    ENTITY_FAST_PATH_MODE: Optional[str] = "parallel"
+    ENTITY_FAST_PATH_FUZZY_THRESHOLD: Optional[float] = 0.88
+    ENTITY_FAST_PATH_MIN_COVERAGE: Optional[float] = 0.6
+    ENTITY_FAST_PATH_SKIP_MIN_SCORE: Optional[float] = 1.0
+    ENTITY_FAST_PATH_SKIP_MIN_CHARS: Optional[int] = 5
+
+    TRACING_ENABLED: Optional[bool] = False
+    TRACING_SERVICE_NAME: Optional[str] = "graph-rag"
+    TRACING_EXPORTER: Optional[str] = "file"
+    TRACING_OTLP_ENDPOINT: Optional[str] = "http://localhost:4318/v1/traces"
+    TRACING_FILE_PATH: Optional[str] = "traces/spans.jsonl"
+    TRACING_SAMPLE_RATIO: Optional[float] = 0.1
 
     PRIMARY_LANG: Optional[str] = None
     DEFAULT_LANG: str
@@ -7,8 +7,13 @@ from stores.llm.LLMProviderFactory import LLMProviderFactory
 from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
 from stores.llm.templates.template_parser import TemplateParser
 from models.Neo4jModel import Neo4jModel
+from models.GraphSnapshotModel import GraphSnapshotModel
+from models import GraphBackendEnums, EntityFastPathEnums
 from neo4j import AsyncGraphDatabase
-from utils.metrics import setup_metrics
+from utils.metrics import setup_metrics, mark_metrics_process_dead
+from utils.lru_cache import LRUCache
+from utils.query_entity_index import QueryEntityIndex
+from utils.tracing import setup_tracing, shutdown_tracing
 
 app = FastAPI(title="GraphRAG API")
 
@@ -26,6 +31,8 @@ async def startup_span():
 
     settings: Settings = get_settings()
 
+    app.tracer_provider = setup_tracing(settings)
+
     app.db_client = AsyncGraphDatabase.driver(
         settings.NEO4J_URI,
         auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD)
@@ -34,7 +41,24 @@ async def startup_span():
     llm_provider_factory = LLMProviderFactory(settings)
     vectordb_provider_factory = VectorDBProviderFactory(settings)
 
-    app.neo4j_model = await Neo4jModel.create_instance(app.db_client)
+    if settings.GRAPH_BACKEND == GraphBackendEnums.MEMORY.value:
+        app.neo4j_model = await GraphSnapshotModel.create_instance(
+            app.db_client,
+            refresh_seconds=settings.GRAPH_SNAPSHOT_REFRESH_SECONDS,
+            max_age_seconds=settings.GRAPH_SNAPSHOT_MAX_AGE_SECONDS
+        )
+    else:
+        app.neo4j_model = await Neo4jModel.create_instance(app.db_client)
+
+    # Entity names for the query fast path, loaded once per worker
+    app.query_entity_index = None
+    if settings.ENTITY_FAST_PATH_MODE != EntityFastPathEnums.OFF.value:
+        app.query_entity_index = QueryEntityIndex(
+            await app.neo4j_model.retrieve_nodes_with_id(),
+            normalize_arabic=settings.ENTITY_MATCH_NORMALIZE_ARABIC,
+            fuzzy_threshold=settings.ENTITY_FAST_PATH_FUZZY_THRESHOLD,
+            min_coverage=settings.ENTITY_FAST_PATH_MIN_COVERAGE
+        )
 
     app.generation_client = llm_provider_factory.create_provider(
         settings.GENERATION_BACKEND)
@@ -55,10 +79,17 @@ async def startup_span():
         default_language=settings.DEFAULT_LANG
     )
 
+    app.answer_cache = LRUCache(
+        name="answer", max_size=settings.QUERY_ANSWER_CACHE_SIZE)
+    app.query_embedding_cache = LRUCache(
+        name="query_embedding", max_size=settings.QUERY_EMBEDDING_CACHE_SIZE)
+
 async def shutdown_span():
     await app.db_client.close()
     await app.vectordb_client.disconnect()
     await app.vectordb_client.cache_disconnect()
+    shutdown_tracing(app.tracer_provider)
+    mark_metrics_process_dead()
 
 app.on_event("startup")(startup_span)
 app.on_event("shutdown")(shutdown_span)
@@ -0,0 +1,225 @@
+from .Neo4jModel import Neo4jModel
+from array import array
+import asyncio
+import time
+
+
+class GraphSnapshot:
+    """Immutable CSR adjacency of the Entity graph.
+
+    Node ids, names and relationship types are interned to integers. Every
+    relationship is stored in both directions; `outgoing` records the stored
+    direction. Each node's neighbours are sorted by ascending degree so the
+    fan-out cap keeps the most specific neighbours first.
+    """
+
+    def __init__(self, node_ids: list, node_names: list, edges: list, relationship_types: list, version):
+
+        self.node_ids = node_ids
+        self.node_names = node_names
+        self.node_index = {node_id: idx for idx, node_id in enumerate(node_ids)}
+        self.relationship_types = relationship_types
+        self.relationship_type_index = {rel_type: idx for idx, rel_type in enumerate(relationship_types)}
+        self.version = version
+        self.loaded_at = time.time()
+
+        node_count = len(node_ids)
+        degrees = [0] * node_count
+        for source, _, target in edges:
+            degrees[source] += 1
+            degrees[target] += 1
+
+        self.indptr = array("l", [0] * (node_count + 1))
+        for idx in range(node_count):
+            self.indptr[idx + 1] = self.indptr[idx] + degrees[idx]
+
+        self.neighbors = array("l", [0] * self.indptr[node_count])
+        self.edge_types = array("l", [0] * self.indptr[node_count])
+        self.outgoing = array("b", [0] * self.indptr[node_count])
+
+        cursor = list(self.indptr[:node_count])
+        for source, rel_type, target in edges:
+            for node, neighbor, is_outgoing in ((source, target, 1), (target, source, 0)):
+                position = cursor[node]
+                self.neighbors[position] = neighbor
+                self.edge_types[position] = rel_type
+                self.outgoing[position] = is_outgoing
+                cursor[node] += 1
+
+        for idx in range(node_count):
+            start, end = self.indptr[idx], self.indptr[idx + 1]
+            order = sorted(range(start, end), key=lambda k: degrees[self.neighbors[k]])
+            self.neighbors[start:end] = array("l", [self.neighbors[k] for k in order])
+            self.edge_types[start:end] = array("l", [self.edge_types[k] for k in order])
+            self.outgoing[start:end] = array("b", [self.outgoing[k] for k in order])
+
+    def degree(self, node: int) -> int:
+        return self.indptr[node + 1] - self.indptr[node]
+
+
+class GraphSnapshotModel(Neo4jModel):
+    """Neo4jModel whose neighbourhood reads are served from an in-process snapshot.
+
+    Writes still go to Neo4j. The snapshot is reloaded when the graph version
+    (node and relationship counts) changes, checked every `refresh_seconds`,
+    or unconditionally once it is older than `max_age_seconds`.
+    """
+
+    def __init__(self, db_client, refresh_seconds: int = 60, max_age_seconds: int = 3600):
+        super().__init__(db_client)
+        self.refresh_seconds = refresh_seconds
+        self.max_age_seconds = max_age_seconds
+        self.snapshot: GraphSnapshot = None
+        self.checked_at = 0.0
+        self.lock = asyncio.Lock()
+
+    @classmethod
+    async def create_instance(cls, db_client: object, refresh_seconds: int = 60, max_age_seconds: int = 3600):
+        instance = cls(db_client, refresh_seconds, max_age_seconds)
+        await instance.load_snapshot()
+        return instance
+
+    async def get_graph_version(self):
+
+        async with self.db_client.session() as session:
+            result = await session.run(
+                "MATCH (n:Entity) WITH count(n) AS nodes "
+                "OPTIONAL MATCH (:Entity)-[r:RELATIONSHIP]->(:Entity) "
+                "RETURN nodes, count(r) AS relationships"
+            )
+            record = await result.single()
+
+        return (record["nodes"], record["relationships"])
+
+    async def load_snapshot(self):
+
+        started_at = time.perf_counter()
+        version = await self.get_graph_version()
+
+        node_ids, node_names, node_index = [], [], {}
+        relationship_types, relationship_type_index = [], {}
+        edges = []
+
+        async with self.db_client.session() as session:
+
+            result = await session.run("MATCH (n:Entity) RETURN n.id AS id, n.name AS name")
+            async for record in result:
+                node_index[record["id"]] = len(node_ids)
+                node_ids.append(record["id"])
+                node_names.append(record["name"])
+
+            result = await session.run(
+                "MATCH (a:Entity)-[r:RELATIONSHIP]->(b:Entity) "
+                "RETURN a.id AS source, r.type AS type, b.id AS target"
+            )
+            async for record in result:
+                rel_type = record["type"]
+                if rel_type not in relationship_type_index:
+                    relationship_type_index[rel_type] = len(relationship_types)
+                    relationship_types.append(rel_type)
+
+                edges.append((
+                    node_index[record["source"]],
+                    relationship_type_index[rel_type],
+                    node_index[record["target"]]
+                ))
+
+        self.snapshot = GraphSnapshot(node_ids, node_names, edges, relationship_types, version)
+        self.checked_at = time.time()
+
+        self.logger.info(
+            f"Loaded graph snapshot with {len(node_ids)} nodes and {len(edges)} relationships "
+            f"in {time.perf_counter() - started_at:.2f}s"
+        )
+
+    async def refresh_if_stale(self):
+
+        now = time.time()
+        if now - self.checked_at < self.refresh_seconds:
+            return
+
+        async with self.lock:
+            if now - self.checked_at < self.refresh_seconds:
+                return
+
+            try:
+                expired = now - self.snapshot.loaded_at >= self.max_age_seconds
+                if expired or await self.get_graph_version() != self.snapshot.version:
+                    await self.load_snapshot()
+                else:
+                    self.checked_at = now
+            except Exception as e:
+                # Keep serving the previous snapshot if Neo4j is unreachable
+                self.logger.error(f"Error while refreshing graph snapshot: {e}")
+                self.checked_at = now
+
+    async def fetch_related_graph(self, entity_ids, max_depth: int = 2, max_fanout: int = 25,
+                                  max_degree: int = 100, relationship_types: list = None,
+                                  max_rows: int = 300, max_bytes: int = 16000):
+
+        await self.refresh_if_stale()
+
+        snapshot = self.snapshot
+        indptr, neighbors, edge_types, outgoing = snapshot.indptr, snapshot.neighbors, snapshot.edge_types, snapshot.outgoing
+        names, types = snapshot.node_names, snapshot.relationship_types
+
+        allowed_types = None
+        if relationship_types:
+            allowed_types = {
+                snapshot.relationship_type_index[rel_type]
+                for rel_type in relationship_types
+                if rel_type in snapshot.relationship_type_index
+            }
+
+        subgraph = []
+        seen_edges = set()
+        frontier = [snapshot.node_index[entity_id] for entity_id in entity_ids if entity_id in snapshot.node_index]
+        visited = set(frontier)
+        used_bytes = 0
+
+        for depth in range(1, max_depth + 1):
+
+            if not frontier or len(subgraph) >= max_rows or used_bytes >= max_bytes:
+                break
+
+            next_frontier = []
+
+            for node in frontier:
+                taken = 0
+
+                for position in range(indptr[node], indptr[node + 1]):
+                    if taken >= max_fanout:
+                        break
+
+                    rel_type = edge_types[position]
+                    if allowed_types is not None and rel_type not in allowed_types:
+                        continue
+
+                    taken += 1
+                    neighbor = neighbors[position]
+                    source, target = (node, neighbor) if outgoing[position] else (neighbor, node)
+
+                    edge_key = (source, rel_type, target)
+                    if edge_key not in seen_edges:
+                        edge_bytes = len(f"{names[source]}{types[rel_type]}{names[target]}".encode("utf-8"))
+                        if used_bytes + edge_bytes > max_bytes or len(subgraph) >= max_rows:
+                            return subgraph
+
+                        seen_edges.add(edge_key)
+                        used_bytes += edge_bytes
+                        subgraph.append({
+                            "source": names[source],
+                            "relationship": types[rel_type],
+                            "target": names[target],
+                            "depth": depth,
+                            "degree": snapshot.degree(neighbor)
+                        })
+
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        if snapshot.degree(neighbor) <= max_degree:
+                            next_frontier.append(neighbor)
+
+            frontier = next_frontier
+
+        return subgraph
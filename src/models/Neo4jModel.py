@@ -1,15 +1,52 @@
+from opentelemetry import trace
+from utils.tracing import get_tracer
+import hashlib
+import logging
+import time
+
+tracer = get_tracer(__name__)
+
 class Neo4jModel:
     
     def __init__(self, db_client):
         self.db_client = db_client        
+        self.logger = logging.getLogger(__name__)
 
     @classmethod
     async def create_instance(cls, db_client: object):
         instance = cls(db_client)
         return instance
     
+    async def create_schema(self):
+
+        async with self.db_client.session() as session:
+            await session.run(
+                "CREATE CONSTRAINT entity_id_unique IF NOT EXISTS "
+                "FOR (n:Entity) REQUIRE n.id IS UNIQUE"
+            )
+            await session.run(
+                "CREATE INDEX entity_name_index IF NOT EXISTS "
+                "FOR (n:Entity) ON (n.name)"
+            )
+
+    def log_ingest_rate(self, method: str, rows: int, started_at: float):
+
+        elapsed = time.perf_counter() - started_at
+        rows_per_second = rows / elapsed if elapsed > 0 else float(rows)
+        self.logger.info(
+            f"{method}: wrote {rows} rows in {elapsed:.2f}s ({rows_per_second:.1f} rows/s)"
+        )
+
+        return {
+            "rows": rows,
+            "seconds": elapsed,
+            "rows_per_second": rows_per_second
+        }
+    
     async def ingest_to_neo4j(self, nodes, relationships):
 
+        started_at = time.perf_counter()
+
         async with self.db_client.session() as session:
 
             for node_name, node_id in nodes.items():
@@ -28,48 +65,265 @@ class Neo4jModel:
                 type = relationship["relationship"]
                 )
 
+        self.log_ingest_rate("ingest_to_neo4j", len(nodes) + len(relationships), started_at)
+
+        return nodes
+
+    @staticmethod
+    @tracer.start_as_current_span("neo4j.merge_nodes_batch", attributes={"db.system": "neo4j"})
+    async def merge_nodes_batch(tx, rows):
+        trace.get_current_span().set_attribute("db.operation.batch.size", len(rows))
+        result = await tx.run(
+            "UNWIND $rows AS row "
+            "MERGE (n:Entity {id: row.id}) "
+            "SET n.name = row.name",
+            rows=rows
+        )
+        await result.consume()
+
+    @staticmethod
+    @tracer.start_as_current_span("neo4j.merge_relationships_batch", attributes={"db.system": "neo4j"})
+    async def merge_relationships_batch(tx, rows):
+        trace.get_current_span().set_attribute("db.operation.batch.size", len(rows))
+        result = await tx.run(
+            "UNWIND $rows AS row "
+            "MATCH (a:Entity {id: row.source}) "
+            "MATCH (b:Entity {id: row.target}) "
+            "MERGE (a)-[:RELATIONSHIP {type: row.type}]->(b)",
+            rows=rows
+        )
+        await result.consume()
+
+    @staticmethod
+    @tracer.start_as_current_span("neo4j.delete_nodes_batch", attributes={"db.system": "neo4j"})
+    async def delete_nodes_batch(tx, node_ids):
+        trace.get_current_span().set_attribute("db.operation.batch.size", len(node_ids))
+        result = await tx.run(
+            "UNWIND $node_ids AS node_id "
+            "MATCH (n:Entity {id: node_id}) "
+            "DETACH DELETE n",
+            node_ids=node_ids
+        )
+        await result.consume()
+
+    @staticmethod
+    @tracer.start_as_current_span("neo4j.delete_relationships_batch", attributes={"db.system": "neo4j"})
+    async def delete_relationships_batch(tx, rows):
+        trace.get_current_span().set_attribute("db.operation.batch.size", len(rows))
+        result = await tx.run(
+            "UNWIND $rows AS row "
+            "MATCH (a:Entity {id: row.source})-[r:RELATIONSHIP {type: row.type}]->(b:Entity {id: row.target}) "
+            "DELETE r",
+            rows=rows
+        )
+        await result.consume()
+
+    async def prune_stale_graph(self, session, node_rows: list, relationship_rows: list, batch_size: int = 1000):
+        """Delete the entities and relationships that are in Neo4j but not in this ingest."""
+        node_ids = {row["id"] for row in node_rows}
+        relationship_keys = {(row["source"], row["type"], row["target"]) for row in relationship_rows}
+
+        result = await session.run("MATCH (n:Entity) RETURN n.id AS id")
+        stale_node_ids = [record["id"] async for record in result if record["id"] not in node_ids]
+
+        # Relationships of stale nodes go with their DETACH DELETE
+        result = await session.run(
+            "MATCH (a:Entity)-[r:RELATIONSHIP]->(b:Entity) "
+            "RETURN a.id AS source, r.type AS type, b.id AS target"
+        )
+        stale_relationship_rows = [
+            {"source": record["source"], "type": record["type"], "target": record["target"]}
+            async for record in result
+            if (record["source"], record["type"], record["target"]) not in relationship_keys
+            and record["source"] in node_ids and record["target"] in node_ids
+        ]
+
+        for start_idx in range(0, len(stale_relationship_rows), batch_size):
+            await session.execute_write(
+                self.delete_relationships_batch,
+                stale_relationship_rows[start_idx: start_idx + batch_size]
+            )
+
+        for start_idx in range(0, len(stale_node_ids), batch_size):
+            await session.execute_write(
+                self.delete_nodes_batch,
+                stale_node_ids[start_idx: start_idx + batch_size]
+            )
+
+        self.logger.info(
+            f"Pruned {len(stale_node_ids)} stale nodes and {len(stale_relationship_rows)} stale relationships"
+        )
+
+        return len(stale_node_ids), len(stale_relationship_rows)
+
+    async def bulk_ingest_to_neo4j(self, nodes, relationships, batch_size: int = 1000, prune: bool = False):
+        """MERGE `nodes` and `relationships` in batches.
+
+        With `prune`, the graph is made to mirror this ingest: entities and
+        relationships no longer extracted from the source are deleted.
+        """
+
+        started_at = time.perf_counter()
+
+        node_rows = [
+            {"id": node_id, "name": node_name}
+            for node_name, node_id in nodes.items()
+        ]
+        relationship_rows = [
+            {
+                "source": relationship["source"],
+                "target": relationship["target"],
+                "type": relationship["relationship"]
+            }
+            for relationship in relationships
+        ]
+
+        async with self.db_client.session() as session:
+
+            for start_idx in range(0, len(node_rows), batch_size):
+                await session.execute_write(
+                    self.merge_nodes_batch,
+                    node_rows[start_idx: start_idx + batch_size]
+                )
+
+            for start_idx in range(0, len(relationship_rows), batch_size):
+                await session.execute_write(
+                    self.merge_relationships_batch,
+                    relationship_rows[start_idx: start_idx + batch_size]
+                )
+
+            if prune:
+                _ = await self.prune_stale_graph(session, node_rows, relationship_rows, batch_size=batch_size)
+
+        self.log_ingest_rate("bulk_ingest_to_neo4j", len(node_rows) + len(relationship_rows), started_at)
+
         return nodes
         
+    @tracer.start_as_current_span("neo4j.retrieve_nodes_with_id", attributes={"db.system": "neo4j"})
     async def retrieve_nodes_with_id(self):
         async with self.db_client.session() as session:
             result = await session.run("MATCH (n) RETURN n.id AS uuid, n.name AS name")
 
             nodes = {record["name"]: record["uuid"] async for record in result}
-            
+
+        trace.get_current_span().set_attribute("db.response.returned_rows", len(nodes))
         return nodes
         
-    async def fetch_related_graph(self, entity_ids):
+    @tracer.start_as_current_span("neo4j.fetch_graph_fingerprint", attributes={"db.system": "neo4j"})
+    async def fetch_graph_fingerprint(self) -> str:
+        """Order-independent hash of every `(source, type, target)` relationship, names included."""
+        fingerprint, relationship_count = 0, 0
+
+        async with self.db_client.session() as session:
+            result = await session.run(
+                "MATCH (a:Entity)-[r:RELATIONSHIP]->(b:Entity) "
+                "RETURN a.id AS source_id, a.name AS source, r.type AS type, b.id AS target_id, b.name AS target"
+            )
+
+            # Summing per-edge hashes streams the graph without sorting it
+            async for record in result:
+                edge = "\x1f".join(str(record[key]) for key in ("source_id", "source", "type", "target_id", "target"))
+                fingerprint += int.from_bytes(hashlib.sha256(edge.encode("utf-8")).digest()[:16], "big")
+                relationship_count += 1
+
+        trace.get_current_span().set_attribute("db.response.returned_rows", relationship_count)
+        return f"{relationship_count}:{fingerprint % (1 << 128):032x}"
 
+    @tracer.start_as_current_span("neo4j.fetch_related_graph", attributes={"db.system": "neo4j"})
+    async def fetch_related_graph(self, entity_ids, max_depth: int = 2, max_fanout: int = 25,
+                                  max_degree: int = 100, relationship_types: list = None,
+                                  max_rows: int = 300, max_bytes: int = 16000):
+        """Breadth-first expansion from `entity_ids` with per-hop and total budgets.
+
+        Each hop keeps at most `max_fanout` neighbours per node (lowest degree
+        first); nodes with more than `max_degree` relationships are kept as
+        leaves but never expanded. Expansion stops once `max_rows` edges or
+        `max_bytes` of names/types have been collected.
+        """
         query = """
-        MATCH (e:Entity)-[r1]-(n1)-[r2]-(n2)
-        WHERE e.id IN $entity_ids
-        RETURN e, r1 as r, n1 as related, r2, n2
-        UNION
-        MATCH (e:Entity)-[r]-(related)
-        WHERE e.id IN $entity_ids
-        RETURN e, r, related, null as r2, null as n2
+        UNWIND $frontier AS source_id
+        MATCH (e:Entity {id: source_id})-[r:RELATIONSHIP]-(n:Entity)
+        WHERE $relationship_types IS NULL OR r.type IN $relationship_types
+        WITH e, r, n, COUNT { (n)--() } AS degree
+        ORDER BY degree ASC
+        WITH e, collect({
+            type: r.type, id: n.id, name: n.name,
+            degree: degree, outgoing: startNode(r) = e
+        })[..$max_fanout] AS neighbors
+        UNWIND neighbors AS neighbor
+        RETURN e.id AS source_id, e.name AS source_name,
+               neighbor.type AS type, neighbor.id AS target_id,
+               neighbor.name AS target_name, neighbor.degree AS degree,
+               neighbor.outgoing AS outgoing
+        LIMIT $row_limit
         """
         subgraph = []
+        seen_edges = set()
+        visited = set(entity_ids)
+        frontier = list(entity_ids)
+        used_bytes = 0
+        hops = 0
+        budget_exhausted = False
 
         async with self.db_client.session() as session:
-            result = await session.run(query, entity_ids=entity_ids)
 
-            async for record in result:
-                subgraph.append({
-                    "entity": record["e"],
-                    "relationship": record["r"],
-                    "related_node": record["related"]
-                })
-                if record["r2"] and record["n2"]:
-                    subgraph.append({
-                        "entity": record["related"],
-                        "relationship": record["r2"],
-                        "related_node": record["n2"]
-                    })
-        return subgraph
-    
+            for depth in range(1, max_depth + 1):
 
-    
+                if not frontier or budget_exhausted or len(subgraph) >= max_rows or used_bytes >= max_bytes:
+                    break
+
+                hops += 1
+                result = await session.run(
+                    query,
+                    frontier=frontier,
+                    relationship_types=relationship_types or None,
+                    max_fanout=max_fanout,
+                    row_limit=max_rows - len(subgraph)
+                )
+
+                next_frontier = []
+
+                async for record in result:
+                    if record["outgoing"]:
+                        source, target = record["source_name"], record["target_name"]
+                        edge_key = (record["source_id"], record["type"], record["target_id"])
+                    else:
+                        source, target = record["target_name"], record["source_name"]
+                        edge_key = (record["target_id"], record["type"], record["source_id"])
+
+                    if edge_key not in seen_edges:
+                        edge_bytes = len(f"{source}{record['type']}{target}".encode("utf-8"))
+                        if used_bytes + edge_bytes > max_bytes or len(subgraph) >= max_rows:
+                            # No further hop either, as in GraphSnapshotModel
+                            budget_exhausted = True
+                            break
 
+                        seen_edges.add(edge_key)
+                        used_bytes += edge_bytes
+                        subgraph.append({
+                            "source": source,
+                            "relationship": record["type"],
+                            "target": target,
+                            "depth": depth,
+                            "degree": record["degree"]
+                        })
 
+                    target_id = record["target_id"]
+                    if target_id not in visited:
+                        visited.add(target_id)
+                        # Hubs stay in the context but are not expanded further
+                        if record["degree"] <= max_degree:
+                            next_frontier.append(target_id)
 
+                await result.consume()
+                frontier = next_frontier
+
+        trace.get_current_span().set_attributes({
+            "graph.seed_entities": len(entity_ids),
+            "graph.hops": hops,
+            "graph.visited_nodes": len(visited),
+            "graph.context_bytes": used_bytes,
+            "db.response.returned_rows": len(subgraph)
+        })
+
+        return subgraph
@@ -1 +1,3 @@
-from .enums.ResponseEnumeration import ResponseEnumeration
\ No newline at end of file
+from .enums.ResponseEnumeration import ResponseEnumeration
+from .enums.GraphBackendEnums import GraphBackendEnums
+from .enums.EntityFastPathEnums import EntityFastPathEnums
\ No newline at end of file
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class EntityFastPathEnums(Enum):
+    OFF = "off"
+    SKIP = "skip"
+    PARALLEL = "parallel"
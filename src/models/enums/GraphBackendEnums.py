@@ -0,0 +1,5 @@
+from enum import Enum
+
+class GraphBackendEnums(Enum):
+    NEO4J = "neo4j"
+    MEMORY = "memory"
@@ -5,5 +5,6 @@ class ResponseEnumeration(Enum):
     VECTORDB_SEARCH_SUCCESS = "vectordb_search_success"
     RAG_ANSWER_ERROR = "rag_answer_error"
     RAG_ANSWER_SUCCESS = "rag_answer_success"
+    RAG_ANSWER_STREAMING = "rag_answer_streaming"
     CACHE_ANSWER_ERROR = "cache_answer_error"
     CACHE_ANSWER_SUCCESS = "cache_answer_success"
\ No newline at end of file
@@ -2,11 +2,21 @@ import asyncio
 from controllers import NLPController, ProcessController
 from helpers import get_settings, Settings
 from stores.llm.LLMProviderFactory import LLMProviderFactory
+from stores.llm.EmbeddingBatcher import EmbeddingBatcher
 from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
 from stores.llm.templates.template_parser import TemplateParser
 from models.Neo4jModel import Neo4jModel
+from stores.cache import EmbeddingCache, ExtractionCache
+from stores.vectordb.VectorDBEnums import VectorDBEnums
+from utils.sparse_encoding import SparseEncoderPool
+from utils.sentence_spool import SentenceSpool
+from utils.tracing import setup_tracing, shutdown_tracing
+from utils.token_usage import start_token_usage
 from neo4j import AsyncGraphDatabase
+import hashlib
 import logging
+import time
+import os
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,6 +24,7 @@ logger = logging.getLogger(__name__)
 class Pipeline:
     def __init__(self):
         self.settings: Settings = get_settings()
+        self.tracer_provider = setup_tracing(self.settings)
 
         # Neo4j async driver
         self.db_client = AsyncGraphDatabase.driver(
@@ -38,6 +49,16 @@ class Pipeline:
             self.settings.EMBEDDING_MODEL_ID,
             self.settings.EMBEDDING_MODEL_DIMENSION
         )
+        self.embedding_batcher = EmbeddingBatcher(
+            self.embedding_client,
+            provider=self.settings.EMBEDDING_BACKEND,
+            max_texts=self.settings.EMBEDDING_MAX_BATCH_TEXTS,
+            max_tokens=self.settings.EMBEDDING_MAX_BATCH_TOKENS,
+            requests_per_minute=self.settings.EMBEDDING_REQUESTS_PER_MINUTE,
+            tokens_per_minute=self.settings.EMBEDDING_TOKENS_PER_MINUTE,
+            max_retries=self.settings.EMBEDDING_MAX_RETRIES,
+            target_latency_seconds=self.settings.EMBEDDING_TARGET_LATENCY_SECONDS
+        )
 
         self.vectordb_client = vectordb_provider_factory.create(
             self.settings.VECTOR_DB_BACKEND
@@ -50,6 +71,33 @@ class Pipeline:
         )
         self.process_controller = ProcessController()
 
+        self.extraction_cache: ExtractionCache | None = None
+        if self.settings.EXTRACTION_CACHE_ENABLED:
+            self.extraction_cache = ExtractionCache(
+                db_path=os.path.join(
+                    self.process_controller.get_cache_path("extractions"),
+                    "extractions.sqlite3"
+                )
+            )
+        self.process_controller.extraction_cache = self.extraction_cache
+
+        self.embedding_cache: EmbeddingCache | None = None
+        if self.settings.EMBEDDING_CACHE_ENABLED:
+            self.embedding_cache = EmbeddingCache(
+                db_path=os.path.join(
+                    self.process_controller.get_cache_path("embeddings"),
+                    "embeddings.sqlite3"
+                )
+            )
+
+        # BM25 encoding in worker processes, only Qdrant consumes pre-encoded sparse vectors
+        self.sparse_encoder: SparseEncoderPool | None = None
+        if self.settings.INDEXING_SPARSE_WORKERS and self.settings.VECTOR_DB_BACKEND == VectorDBEnums.QDRANT.value:
+            self.sparse_encoder = SparseEncoderPool(workers=self.settings.INDEXING_SPARSE_WORKERS)
+
+        # Sentences read during extraction, reused by indexing in the same run
+        self.sentence_spool: SentenceSpool | None = None
+
         # Lazy init
         self.neo4j_model: Neo4jModel | None = None
         self.nlp_controller: NLPController | None = None
@@ -57,31 +105,84 @@ class Pipeline:
     async def close(self):
         """Close all async connections properly."""
         await self.vectordb_client.disconnect()
+        await self.vectordb_client.cache_disconnect()
         await self.db_client.close()
+        if self.embedding_cache:
+            self.embedding_cache.disconnect()
+        if self.extraction_cache:
+            self.extraction_cache.disconnect()
+        if self.sparse_encoder:
+            self.sparse_encoder.close()
+        shutdown_tracing(self.tracer_provider)
+
+    # ----------------- SOURCE -----------------
+    def create_sentence_spool(self, source: str, pattern: str = None):
+
+        spool_name = hashlib.sha256(f"{source}:{pattern}".encode("utf-8")).hexdigest()[:16]
+        return SentenceSpool(
+            os.path.join(self.process_controller.get_cache_path("spool"), f"{spool_name}.txt")
+        )
+
+    def get_sentences(self, source: str, pattern: str = None):
+        """Sentences of `source`, read from disk only if extraction has not already spooled them."""
+        spool = self.sentence_spool
+        if spool is None or spool.path != self.create_sentence_spool(source, pattern).path or not spool.exists():
+            spool = self.create_sentence_spool(source, pattern).write(
+                self.process_controller.iter_source_lines(source, pattern)
+            )
+            self.sentence_spool = spool
+
+        return spool
 
     # ----------------- ENTITY EXTRACTION -----------------
-    async def entity_extraction_pipeline(self, file_path: str = "desiease.txt"):
-        """Load file, extract entities and relationships, ingest into Neo4j."""
+    async def entity_extraction_pipeline(self, source: str = "desiease.txt", pattern: str = None):
+        """Stream source files, extract entities and relationships, ingest into Neo4j.
+
+        Returns the ingested `{name: id}` nodes, empty when the source has no lines.
+        """
         self.neo4j_model = await Neo4jModel.create_instance(self.db_client)
+        if self.extraction_cache:
+            self.extraction_cache.connect()
+
+        spool = self.create_sentence_spool(source, pattern)
+        lines = spool.tee(self.process_controller.iter_source_lines(source, pattern))
+        chunks = self.process_controller.iter_chunks(lines, max_tokens=self.settings.EXTRACTION_CHUNK_MAX_TOKENS)
 
-        documents = self.process_controller.load_txt_file(file_path)
-        if not documents:
-            logger.warning(f"No documents found in {file_path}")
-            return [], []
+        nodes, relationships, stats = await self.process_controller.extract_entity_relationship_streaming(
+            chunks,
+            concurrency=self.settings.EXTRACTION_CONCURRENCY
+        )
+        self.sentence_spool = spool
+
+        if not stats["chunks"]:
+            logger.warning(f"No documents found in {source}")
+            return {}
 
-        content = documents[0].page_content
-        nodes, relationships = self.process_controller.extract_entity_relationship(content)
+        # A failed chunk would read as removed entities, so only a complete extraction prunes
+        prune = self.settings.INCREMENTAL_INDEXING and not stats["failed_chunks"]
+        if self.settings.INCREMENTAL_INDEXING and not prune:
+            logger.warning(f"{len(stats['failed_chunks'])} chunks failed, stale graph data is not pruned")
 
-        ingested_nodes = await self.neo4j_model.ingest_to_neo4j(nodes, relationships)
+        await self.neo4j_model.create_schema()
+        ingested_nodes = await self.neo4j_model.bulk_ingest_to_neo4j(
+            nodes, relationships,
+            batch_size=self.settings.NEO4J_INGEST_BATCH_SIZE,
+            prune=prune
+        )
         logger.info(f"Ingested {len(nodes)} nodes and {len(relationships)} relationships into Neo4j")
         return ingested_nodes
 
     # ----------------- VECTOR DB INDEXING -----------------
-    async def pipeline_indexing(self, file_path: str = "desiease.txt"):
+    async def pipeline_indexing(self, source: str = "desiease.txt", pattern: str = None):
         """Split sentences, retrieve node IDs, and index into vector DB."""
         # Connect to VectorDB
         await self.vectordb_client.connect()
         await self.vectordb_client.cache_connect()
+        if self.embedding_cache:
+            self.embedding_cache.connect()
+        if self.sparse_encoder:
+            self.sparse_encoder.start()
+        started_at = time.time()
 
         # Ensure Neo4j instance
         if self.neo4j_model is None:
@@ -93,25 +194,36 @@ class Pipeline:
             embedding_client=self.embedding_client,
             generation_client=self.generation_client,
             template_parser=self.template_parser,
-            neo4j_model=self.neo4j_model
+            neo4j_model=self.neo4j_model,
+            embedding_cache=self.embedding_cache,
+            sparse_encoder=self.sparse_encoder,
+            embedding_batcher=self.embedding_batcher
         )
 
-        # Load and split sentences
-        documents = self.process_controller.load_txt_file(file_path)
-        if not documents:
-            logger.warning(f"No documents found in {file_path}")
+        # Sentences stream from the spool, the source is not read again
+        sentences = self.get_sentences(source, pattern)
+        if not len(sentences):
+            logger.warning(f"No documents found in {source}")
             return {}
 
-        sentences = self.process_controller.sentence_splitting(documents[0].page_content)
         logger.info(f"Total sentences to index: {len(sentences)}")
 
-        # Retrieve node IDs
+        # Retrieve node IDs, and the relationships fingerprint for the index version
         node_id_mapping = await self.neo4j_model.retrieve_nodes_with_id()
+        graph_fingerprint = await self.neo4j_model.fetch_graph_fingerprint()
 
         # Index sentences into vector DB
-        success = await self.nlp_controller.index_into_vector_db(sentences, node_id_mapping)
+        success = await self.nlp_controller.index_into_vector_db(
+            sentences, node_id_mapping,
+            batch_size=self.settings.INDEXING_BATCH_SIZE,
+            incremental=self.settings.INCREMENTAL_INDEXING,
+            graph_fingerprint=graph_fingerprint
+        )
+        logger.info(f"Embedding stats: {self.embedding_batcher.stats()}")
         if success:
             logger.info("VectorDB indexing completed successfully")
+            if self.embedding_cache and self.settings.EMBEDDING_CACHE_COMPACT:
+                self.embedding_cache.compact(unused_since=started_at)
         else:
             logger.error("VectorDB indexing failed")
 
@@ -120,13 +232,25 @@ class Pipeline:
 # ----------------- MAIN -----------------
 async def main():
     pipeline = Pipeline()
+    token_usage = start_token_usage()
     try:
+        source = pipeline.settings.INGEST_SOURCE
+        pattern = pipeline.settings.INGEST_GLOB
+
         # Step 1: Extract entities
-        await pipeline.entity_extraction_pipeline("desiease.txt")
+        await pipeline.entity_extraction_pipeline(source, pattern)
 
         # Step 2: Index sentences into vector DB
-        node_id_mapping = await pipeline.pipeline_indexing("desiease.txt")
+        node_id_mapping = await pipeline.pipeline_indexing(source, pattern)
         logger.info(f"Node ID mapping retrieved: {len(node_id_mapping)} nodes")
+
+        usage = token_usage.as_dict()
+        logger.info(
+            f"LLM usage: {usage['input_tokens']} input / {usage['output_tokens']} output tokens, "
+            f"cost: {usage['cost_usd'] if usage['cost_usd'] is not None else 'n/a'} USD"
+        )
+        for entry in usage["calls"]:
+            logger.info(f"LLM usage by endpoint: {entry}")
     finally:
         # Close all async connections
         await pipeline.close()
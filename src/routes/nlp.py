@@ -1,8 +1,13 @@
 import logging
-from fastapi.responses import JSONResponse
+import json
+from fastapi.responses import JSONResponse, StreamingResponse
 from controllers import NLPController
 from schemes.NLP import SearchRequest
 from models import ResponseEnumeration
+from utils.stage_timing import start_stage_timings
+from utils.token_usage import start_token_usage
+from utils.tracing import get_tracer
+from opentelemetry import trace
 from fastapi import APIRouter, Request
 
 nlp_router = APIRouter(
@@ -11,18 +16,47 @@ nlp_router = APIRouter(
 )
 
 logger = logging.getLogger("uvicorn.error")
+tracer = get_tracer(__name__)
 
-@nlp_router.get("/index/info")
-async def get_project_index_info(request: Request):
+def get_nlp_controller(request: Request):
 
-    nlp_controller = NLPController(
+    return NLPController(
         vector_db_client=request.app.vectordb_client,
         embedding_client=request.app.embedding_client,
         generation_client=request.app.generation_client,
         template_parser=request.app.template_parser,
-        neo4j_model=request.app.neo4j_model
+        neo4j_model=request.app.neo4j_model,
+        answer_cache=request.app.answer_cache,
+        query_embedding_cache=request.app.query_embedding_cache,
+        query_entity_index=request.app.query_entity_index
     )
 
+def format_sse(event: str, data: dict):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def set_request_attributes(search_request: SearchRequest):
+
+    trace.get_current_span().set_attributes({
+        "graph_rag.query_chars": len(search_request.text),
+        "graph_rag.limit": search_request.limit,
+        "graph_rag.retrieval_profile": search_request.profile or ""
+    })
+
+def add_diagnostics(content: dict, search_request: SearchRequest, stage_timings, token_usage):
+
+    if search_request.debug_timings:
+        content["debug_timings"] = stage_timings.as_dict()
+
+    if search_request.include_usage:
+        content["usage"] = token_usage.as_dict()
+
+    return content
+
+@nlp_router.get("/index/info")
+async def get_project_index_info(request: Request):
+
+    nlp_controller = get_nlp_controller(request)
+
     collection_info = await nlp_controller.get_vector_db_collection_info()
 
     return JSONResponse(
@@ -34,19 +68,18 @@ async def get_project_index_info(request: Request):
     )
 
 @nlp_router.post("/index/search")
+@tracer.start_as_current_span("POST /index/search")
 async def search_index(request: Request, search_request: SearchRequest):
 
-    nlp_controller = NLPController(
-        vector_db_client=request.app.vectordb_client,
-        embedding_client=request.app.embedding_client,
-        generation_client=request.app.generation_client,
-        template_parser=request.app.template_parser,
-        neo4j_model=request.app.neo4j_model
-    )
+    nlp_controller = get_nlp_controller(request)
+    stage_timings = start_stage_timings()
+    token_usage = start_token_usage()
+    set_request_attributes(search_request)
 
     results = await nlp_controller.search_vector_db_collection(
         query=search_request.text,
-        limit=search_request.limit
+        limit=search_request.limit,
+        profile=search_request.profile
     )
 
     if not results:
@@ -59,22 +92,32 @@ async def search_index(request: Request, search_request: SearchRequest):
 
     return JSONResponse(
         status_code=200,
-        content={
+        content=add_diagnostics({
             "signal": ResponseEnumeration.VECTORDB_SEARCH_SUCCESS.value,
             "results": [result.dict() for result in results]
-        }
+        }, search_request, stage_timings, token_usage)
     )
 
 @nlp_router.post("/index/answer")
+@tracer.start_as_current_span("POST /index/answer")
 async def answer_rag(request: Request, search_request: SearchRequest):
 
-    nlp_controller = NLPController(
-        vector_db_client=request.app.vectordb_client,
-        embedding_client=request.app.embedding_client,
-        generation_client=request.app.generation_client,
-        template_parser=request.app.template_parser,
-        neo4j_model=request.app.neo4j_model
-    )
+    nlp_controller = get_nlp_controller(request)
+    stage_timings = start_stage_timings()
+    token_usage = start_token_usage()
+    set_request_attributes(search_request)
+
+    # Exact-match tier skips the embedding call entirely
+    cache_answer = await nlp_controller.retrieve_answer_from_query_cache(query=search_request.text)
+
+    if cache_answer:
+        return JSONResponse(
+            status_code=200,
+            content=add_diagnostics({
+                "signal": ResponseEnumeration.CACHE_ANSWER_SUCCESS.value,
+                "answer_from_cache": cache_answer
+            }, search_request, stage_timings, token_usage)
+        )
 
     query_vector = await nlp_controller.query_embeddings(
         text=search_request.text
@@ -84,17 +127,19 @@ async def answer_rag(request: Request, search_request: SearchRequest):
     cache_answer = await nlp_controller.retrieve_answer_from_cache(query_vector=query_vector)
 
     if cache_answer:
+        await nlp_controller.add_answer_into_query_cache(query=search_request.text, answer=cache_answer)
         return JSONResponse(
             status_code=200,
-            content={
+            content=add_diagnostics({
                 "signal": ResponseEnumeration.CACHE_ANSWER_SUCCESS.value,
                 "answer_from_cache": cache_answer
-            }
+            }, search_request, stage_timings, token_usage)
         )
 
     answer, full_prompt, chat_history = await nlp_controller.graph_rag_answer_question(
         query=search_request.text,
-        limit=search_request.limit
+        limit=search_request.limit,
+        profile=search_request.profile
     )
 
     if not answer:
@@ -109,14 +154,117 @@ async def answer_rag(request: Request, search_request: SearchRequest):
         query_vector=query_vector,
         answer=answer
     )
+    await nlp_controller.add_answer_into_query_cache(query=search_request.text, answer=answer)
 
     return JSONResponse(
         status_code=200,
-        content={
+        content=add_diagnostics({
             "signal": ResponseEnumeration.RAG_ANSWER_SUCCESS.value,
             "answer": answer,
             "full_prompt": full_prompt,
             "chat_history": chat_history
+        }, search_request, stage_timings, token_usage)
+    )
+
+@nlp_router.post("/index/answer/stream")
+@tracer.start_as_current_span("POST /index/answer/stream")
+async def answer_rag_stream(request: Request, search_request: SearchRequest):
+
+    nlp_controller = get_nlp_controller(request)
+    stage_timings = start_stage_timings()
+    token_usage = start_token_usage()
+    set_request_attributes(search_request)
+
+    # The body is streamed after this handler returns, its span hangs off the request span
+    request_context = trace.set_span_in_context(trace.get_current_span())
+
+    query_vector = None
+    cache_answer = await nlp_controller.retrieve_answer_from_query_cache(query=search_request.text)
+
+    if not cache_answer:
+        query_vector = await nlp_controller.query_embeddings(
+            text=search_request.text
+        )
+        cache_answer = await nlp_controller.retrieve_answer_from_cache(query_vector=query_vector)
+
+        if cache_answer:
+            await nlp_controller.add_answer_into_query_cache(query=search_request.text, answer=cache_answer)
+
+    async def event_stream():
+
+        if cache_answer:
+            yield format_sse("metadata", {
+                "signal": ResponseEnumeration.CACHE_ANSWER_SUCCESS.value,
+                "from_cache": True
+            })
+            yield format_sse("token", {"text": cache_answer})
+            yield format_sse("done", add_diagnostics({
+                "signal": ResponseEnumeration.CACHE_ANSWER_SUCCESS.value
+            }, search_request, stage_timings, token_usage))
+            return
+
+        full_prompt, chat_history, retrieved_graph_components = await nlp_controller.build_graph_rag_prompt(
+            query=search_request.text,
+            limit=search_request.limit,
+            profile=search_request.profile
+        )
+
+        if not full_prompt:
+            yield format_sse("error", {
+                "signal": ResponseEnumeration.RAG_ANSWER_ERROR.value
+            })
+            return
+
+        yield format_sse("metadata", {
+            "signal": ResponseEnumeration.RAG_ANSWER_STREAMING.value,
+            "from_cache": False,
+            "results": [result.dict() for result in retrieved_graph_components],
+            "full_prompt": full_prompt,
+            "chat_history": chat_history
+        })
+
+        tokens = []
+        try:
+            async for token in nlp_controller.graph_rag_answer_stream(full_prompt, chat_history):
+                tokens.append(token)
+                yield format_sse("token", {"text": token})
+        except Exception as e:
+            # A truncated answer is neither cached nor reported as done
+            logger.error(f"Error while streaming answer: {e}")
+            yield format_sse("error", {
+                "signal": ResponseEnumeration.RAG_ANSWER_ERROR.value
+            })
+            return
+
+        answer = "".join(tokens)
+
+        if not answer:
+            yield format_sse("error", {
+                "signal": ResponseEnumeration.RAG_ANSWER_ERROR.value
+            })
+            return
+
+        _ = await nlp_controller.add_answer_into_cache(
+            query_vector=query_vector,
+            answer=answer
+        )
+        await nlp_controller.add_answer_into_query_cache(query=search_request.text, answer=answer)
+
+        yield format_sse("done", add_diagnostics({
+            "signal": ResponseEnumeration.RAG_ANSWER_SUCCESS.value
+        }, search_request, stage_timings, token_usage))
+
+    async def traced_event_stream():
+
+        with tracer.start_as_current_span("answer_stream", context=request_context):
+            async for event in event_stream():
+                yield event
 
+    return StreamingResponse(
+        traced_event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
         }
     )
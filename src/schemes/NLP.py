@@ -3,4 +3,7 @@ from typing import Optional
 
 class SearchRequest(BaseModel):
     text: str
-    limit: Optional[int] = 5
\ No newline at end of file
+    limit: Optional[int] = 5
+    profile: Optional[str] = None
+    debug_timings: Optional[bool] = False
+    include_usage: Optional[bool] = False
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class RetrievalProfile(BaseModel):
+    # Candidates fetched per branch = limit * multiplier, before fusion
+    dense_prefetch_multiplier: int = 4
+    sparse_prefetch_multiplier: int = 4
+    fusion: str = "dbsf"
+    dense_score_threshold: Optional[float] = None
+    score_threshold: Optional[float] = None
+    hnsw_ef: Optional[int] = None
@@ -0,0 +1,130 @@
+from array import array
+from typing import List, Optional
+import hashlib
+import logging
+import sqlite3
+import time
+
+
+class EmbeddingCache:
+    """Content-addressed on-disk store of embedding vectors.
+
+    Rows are keyed by (model id, dimension, document type, sha256 of the text),
+    so a vector is reused as long as the text and the embedding setup match.
+    """
+
+    def __init__(self, db_path: str):
+
+        self.db_path = db_path
+        self.connection = None
+
+        self.hits = 0
+        self.misses = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    def connect(self):
+
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model_id TEXT NOT NULL, "
+            "dimension TEXT NOT NULL, "
+            "document_type TEXT NOT NULL, "
+            "text_hash TEXT NOT NULL, "
+            "vector BLOB NOT NULL, "
+            "last_used_at REAL NOT NULL, "
+            "PRIMARY KEY (model_id, dimension, document_type, text_hash))"
+        )
+        self.connection.commit()
+
+    def disconnect(self):
+
+        if self.connection:
+            self.connection.close()
+        self.connection = None
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str], model_id: str, dimension, document_type: str) -> List[Optional[List[float]]]:
+
+        hashes = [self.hash_text(text) for text in texts]
+        found = {}
+
+        # Stay well below SQLite's bound-parameter limit
+        for start_idx in range(0, len(hashes), 500):
+            batch_hashes = hashes[start_idx: start_idx + 500]
+            placeholders = ",".join("?" * len(batch_hashes))
+            rows = self.connection.execute(
+                "SELECT text_hash, vector FROM embeddings "
+                "WHERE model_id = ? AND dimension = ? AND document_type = ? "
+                f"AND text_hash IN ({placeholders})",
+                [model_id, str(dimension), document_type, *batch_hashes]
+            ).fetchall()
+            found.update(rows)
+
+        if found:
+            now = time.time()
+            self.connection.executemany(
+                "UPDATE embeddings SET last_used_at = ? "
+                "WHERE model_id = ? AND dimension = ? AND document_type = ? AND text_hash = ?",
+                [(now, model_id, str(dimension), document_type, text_hash) for text_hash in found]
+            )
+            self.connection.commit()
+
+        vectors = []
+        for text_hash in hashes:
+            blob = found.get(text_hash)
+            if blob is None:
+                self.misses += 1
+                vectors.append(None)
+            else:
+                self.hits += 1
+                vectors.append(array("f", blob).tolist())
+
+        return vectors
+
+    def put_many(self, texts: List[str], vectors: List[List[float]], model_id: str, dimension, document_type: str):
+
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO embeddings "
+            "(model_id, dimension, document_type, text_hash, vector, last_used_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (model_id, str(dimension), document_type, self.hash_text(text), array("f", vector).tobytes(), now)
+                for text, vector in zip(texts, vectors)
+            ]
+        )
+        self.connection.commit()
+
+    def compact(self, unused_since: float = None) -> int:
+        """Delete entries not used since `unused_since` (epoch seconds) and reclaim space."""
+        removed = 0
+
+        if unused_since is not None:
+            cursor = self.connection.execute(
+                "DELETE FROM embeddings WHERE last_used_at < ?", (unused_since,)
+            )
+            removed = cursor.rowcount
+            self.connection.commit()
+
+        self.connection.execute("VACUUM")
+        self.logger.info(f"Embedding cache compacted, removed {removed} entries")
+
+        return removed
+
+    def stats(self):
+
+        total = self.hits + self.misses
+        size = self.connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        return {
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,94 @@
+from schemes.GraphComponents import GraphComponents
+import hashlib
+import logging
+import sqlite3
+import time
+
+
+class ExtractionCache:
+    """On-disk store of structured extraction results.
+
+    Rows are keyed by (sha256 of the chunk text, model id, prompt hash), so an
+    edited extraction prompt or a different model never reuses stale output.
+    """
+
+    def __init__(self, db_path: str):
+
+        self.db_path = db_path
+        self.connection = None
+
+        self.hits = 0
+        self.misses = 0
+
+        self.logger = logging.getLogger(__name__)
+
+    def connect(self):
+
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            "chunk_hash TEXT NOT NULL, "
+            "model_id TEXT NOT NULL, "
+            "prompt_hash TEXT NOT NULL, "
+            "result TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "PRIMARY KEY (chunk_hash, model_id, prompt_hash))"
+        )
+        self.connection.commit()
+
+    def disconnect(self):
+
+        if self.connection:
+            self.connection.close()
+        self.connection = None
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, chunk: str, model_id: str, prompt_hash: str):
+
+        row = self.connection.execute(
+            "SELECT result FROM extractions "
+            "WHERE chunk_hash = ? AND model_id = ? AND prompt_hash = ?",
+            (self.hash_text(chunk), model_id, prompt_hash)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return GraphComponents.model_validate_json(row[0])
+
+    def put(self, chunk: str, model_id: str, prompt_hash: str, result: GraphComponents):
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO extractions "
+            "(chunk_hash, model_id, prompt_hash, result, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (self.hash_text(chunk), model_id, prompt_hash, result.model_dump_json(), time.time())
+        )
+        self.connection.commit()
+
+    def prune(self, prompt_hash: str) -> int:
+        """Drop entries produced by any other prompt version."""
+        cursor = self.connection.execute(
+            "DELETE FROM extractions WHERE prompt_hash != ?", (prompt_hash,)
+        )
+        self.connection.commit()
+
+        return cursor.rowcount
+
+    def stats(self):
+
+        total = self.hits + self.misses
+        size = self.connection.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+        return {
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
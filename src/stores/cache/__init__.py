@@ -0,0 +1,2 @@
+from .EmbeddingCache import EmbeddingCache
+from .ExtractionCache import ExtractionCache
@@ -0,0 +1,184 @@
+from .LLMEnums import LLMEnums
+from utils.rate_limit import TokenBucket
+from utils.token_estimation import estimate_tokens
+from utils.metrics import (EMBEDDING_REQUESTS, EMBEDDING_RETRIES, EMBEDDING_TEXTS, EMBEDDING_TOKENS,
+                           EMBEDDING_BATCH_SIZE, EMBEDDING_RATE_LIMIT_WAIT, EMBEDDING_REQUEST_LATENCY)
+import asyncio
+import logging
+import random
+import time
+
+# Per-request limits of the embedding endpoints; rate limits depend on the
+# account tier and are left to settings
+EMBEDDING_PROVIDER_LIMITS = {
+    LLMEnums.COHERE.value: {"max_texts": 96, "max_tokens": 50000},
+    LLMEnums.GEMINI.value: {"max_texts": 100, "max_tokens": 20000},
+}
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class EmbeddingBatcher:
+    """Token-packed, rate-limited and retrying front end to `embed_text`.
+
+    Texts are packed into requests bounded by the provider's text and token
+    limits and by an adaptive batch size: the size grows additively while
+    calls stay under the latency target and is cut multiplicatively on slow
+    calls or errors (AIMD).
+    """
+
+    def __init__(self, embedding_client, provider: str, max_texts: int = None, max_tokens: int = None,
+                 requests_per_minute: int = None, tokens_per_minute: int = None, max_retries: int = 5,
+                 backoff_base_seconds: float = 1.0, backoff_max_seconds: float = 60.0,
+                 target_latency_seconds: float = 5.0):
+
+        limits = EMBEDDING_PROVIDER_LIMITS.get(provider, {"max_texts": 50, "max_tokens": 8000})
+
+        self.embedding_client = embedding_client
+        self.provider = provider
+        self.max_texts = max_texts or limits["max_texts"]
+        self.max_tokens = max_tokens or limits["max_tokens"]
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.target_latency_seconds = target_latency_seconds
+
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+        self.min_batch_size = 1
+        self.additive_increase = max(1, self.max_texts // 16)
+        self.batch_size = max(self.min_batch_size, self.max_texts // 2)
+
+        self.counters = {"requests": 0, "retries": 0, "errors": 0, "texts": 0, "tokens": 0,
+                         "rate_limit_wait_seconds": 0.0, "busy_seconds": 0.0}
+
+        self.logger = logging.getLogger(__name__)
+        EMBEDDING_BATCH_SIZE.labels(provider=self.provider).set(self.batch_size)
+
+    def pack(self, texts: list):
+        """Yield consecutive `(start, end, tokens)` request ranges over `texts`.
+
+        Lazy, so each range uses the batch size adapted by the previous request.
+        """
+        start, tokens = 0, 0
+
+        for idx, text in enumerate(texts):
+            text_tokens = estimate_tokens(text)
+            if idx > start and (idx - start >= self.batch_size or tokens + text_tokens > self.max_tokens):
+                yield start, idx, tokens
+                start, tokens = idx, 0
+            tokens += text_tokens
+
+        if start < len(texts):
+            yield start, len(texts), tokens
+
+    def set_batch_size(self, batch_size: int):
+
+        self.batch_size = max(self.min_batch_size, min(self.max_texts, int(batch_size)))
+        EMBEDDING_BATCH_SIZE.labels(provider=self.provider).set(self.batch_size)
+
+    @staticmethod
+    def get_status_code(error: Exception):
+        # Cohere errors carry `status_code`, google-genai errors carry `code`
+        status_code = getattr(error, "status_code", None) or getattr(error, "code", None)
+        return status_code if isinstance(status_code, int) else None
+
+    def is_retryable(self, error: Exception) -> bool:
+
+        status_code = self.get_status_code(error)
+        if status_code is not None:
+            return status_code in RETRYABLE_STATUS_CODES
+
+        # No status means the request never got an answer (timeouts, dropped connections)
+        return isinstance(error, (asyncio.TimeoutError, ConnectionError, OSError)) or \
+            type(error).__module__.startswith("httpx")
+
+    async def wait_for_capacity(self, tokens: int):
+
+        waited = 0.0
+        if self.request_bucket is not None:
+            waited += await self.request_bucket.acquire(1)
+        if self.token_bucket is not None:
+            waited += await self.token_bucket.acquire(tokens)
+
+        if waited:
+            self.counters["rate_limit_wait_seconds"] += waited
+            EMBEDDING_RATE_LIMIT_WAIT.labels(provider=self.provider).inc(waited)
+
+    async def embed_batch(self, texts: list, tokens: int, document_type: str = None):
+
+        for attempt in range(self.max_retries + 1):
+            await self.wait_for_capacity(tokens)
+
+            started_at = time.perf_counter()
+            try:
+                vectors = await self.embedding_client.embed_text(text=texts, document_type=document_type)
+            except Exception as e:
+                if attempt >= self.max_retries or not self.is_retryable(e):
+                    self.counters["errors"] += 1
+                    EMBEDDING_REQUESTS.labels(provider=self.provider, outcome="error").inc()
+                    self.logger.error(f"Embedding request failed after {attempt + 1} attempts: {e}")
+                    self.set_batch_size(self.batch_size // 2)
+                    return None
+
+                reason = str(self.get_status_code(e) or type(e).__name__)
+                self.counters["retries"] += 1
+                EMBEDDING_RETRIES.labels(provider=self.provider, reason=reason).inc()
+                EMBEDDING_REQUESTS.labels(provider=self.provider, outcome="retry").inc()
+
+                # Multiplicative decrease, then full-jitter exponential backoff
+                self.set_batch_size(self.batch_size // 2)
+                delay = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+                self.logger.warning(f"Embedding request failed ({reason}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            latency = time.perf_counter() - started_at
+            EMBEDDING_REQUEST_LATENCY.labels(provider=self.provider).observe(latency)
+            self.counters["busy_seconds"] += latency
+
+            if not vectors or len(vectors) != len(texts):
+                self.counters["errors"] += 1
+                EMBEDDING_REQUESTS.labels(provider=self.provider, outcome="error").inc()
+                return None
+
+            self.counters["requests"] += 1
+            self.counters["texts"] += len(texts)
+            self.counters["tokens"] += tokens
+            EMBEDDING_REQUESTS.labels(provider=self.provider, outcome="success").inc()
+            EMBEDDING_TEXTS.labels(provider=self.provider).inc(len(texts))
+            EMBEDDING_TOKENS.labels(provider=self.provider).inc(tokens)
+
+            if latency > self.target_latency_seconds:
+                self.set_batch_size(self.batch_size * 0.75)
+            elif len(texts) >= self.batch_size:
+                # Only grow when the current size was actually exercised
+                self.set_batch_size(self.batch_size + self.additive_increase)
+
+            return vectors
+
+        return None
+
+    async def embed(self, texts: list, document_type: str = None):
+        """Embed `texts` in order, or return None if any request ultimately fails."""
+        if isinstance(texts, str):
+            texts = [texts]
+
+        vectors = []
+        for start, end, tokens in self.pack(texts):
+            batch_vectors = await self.embed_batch(texts[start:end], tokens, document_type)
+            if batch_vectors is None:
+                return None
+            vectors.extend(batch_vectors)
+
+        return vectors
+
+    def stats(self) -> dict:
+
+        busy_seconds = self.counters["busy_seconds"]
+        return {
+            **self.counters,
+            "batch_size": self.batch_size,
+            "texts_per_second": round(self.counters["texts"] / busy_seconds, 2) if busy_seconds else 0.0
+        }
@@ -12,15 +12,19 @@ class LLMInterface(ABC):
           pass
 
      @abstractmethod
-     def generate_with_structured_output(self, prompt: str, chat_history: Union[str, List] = None):
+     async def generate_with_structured_output(self, prompt: str, chat_history: Union[str, List] = None):
           pass
      
      @abstractmethod
-     def generate_text(self, prompt: str, chat_history: Union[str, List] = None, max_output_tokens: int = None, temperature: float = None):
+     async def generate_text(self, prompt: str, chat_history: Union[str, List] = None, max_output_tokens: int = None, temperature: float = None):
           pass
      
      @abstractmethod
-     def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+     async def generate_text_stream(self, prompt: str, chat_history: Union[str, List] = None, max_output_tokens: int = None, temperature: float = None):
+          pass
+     
+     @abstractmethod
+     async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
           pass
      @abstractmethod
      def construt_prompt(self, prompt: str, role: str):
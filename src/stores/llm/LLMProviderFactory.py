@@ -12,7 +12,8 @@ class LLMProviderFactory:
             return CohereProvider(
                 api_key=self.config.COHERE_API_KEY,
                 default_output_max_tokens=self.config.DAFAULT_OUTPUT_MAX_TOKENS,
-                default_temperature=self.config.DAFAULT_TEMPERATURE
+                default_temperature=self.config.DAFAULT_TEMPERATURE,
+                token_prices=self.config.LLM_TOKEN_PRICES
             )
         
         if provider_name == LLMEnums.GEMINI.value:
@@ -20,7 +21,8 @@ class LLMProviderFactory:
             return GeminiProvider(
                 api_key=self.config.GEMINI_API_KEY,
                 default_output_max_tokens=self.config.DAFAULT_OUTPUT_MAX_TOKENS,
-                default_temperature=self.config.DAFAULT_TEMPERATURE
+                default_temperature=self.config.DAFAULT_TEMPERATURE,
+                token_prices=self.config.LLM_TOKEN_PRICES
             )
         
         return None
\ No newline at end of file
@@ -2,6 +2,8 @@ from ..LLMInterface import LLMInterface
 from ..LLMEnums import CohereEnums, DocumentTypeEnum
 from typing import Union, List
 from schemes.GraphComponents import GraphComponents
+from utils.tracing import get_tracer
+from utils.token_usage import record_token_usage
 import logging
 import cohere
 
@@ -9,9 +11,11 @@ class CohereProvider(LLMInterface):
 
     def __init__(self, api_key: str,
                  default_output_max_tokens: int = 1000,
-                 default_temperature: float = 0.1):
+                 default_temperature: float = 0.1,
+                 token_prices: dict = None):
         
         self.api_key = api_key
+        self.token_prices = token_prices
         
         self.default_output_max_tokens = default_output_max_tokens
         self.default_temperature = default_temperature
@@ -23,10 +27,52 @@ class CohereProvider(LLMInterface):
 
         self.enums = CohereEnums
 
-        self.client = cohere.ClientV2(api_key=self.api_key)
+        self.client = cohere.AsyncClientV2(api_key=self.api_key)
 
         self.logger = logging.getLogger(__name__)
+        self.tracer = get_tracer(__name__)
     
+    def start_span(self, operation: str, model_id: str, **attributes):
+
+        return self.tracer.start_as_current_span(f"cohere.{operation}", attributes={
+            "gen_ai.system": "cohere",
+            "gen_ai.operation.name": operation,
+            "gen_ai.request.model": model_id or "",
+            **attributes
+        })
+
+    def get_usage(self, usage):
+        # Chat usage and embed metadata both carry `tokens` and/or `billed_units`
+        counts = getattr(usage, "tokens", None) or getattr(usage, "billed_units", None)
+        if counts is None:
+            return None
+
+        return {
+            "input_tokens": counts.input_tokens,
+            "output_tokens": counts.output_tokens
+        }
+
+    def get_response_text(self, response):
+
+        if not response or not response.message.content:
+            return ""
+
+        return response.message.content[0].text or ""
+
+    def get_messages_text(self, messages: list):
+        return "\n".join(str(message.get("content", "")) for message in messages or [])
+
+    def record_usage(self, endpoint: str, model_id: str, usage, input_text: str = None,
+                     output_text: str = None, **counts):
+
+        record_token_usage(
+            "cohere", model_id, endpoint,
+            **{**(self.get_usage(usage) or {}), **counts},
+            input_text=input_text,
+            output_text=output_text,
+            token_prices=self.token_prices
+        )
+
     def set_generation_model(self, model_id: str):
         self.generation_model_id = model_id
     
@@ -34,7 +80,7 @@ class CohereProvider(LLMInterface):
         self.embedding_model_id = model_id
         self.embedding_size = embedding_dimension
     
-    def generate_with_structured_output(self, prompt: str, chat_history: Union[str, List] = None):
+    async def generate_with_structured_output(self, prompt: str, chat_history: Union[str, List] = None):
         
         if not self.client:
             self.logger.error("Cohere client is not initialized.")
@@ -49,11 +95,17 @@ class CohereProvider(LLMInterface):
             self.construt_prompt(prompt, role=CohereEnums.USER.value)
         )
 
-        response = self.client.chat(
-            model=self.generation_model_id,
-            messages=chat_history,
-            response_format={"type": "json_object"},
-        )
+        with self.start_span("chat", self.generation_model_id, **{"graph_rag.structured_output": True}):
+            response = await self.client.chat(
+                model=self.generation_model_id,
+                messages=chat_history,
+                response_format={"type": "json_object"},
+            )
+            self.record_usage(
+                "generate_with_structured_output", self.generation_model_id, getattr(response, "usage", None),
+                input_text=self.get_messages_text(chat_history),
+                output_text=self.get_response_text(response)
+            )
 
         if not response or not response.message.content[0].text:
             self.logger.error("No response from Cohere API.")
@@ -63,7 +115,7 @@ class CohereProvider(LLMInterface):
         
         return GraphComponents.model_validate_json(text)
 
-    def generate_text(self, prompt: str, chat_history: Union[str, List] = None, max_output_tokens: int = None, temperature: float = None):
+    async def generate_text(self, prompt: str, chat_history: Union[str, List] = None, max_output_tokens: int = None, temperature: float = None):
         if not self.client:
             self.logger.error("Cohere client is not initialized.")
             return None
@@ -79,20 +131,75 @@ class CohereProvider(LLMInterface):
             self.construt_prompt(prompt, role=CohereEnums.USER.value)
         )
 
-        response = self.client.chat(
-            model=self.generation_model_id,
-            messages=chat_history,
-            max_tokens=max_output_tokens,
-            temperature=temperature
-        )
+        with self.start_span("chat", self.generation_model_id, **{
+            "gen_ai.request.max_tokens": max_output_tokens,
+            "gen_ai.request.temperature": temperature
+        }):
+            response = await self.client.chat(
+                model=self.generation_model_id,
+                messages=chat_history,
+                max_tokens=max_output_tokens,
+                temperature=temperature
+            )
+            self.record_usage(
+                "generate_text", self.generation_model_id, getattr(response, "usage", None),
+                input_text=self.get_messages_text(chat_history),
+                output_text=self.get_response_text(response)
+            )
 
         if not response or not response.message.content[0].text:
             self.logger.error("No response from Cohere API.")
             return None
         
         return response.message.content[0].text
+
+    async def generate_text_stream(self, prompt: str, chat_history: Union[str, List] = None, max_output_tokens: int = None, temperature: float = None):
+        if not self.client:
+            self.logger.error("Cohere client is not initialized.")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model is not set.")
+            return
+
+        max_output_tokens = max_output_tokens if max_output_tokens is not None else self.default_output_max_tokens
+        temperature = temperature if temperature is not None else self.default_temperature
+
+        chat_history.append(
+            self.construt_prompt(prompt, role=CohereEnums.USER.value)
+        )
+
+        with self.start_span("chat_stream", self.generation_model_id, **{
+            "gen_ai.request.max_tokens": max_output_tokens,
+            "gen_ai.request.temperature": temperature
+        }):
+            stream = self.client.chat_stream(
+                model=self.generation_model_id,
+                messages=chat_history,
+                max_tokens=max_output_tokens,
+                temperature=temperature
+            )
+
+            usage, output_chunks = None, []
+            async for event in stream:
+                if event.type == "message-end" and event.delta is not None:
+                    usage = event.delta.usage
+
+                if event.type != "content-delta":
+                    continue
+
+                text = event.delta.message.content.text
+                if text:
+                    output_chunks.append(text)
+                    yield text
+
+            self.record_usage(
+                "generate_text_stream", self.generation_model_id, usage,
+                input_text=self.get_messages_text(chat_history),
+                output_text="".join(output_chunks)
+            )
     
-    def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
 
         if not self.client:
             self.logger.error("Cohere client is not initialized.")
@@ -109,12 +216,20 @@ class CohereProvider(LLMInterface):
         if isinstance(text, str):
             text = [text]
         
-        res = self.client.embed(
-            model = self.embedding_model_id,
-            texts = text,
-            input_type = input_type,
-            embedding_types=["float"],
-        )
+        with self.start_span("embeddings", self.embedding_model_id, **{
+            "gen_ai.request.batch_size": len(text)
+        }):
+            res = await self.client.embed(
+                model = self.embedding_model_id,
+                texts = text,
+                input_type = input_type,
+                embedding_types=["float"],
+            )
+            self.record_usage(
+                "embed_text", self.embedding_model_id, getattr(res, "meta", None),
+                input_text="\n".join(text),
+                output_tokens=0
+            )
 
         if not res or not res.embeddings.float:
             self.logger.error("No embedding returned from Cohere.")
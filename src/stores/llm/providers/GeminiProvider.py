@@ -5,15 +5,19 @@ from google import genai
 from google.genai import types
 from google.genai.types import GenerateContentConfig
 from schemes.GraphComponents import GraphComponents
+from utils.tracing import get_tracer
+from utils.token_usage import record_token_usage
 import logging
 
 class GeminiProvider(LLMInterface):
 
     def __init__(self, api_key: str, 
                    default_output_max_tokens: int = 200,
-                   default_temperature: float = 0.1):
+                   default_temperature: float = 0.1,
+                   token_prices: dict = None):
         
         self.api_key = api_key
+        self.token_prices = token_prices
         self.default_output_max_tokens = default_output_max_tokens
         self.default_temperature = default_temperature
         
@@ -26,6 +30,37 @@ class GeminiProvider(LLMInterface):
 
         self.enums = GeminiEnums
         self.logger = logging.getLogger(__name__)
+        self.tracer = get_tracer(__name__)
+
+    def start_span(self, operation: str, model_id: str, **attributes):
+
+        return self.tracer.start_as_current_span(f"gemini.{operation}", attributes={
+            "gen_ai.system": "gemini",
+            "gen_ai.operation.name": operation,
+            "gen_ai.request.model": model_id or "",
+            **attributes
+        })
+
+    def get_usage(self, usage_metadata):
+
+        if usage_metadata is None:
+            return None
+
+        return {
+            "input_tokens": usage_metadata.prompt_token_count,
+            "output_tokens": usage_metadata.candidates_token_count
+        }
+
+    def record_usage(self, endpoint: str, model_id: str, usage_metadata, input_text: str = None,
+                     output_text: str = None, **counts):
+
+        record_token_usage(
+            "gemini", model_id, endpoint,
+            **{**(self.get_usage(usage_metadata) or {}), **counts},
+            input_text=input_text,
+            output_text=output_text,
+            token_prices=self.token_prices
+        )
 
     def set_embedding_model(self, model_id: str, embedding_dimension: int):
         self.embedding_model_id = model_id
@@ -34,7 +69,7 @@ class GeminiProvider(LLMInterface):
     def set_generation_model(self, model_id: str):
         self.generation_model_id = model_id
 
-    def embed_text(self, text: Union[str, List[str]], document_type = None):
+    async def embed_text(self, text: Union[str, List[str]], document_type = None):
 
         if not self.client:
             self.logger.error("Gemini client was not set")
@@ -51,12 +86,21 @@ class GeminiProvider(LLMInterface):
         if isinstance(text, str):
             text = [text]
         
-        embeddings_result = self.client.models.embed_content(
-            model = self.embedding_model_id,
-            contents = text,
-            config=types.EmbedContentConfig(output_dimensionality=self.embedding_size,
-                                            task_type=input_type)
-        )
+        with self.start_span("embeddings", self.embedding_model_id, **{
+            "gen_ai.request.batch_size": len(text)
+        }):
+            embeddings_result = await self.client.aio.models.embed_content(
+                model = self.embedding_model_id,
+                contents = text,
+                config=types.EmbedContentConfig(output_dimensionality=self.embedding_size,
+                                                task_type=input_type)
+            )
+            # The embed response carries no token counts, input is always estimated
+            self.record_usage(
+                "embed_text", self.embedding_model_id, None,
+                input_text="\n".join(text),
+                output_tokens=0
+            )
 
         if not embeddings_result or not embeddings_result.embeddings:
             self.logger.error("No embedding returned from Gemini.")
@@ -64,7 +108,7 @@ class GeminiProvider(LLMInterface):
 
         return [embed.values for embed in embeddings_result.embeddings]
     
-    def generate_with_structured_output(self, prompt: str, chat_history: Union[str, List] = None):
+    async def generate_with_structured_output(self, prompt: str, chat_history: Union[str, List] = None):
 
         if not self.client:
             self.logger.error("Gemini client was not set")
@@ -74,15 +118,22 @@ class GeminiProvider(LLMInterface):
             self.logger.error("Generation Model ID was not set")
             return None
         
-        response = self.client.models.generate_content(
-            model = self.generation_model_id,
-            contents=prompt,
-            config=GenerateContentConfig(
-                system_instruction=chat_history,
-                response_mime_type="application/json",
-                response_json_schema=GraphComponents.model_json_schema(),
+        with self.start_span("generate_content", self.generation_model_id, **{"graph_rag.structured_output": True}):
+            response = await self.client.aio.models.generate_content(
+                model = self.generation_model_id,
+                contents=prompt,
+                config=GenerateContentConfig(
+                    system_instruction=chat_history,
+                    response_mime_type="application/json",
+                    response_json_schema=GraphComponents.model_json_schema(),
+                )
+            )
+            self.record_usage(
+                "generate_with_structured_output", self.generation_model_id,
+                getattr(response, "usage_metadata", None),
+                input_text=f"{chat_history or ''}\n{prompt}",
+                output_text=response.text if response else None
             )
-        )
 
         if response is None or not response.text:
             self.logger.error("No response from Gemini client")
@@ -92,7 +143,7 @@ class GeminiProvider(LLMInterface):
 
         return graph_components
     
-    def generate_text(self, prompt, chat_history: Union[str, List] = None, max_output_tokens = None, temperature = None):
+    async def generate_text(self, prompt, chat_history: Union[str, List] = None, max_output_tokens = None, temperature = None):
         
         if not self.client:
             self.logger.error("Gemini client was not set")
@@ -106,21 +157,71 @@ class GeminiProvider(LLMInterface):
         max_output_tokens = max_output_tokens if max_output_tokens is not None else self.default_output_max_tokens
         temperature = temperature if temperature is not None else self.default_temperature
         
-        response = self.client.models.generate_content(
-            model = self.generation_model_id,
-            contents=prompt,
-            config=GenerateContentConfig(
-                system_instruction=chat_history,
-                temperature=temperature,
-                max_output_tokens=max_output_tokens
+        with self.start_span("generate_content", self.generation_model_id, **{
+            "gen_ai.request.max_tokens": max_output_tokens,
+            "gen_ai.request.temperature": temperature
+        }):
+            response = await self.client.aio.models.generate_content(
+                model = self.generation_model_id,
+                contents=prompt,
+                config=GenerateContentConfig(
+                    system_instruction=chat_history,
+                    temperature=temperature,
+                    max_output_tokens=max_output_tokens
+                )
+            )
+            self.record_usage(
+                "generate_text", self.generation_model_id, getattr(response, "usage_metadata", None),
+                input_text=f"{chat_history or ''}\n{prompt}",
+                output_text=response.text if response else None
             )
-        )
 
         if not response or not response.text:
             return None
         
         return response.text
 
+    async def generate_text_stream(self, prompt, chat_history: Union[str, List] = None, max_output_tokens = None, temperature = None):
+
+        if not self.client:
+            self.logger.error("Gemini client was not set")
+            return
+        
+        if not self.generation_model_id:
+            self.logger.error("Generation Model ID was not set")
+            return
+
+        max_output_tokens = max_output_tokens if max_output_tokens is not None else self.default_output_max_tokens
+        temperature = temperature if temperature is not None else self.default_temperature
+
+        with self.start_span("generate_content_stream", self.generation_model_id, **{
+            "gen_ai.request.max_tokens": max_output_tokens,
+            "gen_ai.request.temperature": temperature
+        }):
+            stream = await self.client.aio.models.generate_content_stream(
+                model = self.generation_model_id,
+                contents=prompt,
+                config=GenerateContentConfig(
+                    system_instruction=chat_history,
+                    temperature=temperature,
+                    max_output_tokens=max_output_tokens
+                )
+            )
+
+            usage_metadata, output_chunks = None, []
+            async for chunk in stream:
+                # Usage is cumulative, the last chunk carries the totals
+                usage_metadata = chunk.usage_metadata or usage_metadata
+                if chunk.text:
+                    output_chunks.append(chunk.text)
+                    yield chunk.text
+
+            self.record_usage(
+                "generate_text_stream", self.generation_model_id, usage_metadata,
+                input_text=f"{chat_history or ''}\n{prompt}",
+                output_text="".join(output_chunks)
+            )
+
     def construt_prompt(self, prompt, role):
         raise NotImplementedError  
     
@@ -24,6 +24,24 @@ class TemplateParser:
     
     def get(self, group: str, key: str, vars: dict={}):
         
+        key_attribute = self.get_template(group, key)
+
+        if not key_attribute:
+            return None
+
+        return key_attribute.substitute(vars)
+
+    def get_source(self, group: str, key: str):
+        """Raw, unsubstituted template text (e.g. for hashing prompt versions)."""
+        key_attribute = self.get_template(group, key)
+
+        if not key_attribute:
+            return None
+
+        return key_attribute.template
+
+    def get_template(self, group: str, key: str):
+
         if not group or not key:
             return None
         
@@ -43,7 +61,5 @@ class TemplateParser:
         if not module:
             return None
         
-        key_attribute = getattr(module, key)
-
-        return key_attribute.substitute(vars)
+        return getattr(module, key)
     
@@ -0,0 +1,38 @@
+from .VectorDBEnums import RetrievalProfileEnums, FusionMethodEnums
+from schemes.RetrievalProfile import RetrievalProfile
+
+RETRIEVAL_PROFILES = {
+    RetrievalProfileEnums.FAST.value: RetrievalProfile(
+        dense_prefetch_multiplier=1,
+        sparse_prefetch_multiplier=1,
+        fusion=FusionMethodEnums.DBSF.value,
+        hnsw_ef=64
+    ),
+    RetrievalProfileEnums.BALANCED.value: RetrievalProfile(
+        dense_prefetch_multiplier=4,
+        sparse_prefetch_multiplier=4,
+        fusion=FusionMethodEnums.DBSF.value,
+        hnsw_ef=128
+    ),
+    RetrievalProfileEnums.ACCURATE.value: RetrievalProfile(
+        dense_prefetch_multiplier=10,
+        sparse_prefetch_multiplier=10,
+        fusion=FusionMethodEnums.RRF.value,
+        hnsw_ef=512
+    ),
+}
+
+
+def get_retrieval_profile(name: str, overrides: dict = None):
+    """Resolve a profile by name, or None if it is unknown.
+
+    `overrides` maps profile names to field values; it can tune a built-in
+    profile or define a new one.
+    """
+    profile = RETRIEVAL_PROFILES.get(name)
+    fields = (overrides or {}).get(name)
+
+    if fields:
+        profile = (profile or RetrievalProfile()).model_copy(update=fields)
+
+    return profile
@@ -3,6 +3,7 @@ from enum import Enum
 class VectorDBEnums(Enum):
     QDRANT = "qdrant"
     MILVUS = "milvus"
+    NUMPY = "numpy"
 
 
 class DistanceMetricEnums(Enum):
@@ -12,6 +13,30 @@ class DistanceMetricEnums(Enum):
 
 class QdrantVectorType(Enum):
     DENSE = "dense"
+    DENSE_COARSE = "dense_coarse"
     SPARSE = "sparse"
 
+class NumpyStorageDtype(Enum):
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
+    INT8 = "int8"
+
+class QuantizationEnums(Enum):
+    SCALAR = "scalar"
+    BINARY = "binary"
+
+class FusionMethodEnums(Enum):
+    RRF = "rrf"
+    DBSF = "dbsf"
+
+class RetrievalProfileEnums(Enum):
+    FAST = "fast"
+    BALANCED = "balanced"
+    ACCURATE = "accurate"
+
+class CacheEvictionReason(Enum):
+    LRU = "lru"
+    TTL = "ttl"
+    VERSION = "version"
+
 
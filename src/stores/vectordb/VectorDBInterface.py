@@ -1,45 +1,76 @@
 from abc import ABC, abstractmethod
 from typing import List
 from schemes.SearchResultSchema import SearchResultSchema
+from schemes.RetrievalProfile import RetrievalProfile
 
 class VectorDBInterface(ABC):
 
     @abstractmethod
-    def connect(self):
+    async def connect(self):
         pass
 
     @abstractmethod
-    def disconnect(self):
+    async def disconnect(self):
         pass
 
     @abstractmethod
-    def is_collection_exists(self, collection_name: str) -> bool:
+    async def is_collection_exists(self, collection_name: str) -> bool:
         pass
 
     @abstractmethod
-    def list_all_collections(self) -> List:
+    async def list_all_collections(self) -> List:
         pass
 
     @abstractmethod
-    def get_collection_info(self, collection_name: str) -> dict:
+    async def get_collection_info(self, collection_name: str) -> dict:
         pass
 
     @abstractmethod
-    def delete_collection(self, collection_name: str) -> bool:
+    async def delete_collection(self, collection_name: str) -> bool:
         pass
 
     @abstractmethod
-    def create_collection(self, collection_name: str, embedding_size: int, do_reset: bool = False):
+    async def create_collection(self, collection_name: str, embedding_size: int, do_reset: bool = False):
         pass
 
     @abstractmethod
-    def insert_one(self, collection_name: str, text: str, vector: List, entity_ids: List[str] = None):
+    async def insert_one(self, collection_name: str, text: str, vector: List, entity_ids: List[str] = None, point_id: str = None):
         pass
 
     @abstractmethod
-    def insert_many(self, collection_name: str, texts: List[str], vectors: List[List], entity_ids: List[List] = None, batch_size: int = 50):
+    async def insert_many(self, collection_name: str, texts: List[str], vectors: List[List], entity_ids: List[List] = None, ids: List[str] = None,
+                          sparse_vectors: List[dict] = None, batch_size: int = 50):
         pass
 
     @abstractmethod
-    def search_by_vector(self, collection_name: str, text: str, query_vector: List, limit: int)-> List[SearchResultSchema]:
+    async def get_point_payloads(self, collection_name: str, payload_keys: List[str] = None) -> dict:
+        pass
+
+    @abstractmethod
+    async def delete_points(self, collection_name: str, ids: List[str]) -> bool:
+        pass
+
+    @abstractmethod
+    async def update_payloads(self, collection_name: str, payloads: dict) -> bool:
+        pass
+
+    @abstractmethod
+    async def get_index_version(self, collection_name: str) -> str:
+        pass
+
+    @abstractmethod
+    async def set_index_version(self, collection_name: str, index_version: str) -> bool:
+        pass
+
+    @abstractmethod
+    def has_pending_writes(self, collection_name: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def flush(self, collection_name: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def search_by_vector(self, collection_name: str, text: str, query_vector: List, limit: int,
+                               profile: RetrievalProfile = None)-> List[SearchResultSchema]:
         pass   
\ No newline at end of file
@@ -1,6 +1,7 @@
-from .providers import QdrantDBProvider
+from .providers import QdrantDBProvider, NumpyDBProvider
 from .VectorDBEnums import VectorDBEnums
 from controllers.BaseController import BaseController
+import httpx
 
 class VectorDBProviderFactory:
 
@@ -8,6 +9,33 @@ class VectorDBProviderFactory:
         self.config = config
         self.base_controller = BaseController()
     
+    def get_qdrant_server_config(self):
+
+        if not (self.config.QDRANT_URL or self.config.QDRANT_HOST):
+            return None
+
+        pool_size = self.config.QDRANT_POOL_SIZE
+
+        # qdrant-client rejects url and host together, the URL wins when both are set
+        if self.config.QDRANT_URL:
+            location = {"url": self.config.QDRANT_URL}
+        else:
+            location = {"host": self.config.QDRANT_HOST}
+
+        return {
+            **location,
+            "port": self.config.QDRANT_PORT,
+            "grpc_port": self.config.QDRANT_GRPC_PORT,
+            "prefer_grpc": self.config.QDRANT_PREFER_GRPC,
+            "timeout": self.config.QDRANT_TIMEOUT,
+            "api_key": self.config.QDRANT_API_KEY or None,
+            "limits": httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            "grpc_options": {
+                "grpc.keepalive_time_ms": 30000,
+                "grpc.keepalive_permit_without_calls": 1
+            }
+        }
+
     def create(self, provider: str):
 
         if provider == VectorDBEnums.QDRANT.value:
@@ -17,5 +45,34 @@ class VectorDBProviderFactory:
             return QdrantDBProvider(
                 db_client = qdrant_db_client,
                 qdrant_cache = qdrant_cache,
-                distance_method = self.config.VECTOR_DB_DISTANCE_METHOD
-            )
\ No newline at end of file
+                distance_method = self.config.VECTOR_DB_DISTANCE_METHOD,
+                cache_max_entries = self.config.SEMANTIC_CACHE_MAX_ENTRIES,
+                cache_ttl_seconds = self.config.SEMANTIC_CACHE_TTL_SECONDS,
+                server_config = self.get_qdrant_server_config(),
+                quantization = self.config.QDRANT_QUANTIZATION,
+                quantization_always_ram = self.config.QDRANT_QUANTIZATION_ALWAYS_RAM,
+                quantization_rescore = self.config.QDRANT_QUANTIZATION_RESCORE,
+                quantization_oversampling = self.config.QDRANT_QUANTIZATION_OVERSAMPLING,
+                vectors_on_disk = self.config.QDRANT_VECTORS_ON_DISK,
+                payload_on_disk = self.config.QDRANT_PAYLOAD_ON_DISK,
+                hnsw_m = self.config.QDRANT_HNSW_M,
+                hnsw_ef_construct = self.config.QDRANT_HNSW_EF_CONSTRUCT,
+                coarse_dimension = self.config.MATRYOSHKA_COARSE_DIMENSION,
+                coarse_multiplier = self.config.MATRYOSHKA_COARSE_MULTIPLIER,
+                cache_count_interval = self.config.SEMANTIC_CACHE_COUNT_INTERVAL,
+                index_version_ttl_seconds = self.config.INDEX_VERSION_TTL_SECONDS
+            )
+
+        if provider == VectorDBEnums.NUMPY.value:
+            numpy_db_path = self.base_controller.get_database_path(db_name = self.config.NUMPY_DB_PATH)
+
+            return NumpyDBProvider(
+                db_path = numpy_db_path,
+                distance_method = self.config.VECTOR_DB_DISTANCE_METHOD,
+                storage_dtype = self.config.NUMPY_STORAGE_DTYPE,
+                write_buffer_rows = self.config.NUMPY_WRITE_BUFFER_ROWS,
+                coarse_dimension = self.config.MATRYOSHKA_COARSE_DIMENSION,
+                coarse_multiplier = self.config.MATRYOSHKA_COARSE_MULTIPLIER,
+                cache_max_entries = self.config.SEMANTIC_CACHE_MAX_ENTRIES,
+                cache_ttl_seconds = self.config.SEMANTIC_CACHE_TTL_SECONDS
+            )
@@ -0,0 +1,918 @@
+from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import DistanceMetricEnums, NumpyStorageDtype, CacheEvictionReason, FusionMethodEnums, RetrievalProfileEnums
+from ..RetrievalProfiles import RETRIEVAL_PROFILES
+from schemes.SearchResultSchema import SearchResultSchema
+from schemes.RetrievalProfile import RetrievalProfile
+from utils.metrics import SEMANTIC_CACHE_ENTRIES, SEMANTIC_CACHE_EVICTIONS
+from utils.content_ids import sentence_id
+from utils.text_normalization import normalize_text
+from utils.vectors import truncate_vector
+from types import SimpleNamespace
+import numpy as np
+import asyncio
+import logging
+import shutil
+import json
+import math
+import time
+import uuid
+import re
+import os
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Same rank constant as Qdrant's reciprocal rank fusion
+RRF_K = 60
+
+# Rows scored per matrix product, bounds the temporary memory of a search
+SEARCH_BLOCK_ROWS = 65536
+
+
+def tokenize(text: str):
+    return TOKEN_PATTERN.findall(normalize_text(text))
+
+
+class NumpyCollection:
+    """Read-only, memory-mapped view of one collection generation.
+
+    Variable-length payloads are stored as a flat utf-8 byte file plus an
+    offsets array, so every file can be mapped and shared between processes.
+    """
+
+    def __init__(self, path: str, manifest: dict):
+
+        self.path = path
+        self.manifest = manifest
+        self.count = manifest["count"]
+        self.dimension = manifest["dimension"]
+        self.dtype = manifest["dtype"]
+
+        generation_path = os.path.join(path, manifest["generation"])
+
+        def load(name):
+            return np.load(os.path.join(generation_path, f"{name}.npy"), mmap_mode="r")
+
+        def load_bytes(name):
+            file_path = os.path.join(generation_path, f"{name}.bin")
+            if os.path.getsize(file_path) == 0:
+                return np.zeros(0, dtype=np.uint8)
+            return np.memmap(file_path, dtype=np.uint8, mode="r")
+
+        self.ids = load("ids")
+        self.vectors = load("vectors")
+        self.scales = load("scales")
+        self.sq_norms = load("sq_norms")
+        self.coarse = load("coarse") if manifest.get("coarse_dimension") else None
+        self.text_offsets = load("text_offsets")
+        self.text_data = load_bytes("text")
+        self.entity_offsets = load("entity_offsets")
+        self.entity_data = load_bytes("entity_ids")
+
+        self.bm25_indptr = load("bm25_indptr")
+        self.bm25_docs = load("bm25_docs")
+        self.bm25_tf = load("bm25_tf")
+        self.doc_len = load("doc_len")
+        with open(os.path.join(generation_path, "bm25_vocab.json"), "r", encoding="utf-8") as f:
+            self.vocab = json.load(f)
+
+    def get_text(self, row: int) -> str:
+        start, end = self.text_offsets[row], self.text_offsets[row + 1]
+        return bytes(self.text_data[start:end]).decode("utf-8")
+
+    def get_entity_ids(self, row: int) -> list:
+        start, end = self.entity_offsets[row], self.entity_offsets[row + 1]
+        return json.loads(bytes(self.entity_data[start:end]).decode("utf-8"))
+
+    def get_block(self, start: int, end: int):
+        """Dequantized float32 rows [start, end)."""
+        return self.get_rows(slice(start, end))
+
+    def get_rows(self, rows):
+        """Dequantized float32 rows for a slice or an index array."""
+        block = np.array(self.vectors[rows], dtype=np.float32)
+        if self.dtype == NumpyStorageDtype.INT8.value:
+            block *= np.asarray(self.scales[rows], dtype=np.float32)[:, None]
+        return block
+
+
+class InMemoryCache:
+    """Per-process semantic cache with the same lifecycle rules as the Qdrant cache.
+
+    Rows live in preallocated arrays whose capacity doubles when full, so an
+    insert writes one row instead of copying the whole matrix.
+    """
+
+    def __init__(self, dimension: int, capacity: int = 64):
+
+        self.dimension = dimension
+        self.vector_rows = np.zeros((capacity, dimension), dtype=np.float32)
+        self.created_at_rows = np.zeros(capacity, dtype=np.float64)
+        self.last_hit_at_rows = np.zeros(capacity, dtype=np.float64)
+        self.ids = []
+        self.payloads = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def vectors(self):
+        return self.vector_rows[:len(self.ids)]
+
+    @property
+    def created_at(self):
+        return self.created_at_rows[:len(self.ids)]
+
+    @property
+    def last_hit_at(self):
+        return self.last_hit_at_rows[:len(self.ids)]
+
+    def grow(self):
+
+        capacity = max(2 * len(self.vector_rows), 1)
+        size = len(self.ids)
+
+        vector_rows = np.zeros((capacity, self.dimension), dtype=np.float32)
+        vector_rows[:size] = self.vectors
+        created_at_rows = np.zeros(capacity, dtype=np.float64)
+        created_at_rows[:size] = self.created_at
+        last_hit_at_rows = np.zeros(capacity, dtype=np.float64)
+        last_hit_at_rows[:size] = self.last_hit_at
+
+        self.vector_rows, self.created_at_rows, self.last_hit_at_rows = vector_rows, created_at_rows, last_hit_at_rows
+
+    def add(self, point_id: str, vector: list, payload: dict):
+
+        row = len(self.ids)
+        if row == len(self.vector_rows):
+            self.grow()
+
+        self.vector_rows[row] = np.asarray(vector, dtype=np.float32)
+        self.created_at_rows[row] = payload["created_at"]
+        self.last_hit_at_rows[row] = payload["last_hit_at"]
+        self.ids.append(point_id)
+        self.payloads.append(payload)
+
+    def remove(self, rows) -> int:
+
+        rows = np.asarray(sorted(set(int(row) for row in rows)), dtype=np.int64)
+        if rows.size == 0:
+            return 0
+
+        keep = np.ones(len(self.ids), dtype=bool)
+        keep[rows] = False
+        kept = np.flatnonzero(keep)
+
+        # Compact in place, the capacity is kept for the inserts that follow an eviction
+        self.vector_rows[:kept.size] = self.vector_rows[kept]
+        self.created_at_rows[:kept.size] = self.created_at_rows[kept]
+        self.last_hit_at_rows[:kept.size] = self.last_hit_at_rows[kept]
+        self.ids = [point_id for point_id, kept_row in zip(self.ids, keep) if kept_row]
+        self.payloads = [payload for payload, kept_row in zip(self.payloads, keep) if kept_row]
+
+        return int(rows.size)
+
+
+class PendingWrites:
+    """Upserts, deletes and payload updates buffered for one collection until the next flush.
+
+    Later operations on a point override earlier ones, so the buffer can be
+    applied in one pass regardless of the order the calls arrived in.
+    """
+
+    def __init__(self):
+
+        self.upserts = dict()
+        self.deletes = set()
+        self.payloads = dict()
+
+    def __len__(self):
+        return len(self.upserts) + len(self.deletes) + len(self.payloads)
+
+    def upsert(self, point_id: str, vector: np.ndarray, text: str, entity_ids: list):
+
+        self.deletes.discard(point_id)
+        self.payloads.pop(point_id, None)
+        self.upserts[point_id] = [vector, text, entity_ids]
+
+    def delete(self, point_id: str):
+
+        self.upserts.pop(point_id, None)
+        self.payloads.pop(point_id, None)
+        self.deletes.add(point_id)
+
+    def update_payload(self, point_id: str, payload: dict):
+
+        if point_id in self.deletes:
+            return
+
+        if point_id in self.upserts:
+            entry = self.upserts[point_id]
+            entry[1] = payload.get("text", entry[1])
+            entry[2] = payload.get("entity_ids", entry[2])
+            return
+
+        self.payloads.setdefault(point_id, {}).update(payload)
+
+
+class NumpyDBProvider(VectorDBInterface):
+    """Vector store backed by memory-mapped NumPy files.
+
+    Search is exact brute force over batched matrix products, with an
+    in-process BM25 index for the sparse branch of hybrid search. Writes are
+    buffered in memory and applied by `flush` (or once `write_buffer_rows`
+    operations are pending) as a new generation directory with an atomic swap
+    of the collection manifest, so any number of worker processes can map the
+    files read-only while a single indexing process writes.
+    """
+
+    def __init__(self, db_path: str, distance_method: str, storage_dtype: str = None,
+                 cache_threshold=0.35, cache_max_entries: int = 10000, cache_ttl_seconds: int = None,
+                 coarse_dimension: int = None, coarse_multiplier: int = 4, write_buffer_rows: int = 100000):
+
+        self.db_path = db_path
+        self.distance_method = distance_method or DistanceMetricEnums.COSINE.value
+        self.storage_dtype = storage_dtype or NumpyStorageDtype.FLOAT32.value
+        self.cache_threshold = cache_threshold
+        self.cache_max_entries = cache_max_entries
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache_low_watermark = 0.9
+
+        # Two-stage retrieval: scan a truncated prefix, rescore the candidates in full
+        self.coarse_dimension = coarse_dimension
+        self.coarse_multiplier = coarse_multiplier
+
+        self.collections = {}
+        self.caches = None
+
+        # Every flush rewrites the collection, so writes are applied in large batches
+        self.write_buffer_rows = write_buffer_rows
+        self.pending = {}
+        self.flushing = {}
+        self.write_lock = asyncio.Lock()
+
+        self.logger = logging.getLogger(__name__)
+
+    # ----------------- connection -----------------
+
+    async def connect(self):
+        os.makedirs(self.db_path, exist_ok=True)
+        self.collections = {}
+
+    async def disconnect(self):
+        self.collections = {}
+
+    async def cache_connect(self):
+        self.caches = {}
+
+    async def cache_disconnect(self):
+        self.caches = None
+
+    # ----------------- collection files -----------------
+
+    def get_collection_path(self, collection_name: str):
+        return os.path.join(self.db_path, collection_name)
+
+    def get_manifest_path(self, collection_name: str):
+        return os.path.join(self.get_collection_path(collection_name), "manifest.json")
+
+    def load_collection(self, collection_name: str):
+        """Return the current generation, remapping it if another process swapped it."""
+        manifest_path = self.get_manifest_path(collection_name)
+
+        if not os.path.exists(manifest_path):
+            self.collections.pop(collection_name, None)
+            return None
+
+        mtime = os.stat(manifest_path).st_mtime_ns
+        cached = self.collections.get(collection_name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        manifest = self.read_manifest(collection_name)
+        collection = NumpyCollection(self.get_collection_path(collection_name), manifest)
+        self.collections[collection_name] = (mtime, collection)
+
+        return collection
+
+    def read_all(self, collection: NumpyCollection):
+
+        ids = [str(point_id) for point_id in collection.ids]
+        vectors = np.array(collection.get_block(0, collection.count), dtype=np.float32).reshape(-1, collection.dimension)
+        texts = [collection.get_text(row) for row in range(collection.count)]
+        entity_ids = [collection.get_entity_ids(row) for row in range(collection.count)]
+
+        return ids, vectors, texts, entity_ids
+
+    def quantize(self, vectors: np.ndarray):
+
+        scales = np.ones(len(vectors), dtype=np.float32)
+
+        if self.storage_dtype == NumpyStorageDtype.FLOAT16.value:
+            return vectors.astype(np.float16), scales
+
+        if self.storage_dtype == NumpyStorageDtype.INT8.value:
+            max_abs = np.abs(vectors).max(axis=1) if len(vectors) else scales
+            scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+            quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            return quantized, scales
+
+        return vectors.astype(np.float32), scales
+
+    def build_bm25(self, texts: list):
+
+        vocab = {}
+        postings = {}
+        doc_len = np.zeros(len(texts), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_len[row] = len(tokens)
+
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+
+            for token, count in counts.items():
+                term_id = vocab.setdefault(token, len(vocab))
+                postings.setdefault(term_id, []).append((row, count))
+
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        docs, tfs = [], []
+        for term_id in range(len(vocab)):
+            term_postings = postings[term_id]
+            indptr[term_id + 1] = indptr[term_id] + len(term_postings)
+            docs.extend(row for row, _ in term_postings)
+            tfs.extend(count for _, count in term_postings)
+
+        return vocab, indptr, np.asarray(docs, dtype=np.int64), np.asarray(tfs, dtype=np.float32), doc_len
+
+    def read_manifest(self, collection_name: str):
+
+        manifest_path = self.get_manifest_path(collection_name)
+        if not os.path.exists(manifest_path):
+            return None
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_manifest(self, collection_name: str, manifest: dict):
+
+        manifest_path = self.get_manifest_path(collection_name)
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    def write_collection(self, collection_name: str, dimension: int, ids: list, vectors: np.ndarray,
+                         texts: list, entity_ids: list):
+
+        collection_path = self.get_collection_path(collection_name)
+        os.makedirs(collection_path, exist_ok=True)
+
+        generation = uuid.uuid4().hex
+        generation_path = os.path.join(collection_path, generation)
+        os.makedirs(generation_path)
+
+        def save(name, array):
+            np.save(os.path.join(generation_path, f"{name}.npy"), array)
+
+        def save_bytes(name, items):
+            encoded = [item.encode("utf-8") for item in items]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(item) for item in encoded]) if encoded else []
+            with open(os.path.join(generation_path, f"{name}.bin"), "wb") as f:
+                f.write(b"".join(encoded))
+            return offsets
+
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, dimension)
+        if self.distance_method == DistanceMetricEnums.COSINE.value and len(vectors):
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms > 0, norms, 1.0)
+
+        stored, scales = self.quantize(vectors)
+
+        save("ids", np.asarray(ids, dtype="U36"))
+        save("vectors", stored)
+        save("scales", scales)
+        save("sq_norms", (vectors ** 2).sum(axis=1).astype(np.float32))
+        if self.coarse_dimension:
+            coarse = vectors[:, :self.coarse_dimension]
+            norms = np.linalg.norm(coarse, axis=1, keepdims=True)
+            save("coarse", (coarse / np.where(norms > 0, norms, 1.0)).astype(np.float16))
+        save("text_offsets", save_bytes("text", texts))
+        save("entity_offsets", save_bytes("entity_ids", [json.dumps(item) for item in entity_ids]))
+
+        vocab, indptr, docs, tfs, doc_len = self.build_bm25(texts)
+        save("bm25_indptr", indptr)
+        save("bm25_docs", docs)
+        save("bm25_tf", tfs)
+        save("doc_len", doc_len)
+        with open(os.path.join(generation_path, "bm25_vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(vocab, f, ensure_ascii=False)
+
+        manifest = {
+            "generation": generation,
+            "count": len(ids),
+            "dimension": dimension,
+            "dtype": self.storage_dtype,
+            "distance": self.distance_method,
+            "avgdl": float(doc_len.mean()) if len(doc_len) else 0.0,
+            "coarse_dimension": self.coarse_dimension,
+            "updated_at": time.time()
+        }
+
+        previous_manifest = self.read_manifest(collection_name) or {}
+        previous_generation = previous_manifest.get("generation")
+        manifest["index_version"] = previous_manifest.get("index_version")
+
+        self.write_manifest(collection_name, manifest)
+
+        # The previous generation is kept for readers that read its manifest but have
+        # not opened its files yet; readers mapping older ones keep their file handles
+        for entry in os.listdir(collection_path):
+            entry_path = os.path.join(collection_path, entry)
+            if entry not in (generation, previous_generation) and os.path.isdir(entry_path):
+                shutil.rmtree(entry_path, ignore_errors=True)
+
+    # ----------------- collections -----------------
+
+    async def is_collection_exists(self, collection_name: str) -> bool:
+        return os.path.exists(self.get_manifest_path(collection_name))
+
+    async def list_all_collections(self):
+        return [
+            entry for entry in sorted(os.listdir(self.db_path))
+            if os.path.exists(self.get_manifest_path(entry))
+        ]
+
+    async def get_collection_info(self, collection_name: str) -> dict:
+
+        collection = self.load_collection(collection_name)
+        if collection is None:
+            return None
+
+        return {
+            **collection.manifest,
+            "vectors_bytes": int(collection.vectors.nbytes),
+            "vocabulary_size": len(collection.vocab)
+        }
+
+    async def delete_collection(self, collection_name: str) -> bool:
+
+        self.pending.pop(collection_name, None)
+
+        if await self.is_collection_exists(collection_name):
+            shutil.rmtree(self.get_collection_path(collection_name), ignore_errors=True)
+            self.collections.pop(collection_name, None)
+            return True
+        return False
+
+    async def create_collection(self, collection_name: str, embedding_size: int, do_reset: bool = False):
+
+        if do_reset:
+            _ = await self.delete_collection(collection_name)
+
+        if not await self.is_collection_exists(collection_name):
+            self.logger.info(f"Creating new NumPy collection: {collection_name}")
+            self.write_collection(collection_name, int(embedding_size), [], np.zeros((0, int(embedding_size))), [], [])
+            return True
+
+        return False
+
+    # ----------------- writes -----------------
+
+    async def insert_one(self, collection_name: str, text: str, vector: list, entity_ids: list = None, point_id: str = None):
+
+        return await self.insert_many(
+            collection_name=collection_name,
+            texts=[text],
+            vectors=[vector],
+            entity_ids=[entity_ids or []],
+            ids=[point_id] if point_id else None
+        )
+
+    async def insert_many(self, collection_name: str, texts: list, vectors: list, entity_ids: list = None, ids: list = None,
+                          sparse_vectors: list = None, batch_size: int = 50):
+        # sparse_vectors are ignored: the BM25 index is rebuilt from the texts on flush
+
+        collection = self.load_collection(collection_name)
+        if collection is None:
+            self.logger.error(f"Collection {collection_name} does not exist.")
+            return False
+
+        if not texts:
+            return True
+
+        ids = ids or [sentence_id(text) for text in texts]
+        entity_ids = entity_ids or [[] for _ in texts]
+        new_vectors = np.asarray(vectors, dtype=np.float32).reshape(len(texts), collection.dimension)
+
+        pending = self.pending.setdefault(collection_name, PendingWrites())
+        for idx, point_id in enumerate(ids):
+            pending.upsert(point_id, new_vectors[idx], texts[idx], entity_ids[idx])
+
+        return await self.flush_if_full(collection_name)
+
+    async def get_point_payloads(self, collection_name: str, payload_keys: list = None) -> dict:
+
+        collection = self.load_collection(collection_name)
+        if collection is None:
+            return {}
+
+        payloads = {}
+        for row in range(collection.count):
+            payload = {
+                "text": collection.get_text(row),
+                "entity_ids": collection.get_entity_ids(row)
+            }
+            if payload_keys:
+                payload = {key: payload[key] for key in payload_keys if key in payload}
+            payloads[str(collection.ids[row])] = payload
+
+        return payloads
+
+    async def delete_points(self, collection_name: str, ids: list) -> bool:
+
+        if self.load_collection(collection_name) is None:
+            return False
+
+        pending = self.pending.setdefault(collection_name, PendingWrites())
+        for point_id in ids:
+            pending.delete(point_id)
+
+        return await self.flush_if_full(collection_name)
+
+    async def update_payloads(self, collection_name: str, payloads: dict) -> bool:
+
+        if self.load_collection(collection_name) is None:
+            return False
+
+        pending = self.pending.setdefault(collection_name, PendingWrites())
+        for point_id, payload in payloads.items():
+            if payload:
+                pending.update_payload(point_id, payload)
+
+        return await self.flush_if_full(collection_name)
+
+    async def get_index_version(self, collection_name: str) -> str:
+        # The manifest is remapped only when its mtime changes, so this is a stat per call
+        collection = self.load_collection(collection_name)
+        return collection.manifest.get("index_version") if collection else None
+
+    async def set_index_version(self, collection_name: str, index_version: str) -> bool:
+
+        async with self.write_lock:
+            manifest = self.read_manifest(collection_name)
+            if manifest is None:
+                return False
+
+            manifest["index_version"] = index_version
+            self.write_manifest(collection_name, manifest)
+
+        return True
+
+    def has_pending_writes(self, collection_name: str) -> bool:
+        return bool(self.pending.get(collection_name)) or collection_name in self.flushing
+
+    async def flush_if_full(self, collection_name: str) -> bool:
+
+        if self.write_buffer_rows and len(self.pending.get(collection_name) or ()) >= self.write_buffer_rows:
+            return await self.flush(collection_name)
+
+        return True
+
+    async def flush(self, collection_name: str) -> bool:
+
+        async with self.write_lock:
+            pending = self.pending.pop(collection_name, None)
+            if not pending:
+                return True
+
+            # Writes buffered while this flush runs go to a fresh buffer and the next flush
+            self.flushing[collection_name] = len(pending)
+            try:
+                await asyncio.to_thread(self.apply_pending_writes, collection_name, pending)
+            except Exception as e:
+                self.logger.error(f"Error while flushing {len(pending)} writes to {collection_name}: {e}")
+                return False
+            finally:
+                self.flushing.pop(collection_name, None)
+
+        return True
+
+    def apply_pending_writes(self, collection_name: str, pending: PendingWrites):
+
+        collection = self.load_collection(collection_name)
+        if collection is None:
+            raise FileNotFoundError(f"Collection {collection_name} does not exist.")
+
+        current_ids, current_vectors, current_texts, current_entity_ids = self.read_all(collection)
+        row_of = {point_id: row for row, point_id in enumerate(current_ids)}
+
+        for point_id, payload in pending.payloads.items():
+            row = row_of.get(point_id)
+            if row is None:
+                continue
+            current_texts[row] = payload.get("text", current_texts[row])
+            current_entity_ids[row] = payload.get("entity_ids", current_entity_ids[row])
+
+        # Upsert semantics: replace rows whose id already exists
+        appended = []
+        for point_id, (vector, text, point_entity_ids) in pending.upserts.items():
+            row = row_of.get(point_id)
+            if row is None:
+                appended.append(point_id)
+                continue
+            current_vectors[row] = vector
+            current_texts[row] = text
+            current_entity_ids[row] = point_entity_ids
+
+        keep = [row for row, point_id in enumerate(current_ids) if point_id not in pending.deletes]
+        appended_vectors = np.asarray(
+            [pending.upserts[point_id][0] for point_id in appended], dtype=np.float32
+        ).reshape(-1, collection.dimension)
+
+        self.write_collection(
+            collection_name,
+            collection.dimension,
+            [current_ids[row] for row in keep] + appended,
+            np.vstack([current_vectors[keep], appended_vectors]),
+            [current_texts[row] for row in keep] + [pending.upserts[point_id][1] for point_id in appended],
+            [current_entity_ids[row] for row in keep] + [pending.upserts[point_id][2] for point_id in appended]
+        )
+
+    # ----------------- search -----------------
+
+    def dense_scores(self, collection: NumpyCollection, query_vector: list, rows: np.ndarray = None):
+        """Exact scores for `rows` (every row by default), higher is better."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        if self.distance_method == DistanceMetricEnums.COSINE.value:
+            query = query / (np.linalg.norm(query) or 1.0)
+
+        if rows is not None:
+            scores = collection.get_rows(rows) @ query
+            sq_norms = np.asarray(collection.sq_norms[rows])
+        else:
+            scores = np.empty(collection.count, dtype=np.float32)
+            for start in range(0, collection.count, SEARCH_BLOCK_ROWS):
+                end = min(start + SEARCH_BLOCK_ROWS, collection.count)
+                scores[start:end] = collection.get_block(start, end) @ query
+            sq_norms = np.asarray(collection.sq_norms)
+
+        if self.distance_method == DistanceMetricEnums.EUCLIDEAN.value:
+            # -||v - q||, so that larger still means closer
+            sq_distance = sq_norms - 2 * scores + float(query @ query)
+            scores = -np.sqrt(np.maximum(sq_distance, 0))
+
+        return scores
+
+    def two_stage_dense_scores(self, collection: NumpyCollection, query_vector: list, limit: int):
+        """Scan the coarse prefixes, then rescore the best `limit * coarse_multiplier`
+        rows with the full vectors; every other row scores -inf."""
+        coarse_dimension = collection.manifest["coarse_dimension"]
+        query = np.asarray(truncate_vector(query_vector, coarse_dimension), dtype=np.float32)
+
+        coarse_scores = np.empty(collection.count, dtype=np.float32)
+        for start in range(0, collection.count, SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, collection.count)
+            coarse_scores[start:end] = np.asarray(collection.coarse[start:end], dtype=np.float32) @ query
+
+        candidates = self.top_k(coarse_scores, limit * self.coarse_multiplier)
+
+        scores = np.full(collection.count, -np.inf, dtype=np.float32)
+        scores[candidates] = self.dense_scores(collection, query_vector, rows=candidates)
+
+        return scores
+
+    def sparse_scores(self, collection: NumpyCollection, text: str):
+        """BM25 scores for every row (zero where no query term matches)."""
+        scores = np.zeros(collection.count, dtype=np.float32)
+        avgdl = collection.manifest["avgdl"] or 1.0
+        doc_len = np.asarray(collection.doc_len)
+
+        for token in set(tokenize(text)):
+            term_id = collection.vocab.get(token)
+            if term_id is None:
+                continue
+
+            start, end = collection.bm25_indptr[term_id], collection.bm25_indptr[term_id + 1]
+            docs = np.asarray(collection.bm25_docs[start:end])
+            tf = np.asarray(collection.bm25_tf[start:end])
+
+            idf = math.log(1 + (collection.count - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_len[docs] / avgdl)
+            np.add.at(scores, docs, idf * tf * (BM25_K1 + 1) / norm)
+
+        return scores
+
+    @staticmethod
+    def top_k(scores: np.ndarray, limit: int, mask: np.ndarray = None):
+
+        candidates = np.arange(len(scores)) if mask is None else np.flatnonzero(mask)
+        if candidates.size == 0:
+            return candidates
+
+        limit = min(limit, candidates.size)
+        selected = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+
+        return selected[np.argsort(-scores[selected], kind="stable")]
+
+    @staticmethod
+    def fuse_dbsf(branches: list):
+        """Distribution-based score fusion: normalize each branch by mean +/- 3 std, then sum."""
+        fused = {}
+
+        for rows, scores in branches:
+            if len(rows) == 0:
+                continue
+
+            mean, std = float(scores.mean()), float(scores.std())
+            low, span = mean - 3 * std, 6 * std
+
+            for row, score in zip(rows, scores):
+                # A branch whose scores are all equal lands in the middle of the range
+                normalized = min(max((float(score) - low) / span, 0.0), 1.0) if span > 0 else 0.5
+                fused[int(row)] = fused.get(int(row), 0.0) + normalized
+
+        return fused
+
+    @staticmethod
+    def fuse_rrf(branches: list):
+        """Reciprocal rank fusion: sum 1 / (k + rank) over the branches."""
+        fused = {}
+
+        for rows, _ in branches:
+            for rank, row in enumerate(rows):
+                fused[int(row)] = fused.get(int(row), 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        return fused
+
+    async def search_by_vector(self, collection_name: str, text: str, query_vector: list, limit: int,
+                               profile: RetrievalProfile = None):
+
+        profile = profile or RETRIEVAL_PROFILES[RetrievalProfileEnums.BALANCED.value]
+
+        collection = self.load_collection(collection_name)
+        if collection is None or collection.count == 0:
+            return []
+
+        # The scan runs off the event loop; a flush meanwhile keeps this generation's files
+        return await asyncio.to_thread(self.search_collection, collection, text, query_vector, limit, profile)
+
+    def search_collection(self, collection: NumpyCollection, text: str, query_vector: list, limit: int,
+                          profile: RetrievalProfile):
+
+        # Search is exact, so the profile's hnsw_ef has nothing to tune here
+        dense_limit = limit * profile.dense_prefetch_multiplier
+        if collection.coarse is not None:
+            dense = self.two_stage_dense_scores(collection, query_vector, dense_limit)
+        else:
+            dense = self.dense_scores(collection, query_vector)
+
+        dense_mask = np.isfinite(dense)
+        if profile.dense_score_threshold is not None:
+            # Scores are negated distances for euclid, where the threshold is an upper bound
+            threshold = profile.dense_score_threshold
+            dense_mask &= dense >= (-threshold if self.distance_method == DistanceMetricEnums.EUCLIDEAN.value else threshold)
+        dense_rows = self.top_k(dense, dense_limit, mask=dense_mask)
+
+        sparse = self.sparse_scores(collection, text)
+        sparse_rows = self.top_k(sparse, limit * profile.sparse_prefetch_multiplier, mask=sparse > 0)
+
+        fuse = self.fuse_rrf if profile.fusion == FusionMethodEnums.RRF.value else self.fuse_dbsf
+        fused = fuse([
+            (dense_rows, dense[dense_rows]),
+            (sparse_rows, sparse[sparse_rows])
+        ])
+
+        ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+        if profile.score_threshold is not None:
+            ranked = [(row, score) for row, score in ranked if score >= profile.score_threshold]
+        ranked = ranked[:limit]
+
+        return [
+            SearchResultSchema(**{
+                "score": score,
+                "text": collection.get_text(row),
+                "entity_ids": collection.get_entity_ids(row)
+            })
+            for row, score in ranked
+        ]
+
+    # ----------------- semantic cache -----------------
+
+    async def is_cache_collection_exists(self, cache_name: str) -> bool:
+        return cache_name in self.caches
+
+    async def delete_cache_collection(self, cache_name: str) -> bool:
+        if await self.is_cache_collection_exists(cache_name):
+            del self.caches[cache_name]
+            return True
+        return False
+
+    async def create_cache_collection(self, cache_name: str, embedding_size: int, do_reset: bool = False):
+
+        if do_reset:
+            _ = await self.delete_cache_collection(cache_name)
+
+        if not await self.is_cache_collection_exists(cache_name):
+            self.caches[cache_name] = InMemoryCache(int(embedding_size))
+
+    def get_cache(self, cache_name: str, dimension: int = None):
+
+        if cache_name not in self.caches and dimension:
+            self.caches[cache_name] = InMemoryCache(int(dimension))
+
+        return self.caches.get(cache_name)
+
+    def cache_mask(self, cache: InMemoryCache, index_version: str = None):
+
+        mask = np.ones(len(cache), dtype=bool)
+
+        if self.cache_ttl_seconds:
+            mask &= cache.created_at >= time.time() - self.cache_ttl_seconds
+
+        if index_version:
+            mask &= np.asarray([payload.get("index_version") == index_version for payload in cache.payloads], dtype=bool)
+
+        return mask
+
+    async def search_cache(self, cache_name: str, vector: list, index_version: str = None):
+
+        cache = self.get_cache(cache_name)
+        if not cache:
+            return []
+
+        mask = self.cache_mask(cache, index_version)
+        if not mask.any():
+            return []
+
+        # The semantic cache always uses euclidean distance, lower is closer
+        distances = np.linalg.norm(cache.vectors - np.asarray(vector, dtype=np.float32), axis=1)
+        distances[~mask] = np.inf
+        row = int(np.argmin(distances))
+
+        return [SimpleNamespace(id=cache.ids[row], score=float(distances[row]), payload=cache.payloads[row])]
+
+    async def touch_cache_entry(self, cache_name: str, point_id):
+
+        cache = self.get_cache(cache_name)
+        if not cache or point_id not in cache.ids:
+            return False
+
+        row = cache.ids.index(point_id)
+        cache.last_hit_at[row] = time.time()
+        cache.payloads[row]["last_hit_at"] = cache.last_hit_at[row]
+
+        return True
+
+    async def add_to_cache(self, cache_name: str, vector: list, response_text: str, index_version: str = None):
+
+        cache = self.get_cache(cache_name, dimension=len(vector))
+        now = time.time()
+
+        cache.add(str(uuid.uuid4()), vector, {
+            "response_text": response_text,
+            "created_at": now,
+            "last_hit_at": now,
+            "index_version": index_version
+        })
+
+        await self.enforce_cache_limits(cache_name)
+
+        return True
+
+    async def invalidate_cache(self, cache_name: str, index_version: str) -> int:
+
+        cache = self.get_cache(cache_name)
+        if not cache:
+            return 0
+
+        stale = [row for row, payload in enumerate(cache.payloads) if payload.get("index_version") != index_version]
+        removed = cache.remove(stale)
+
+        if removed:
+            SEMANTIC_CACHE_EVICTIONS.labels(cache=cache_name, reason=CacheEvictionReason.VERSION.value).inc(removed)
+        SEMANTIC_CACHE_ENTRIES.labels(cache=cache_name).set(len(cache))
+
+        return removed
+
+    async def enforce_cache_limits(self, cache_name: str):
+
+        cache = self.get_cache(cache_name)
+
+        if self.cache_max_entries and len(cache) > self.cache_max_entries and self.cache_ttl_seconds:
+            expired = np.flatnonzero(cache.created_at < time.time() - self.cache_ttl_seconds)
+            removed = cache.remove(expired)
+            if removed:
+                SEMANTIC_CACHE_EVICTIONS.labels(cache=cache_name, reason=CacheEvictionReason.TTL.value).inc(removed)
+
+        if self.cache_max_entries and len(cache) > self.cache_max_entries:
+            target_size = int(self.cache_max_entries * self.cache_low_watermark)
+            oldest = np.argsort(cache.last_hit_at, kind="stable")[:len(cache) - target_size]
+            removed = cache.remove(oldest)
+            SEMANTIC_CACHE_EVICTIONS.labels(cache=cache_name, reason=CacheEvictionReason.LRU.value).inc(removed)
+
+        SEMANTIC_CACHE_ENTRIES.labels(cache=cache_name).set(len(cache))
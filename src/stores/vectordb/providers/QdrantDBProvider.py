@@ -1,22 +1,50 @@
 from ..VectorDBInterface import VectorDBInterface
-from ..VectorDBEnums import DistanceMetricEnums, QdrantVectorType
-from qdrant_client import QdrantClient, models
+from ..VectorDBEnums import DistanceMetricEnums, QdrantVectorType, CacheEvictionReason, FusionMethodEnums, RetrievalProfileEnums, QuantizationEnums
+from ..RetrievalProfiles import RETRIEVAL_PROFILES
+from qdrant_client import AsyncQdrantClient, models
 from schemes.SearchResultSchema import SearchResultSchema
+from schemes.RetrievalProfile import RetrievalProfile
+from utils.metrics import SEMANTIC_CACHE_ENTRIES, SEMANTIC_CACHE_EVICTIONS
+from utils.stage_timing import stage_timer
+from utils.tracing import get_tracer
+from utils.content_ids import sentence_id
+from utils.vectors import truncate_vector
 import uuid
+import time
 import logging
 from typing import List
 
 class QdrantDBProvider(VectorDBInterface):
 
-    def __init__(self, db_client: str, qdrant_cache:str, distance_method: str, cache_threshold=0.35):
+    def __init__(self, db_client: str, qdrant_cache:str, distance_method: str, cache_threshold=0.35,
+                 cache_max_entries: int = 10000, cache_ttl_seconds: int = None, server_config: dict = None,
+                 quantization: str = None, quantization_always_ram: bool = True, quantization_rescore: bool = True,
+                 quantization_oversampling: float = None, vectors_on_disk: bool = False, payload_on_disk: bool = False,
+                 hnsw_m: int = None, hnsw_ef_construct: int = None,
+                 coarse_dimension: int = None, coarse_multiplier: int = 4,
+                 cache_count_interval: int = 100, index_version_ttl_seconds: int = 10):
 
         self.client = None
         self.cache_client = None
         self.db_client = db_client
         self.qdrant_cache = qdrant_cache
+        # When set, both clients talk to one Qdrant server instead of local files
+        self.server_config = server_config
         self.distance_method = None
         self.modifier = models.Modifier.IDF
         self.cache_threshold = cache_threshold
+        self.cache_max_entries = cache_max_entries
+        self.cache_ttl_seconds = cache_ttl_seconds
+        # Evict down to this size so eviction does not run on every insert
+        self.cache_low_watermark = 0.9
+        # Cache sizes are estimated between exact counts, taken every `cache_count_interval` inserts
+        self.cache_count_interval = cache_count_interval
+        self.cache_sizes = {}
+        self.cache_inserts_since_count = {}
+
+        # Collection name -> (index version, fetched at), shared by every request of the process
+        self.index_version_ttl_seconds = index_version_ttl_seconds
+        self.index_versions = {}
 
         if distance_method == DistanceMetricEnums.COSINE.value:
             self.distance_method = models.Distance.COSINE
@@ -25,20 +53,75 @@ class QdrantDBProvider(VectorDBInterface):
         elif distance_method == DistanceMetricEnums.DOT_PRODUCT.value:
             self.distance_method = models.Distance.DOT
 
+        # Storage layout of the dense vectors, applied when a collection is created
+        self.vectors_on_disk = vectors_on_disk
+        self.payload_on_disk = payload_on_disk
+        self.hnsw_config = None
+        if hnsw_m or hnsw_ef_construct:
+            self.hnsw_config = models.HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct)
+
+        self.quantization_config = None
+        if quantization == QuantizationEnums.SCALAR.value:
+            self.quantization_config = models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=quantization_always_ram
+                )
+            )
+        elif quantization == QuantizationEnums.BINARY.value:
+            self.quantization_config = models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=quantization_always_ram)
+            )
+
+        # Search the quantized vectors, then rescore the oversampled candidates with the originals
+        self.quantization_search_params = None
+        if self.quantization_config:
+            self.quantization_search_params = models.QuantizationSearchParams(
+                rescore=quantization_rescore,
+                oversampling=quantization_oversampling
+            )
+
+        # Two-stage retrieval: HNSW over a truncated prefix, rescoring with the full vector
+        self.coarse_dimension = coarse_dimension
+        self.coarse_multiplier = coarse_multiplier
+        # Collection name -> whether its schema has the coarse vector
+        self.coarse_collections = {}
+
         self.logger = logging.getLogger(__name__)
+        self.tracer = get_tracer(__name__)
+
+    def build_client(self, path: str, shared_client: AsyncQdrantClient = None):
+
+        if not self.server_config:
+            return AsyncQdrantClient(path=path)
+
+        # Corpus and cache share one connection pool in server mode
+        if shared_client is not None:
+            return shared_client
+
+        self.logger.info(f"Connecting to Qdrant server: {self.server_config.get('url') or self.server_config.get('host')}")
+        return AsyncQdrantClient(**self.server_config)
+
+    async def close_client(self, client: AsyncQdrantClient, other_client: AsyncQdrantClient):
+        # A shared client is closed by whichever side releases it last
+        if client and client is not other_client:
+            await client.close()
 
     async def cache_connect(self):
-        self.cache_client = QdrantClient(path=self.qdrant_cache)
+        self.cache_client = self.build_client(self.qdrant_cache, shared_client=self.client)
     
     async def cache_disconnect(self):
+        await self.close_client(self.cache_client, self.client)
         self.cache_client = None
     
     async def is_cache_collection_exists(self, cache_name: str) -> bool:
-        return self.cache_client.collection_exists(collection_name=cache_name)
+        return await self.cache_client.collection_exists(collection_name=cache_name)
     
     async def delete_cache_collection(self, cache_name: str) -> bool:
+        self.cache_sizes.pop(cache_name, None)
         if await self.is_cache_collection_exists(cache_name):
-            self.cache_client.delete_collection(collection_name=cache_name)
+            await self.cache_client.delete_collection(collection_name=cache_name)
             return True
         return False
     
@@ -51,62 +134,245 @@ class QdrantDBProvider(VectorDBInterface):
             self.logger.info(
                 f"Creating new Qdrant cache collection: {cache_name}")
     
-            self.cache_client.create_collection(
+            await self.cache_client.create_collection(
                 collection_name=cache_name,
                 vectors_config=models.VectorParams(
                     size=embedding_size,
-                    distance=models.Distance.EUCLID
+                    distance=models.Distance.EUCLID,
+                    on_disk=self.vectors_on_disk
+                ),
+                on_disk_payload=self.payload_on_disk
+            )
+
+    def build_cache_filter(self, index_version: str = None):
+
+        conditions = []
+
+        if self.cache_ttl_seconds:
+            conditions.append(
+                models.FieldCondition(
+                    key="created_at",
+                    range=models.Range(gte=time.time() - self.cache_ttl_seconds)
+                )
+            )
+
+        if index_version:
+            conditions.append(
+                models.FieldCondition(
+                    key="index_version",
+                    match=models.MatchValue(value=index_version)
                 )
             )
 
-    async def search_cache(self, cache_name: str, vector: list):
+        if not conditions:
+            return None
 
-        search_result = self.cache_client.search(
-            collection_name=cache_name,
-            query_vector=vector,
-            limit=1
-        )
-        return search_result
+        return models.Filter(must=conditions)
+
+    async def search_cache(self, cache_name: str, vector: list, index_version: str = None):
+
+        with stage_timer("qdrant_cache_query", "qdrant", cache_name):
+            search_result = await self.cache_client.query_points(
+                collection_name=cache_name,
+                query=vector,
+                query_filter=self.build_cache_filter(index_version),
+                limit=1
+            )
+        return search_result.points
+
+    async def touch_cache_entry(self, cache_name: str, point_id):
+
+        try:
+            await self.cache_client.set_payload(
+                collection_name=cache_name,
+                payload={"last_hit_at": time.time()},
+                points=[point_id]
+            )
+        except Exception as e:
+            self.logger.error(f"Error while updating cache entry: {e}")
+            return False
+
+        return True
     
-    async def add_to_cache(self, cache_name: str, vector: list, response_text: str):
+    async def add_to_cache(self, cache_name: str, vector: list, response_text: str, index_version: str = None):
 
+        now = time.time()
         point_id = str(uuid.uuid4())
         point = models.PointStruct(
             id=point_id,
             vector=vector,
             payload={
-                "response_text": response_text
+                "response_text": response_text,
+                "created_at": now,
+                "last_hit_at": now,
+                "index_version": index_version
             }
         )
         try:
-            self.cache_client.upsert(
+            await self.cache_client.upsert(
                 collection_name=cache_name,
                 points=[point]
             )
         except Exception as e:
             self.logger.error(f"Error while inserting cache: {e}")
             return False
+
+        await self.enforce_cache_limits(cache_name)
          
         return True
+
+    async def count_cache_entries(self, cache_name: str, cache_filter: models.Filter = None) -> int:
+
+        result = await self.cache_client.count(
+            collection_name=cache_name,
+            count_filter=cache_filter,
+            exact=True
+        )
+        return result.count
+
+    async def delete_cache_entries(self, cache_name: str, cache_filter: models.Filter, reason: CacheEvictionReason) -> int:
+
+        removed = await self.count_cache_entries(cache_name, cache_filter)
+
+        if removed:
+            await self.cache_client.delete(
+                collection_name=cache_name,
+                points_selector=models.FilterSelector(filter=cache_filter)
+            )
+            SEMANTIC_CACHE_EVICTIONS.labels(cache=cache_name, reason=reason.value).inc(removed)
+
+        return removed
+
+    async def purge_expired_cache(self, cache_name: str) -> int:
+
+        if not self.cache_ttl_seconds:
+            return 0
+
+        return await self.delete_cache_entries(
+            cache_name,
+            models.Filter(must=[
+                models.FieldCondition(
+                    key="created_at",
+                    range=models.Range(lt=time.time() - self.cache_ttl_seconds)
+                )
+            ]),
+            CacheEvictionReason.TTL
+        )
+
+    async def invalidate_cache(self, cache_name: str, index_version: str) -> int:
+        """Drop every cache entry that was not stamped with `index_version`."""
+        if not await self.is_cache_collection_exists(cache_name):
+            return 0
+
+        removed = await self.delete_cache_entries(
+            cache_name,
+            models.Filter(must_not=[
+                models.FieldCondition(
+                    key="index_version",
+                    match=models.MatchValue(value=index_version)
+                )
+            ]),
+            CacheEvictionReason.VERSION
+        )
+
+        self.cache_sizes[cache_name] = await self.count_cache_entries(cache_name)
+        self.cache_inserts_since_count[cache_name] = 0
+        SEMANTIC_CACHE_ENTRIES.labels(cache=cache_name).set(self.cache_sizes[cache_name])
+        self.logger.info(f"Invalidated {removed} stale entries from {cache_name}")
+
+        return removed
+
+    async def evict_least_recently_used(self, cache_name: str, count: int) -> int:
+
+        entries = []
+        offset = None
+
+        while True:
+            points, offset = await self.cache_client.scroll(
+                collection_name=cache_name,
+                with_payload=["last_hit_at"],
+                with_vectors=False,
+                limit=1000,
+                offset=offset
+            )
+            entries.extend(
+                (point.payload.get("last_hit_at") or 0, point.id)
+                for point in points
+            )
+            if offset is None:
+                break
+
+        entries.sort(key=lambda entry: entry[0])
+        point_ids = [point_id for _, point_id in entries[:count]]
+
+        if point_ids:
+            await self.cache_client.delete(
+                collection_name=cache_name,
+                points_selector=models.PointIdsList(points=point_ids)
+            )
+            SEMANTIC_CACHE_EVICTIONS.labels(cache=cache_name, reason=CacheEvictionReason.LRU.value).inc(len(point_ids))
+
+        return len(point_ids)
+
+    async def estimate_cache_size(self, cache_name: str) -> int:
+        """Cache size counting this process's inserts since the last exact count.
+
+        The exact count is taken periodically, and whenever the estimate
+        reaches the limit, so inserts from other workers are picked up
+        before anything is evicted.
+        """
+        size = self.cache_sizes.get(cache_name)
+        inserts = self.cache_inserts_since_count.get(cache_name, 0) + 1
+
+        if size is None or inserts >= (self.cache_count_interval or 1) \
+                or (self.cache_max_entries and size + 1 > self.cache_max_entries):
+            size, inserts = await self.count_cache_entries(cache_name), 0
+        else:
+            size += 1
+
+        self.cache_inserts_since_count[cache_name] = inserts
+        return size
+
+    async def enforce_cache_limits(self, cache_name: str):
+
+        try:
+            size = await self.estimate_cache_size(cache_name)
+
+            if self.cache_max_entries and size > self.cache_max_entries:
+                size -= await self.purge_expired_cache(cache_name)
+
+            if self.cache_max_entries and size > self.cache_max_entries:
+                target_size = int(self.cache_max_entries * self.cache_low_watermark)
+                size -= await self.evict_least_recently_used(cache_name, size - target_size)
+
+            self.cache_sizes[cache_name] = size
+            SEMANTIC_CACHE_ENTRIES.labels(cache=cache_name).set(size)
+
+        except Exception as e:
+            self.cache_sizes.pop(cache_name, None)
+            self.logger.error(f"Error while enforcing cache limits: {e}")
     
     async def connect(self):
-        self.client = QdrantClient(path=self.db_client)
+        self.client = self.build_client(self.db_client, shared_client=self.cache_client)
 
     async def disconnect(self):
+        await self.close_client(self.client, self.cache_client)
         self.client = None
 
     async def is_collection_exists(self, collection_name: str) -> bool:
-        return self.client.collection_exists(collection_name=collection_name)
+        return await self.client.collection_exists(collection_name=collection_name)
 
     async def list_all_collections(self):
-        return self.client.get_collections()
+        return await self.client.get_collections()
 
     async def get_collection_info(self, collection_name: str) -> dict:
-        return self.client.get_collection(collection_name=collection_name)
+        return await self.client.get_collection(collection_name=collection_name)
 
     async def delete_collection(self, collection_name: str) -> bool:
+        self.coarse_collections.pop(collection_name, None)
+        self.index_versions.pop(collection_name, None)
         if await self.is_collection_exists(collection_name):
-            self.client.delete_collection(collection_name=collection_name)
+            await self.client.delete_collection(collection_name=collection_name)
             return True
         return False
 
@@ -119,69 +385,180 @@ class QdrantDBProvider(VectorDBInterface):
             self.logger.info(
                 f"Creating new Qdrant collection: {collection_name}")
 
-            self.client.create_collection(
+            await self.client.create_collection(
                 collection_name=collection_name,
-                vectors_config={
-                    QdrantVectorType.DENSE.value: models.VectorParams(
-                        size=embedding_size,
-                        distance=self.distance_method
-                    ),
-                },
+                vectors_config=self.build_dense_vectors_config(embedding_size),
                 sparse_vectors_config={
                     QdrantVectorType.SPARSE.value: models.SparseVectorParams(
                         modifier=self.modifier
                     )
-                }
+                },
+                on_disk_payload=self.payload_on_disk
             )
 
+            await self.create_payload_indexes(collection_name)
+
             return True
 
+        # Report a schema mismatch when indexing starts rather than on the first query
+        _ = await self.has_coarse_vectors(collection_name)
+
         return False
 
-    async def insert_one(self, collection_name: str, text: str, vector: list, entity_ids: list = None):
+    async def has_coarse_vectors(self, collection_name: str) -> bool:
+        """Whether two-stage retrieval applies to `collection_name`, checked once per collection.
+
+        A collection created without the coarse vector, or with another size,
+        keeps single-stage search instead of failing on an unknown vector.
+        """
+        if not self.coarse_dimension:
+            return False
+
+        if collection_name not in self.coarse_collections:
+            info = await self.client.get_collection(collection_name=collection_name)
+            vectors = info.config.params.vectors
+            coarse = vectors.get(QdrantVectorType.DENSE_COARSE.value) if isinstance(vectors, dict) else None
+
+            available = coarse is not None and coarse.size == self.coarse_dimension
+            if not available:
+                self.logger.warning(
+                    f"Collection {collection_name} has no {QdrantVectorType.DENSE_COARSE.value} vector of size "
+                    f"{self.coarse_dimension}, two-stage retrieval is disabled for it; "
+                    f"re-index with a reset to enable MATRYOSHKA_COARSE_DIMENSION"
+                )
+            self.coarse_collections[collection_name] = available
+
+        return self.coarse_collections[collection_name]
+
+    def build_dense_vectors_config(self, embedding_size: int):
+
+        if not self.coarse_dimension:
+            return {
+                QdrantVectorType.DENSE.value: models.VectorParams(
+                    size=embedding_size,
+                    distance=self.distance_method,
+                    on_disk=self.vectors_on_disk,
+                    hnsw_config=self.hnsw_config,
+                    quantization_config=self.quantization_config
+                ),
+            }
+
+        # The full vector is only read to rescore candidates, so it needs no graph
+        # and is the natural one to keep on disk; the coarse one carries the index
+        return {
+            QdrantVectorType.DENSE.value: models.VectorParams(
+                size=embedding_size,
+                distance=self.distance_method,
+                on_disk=self.vectors_on_disk,
+                hnsw_config=models.HnswConfigDiff(m=0)
+            ),
+            QdrantVectorType.DENSE_COARSE.value: models.VectorParams(
+                size=self.coarse_dimension,
+                distance=self.distance_method,
+                hnsw_config=self.hnsw_config,
+                quantization_config=self.quantization_config
+            ),
+        }
+
+    def build_point_vectors(self, text: str, vector: list, sparse_vector: dict = None, coarse: bool = False):
+
+        point_vectors = {
+            QdrantVectorType.DENSE.value: vector,
+            # Pre-encoded sparse vectors skip the inline BM25 inference
+            QdrantVectorType.SPARSE.value: models.SparseVector(**sparse_vector) if sparse_vector else models.Document(
+                text=text,
+                model="Qdrant/bm25",
+            ),
+        }
+
+        if coarse:
+            point_vectors[QdrantVectorType.DENSE_COARSE.value] = truncate_vector(vector, self.coarse_dimension)
+
+        return point_vectors
+
+    def build_dense_prefetch(self, query_vector: list, limit: int, profile: RetrievalProfile, coarse: bool = False):
+
+        search_params = models.SearchParams(
+            hnsw_ef=profile.hnsw_ef,
+            quantization=self.quantization_search_params
+        )
+
+        if not coarse:
+            return models.Prefetch(
+                query=query_vector,
+                using=QdrantVectorType.DENSE.value,
+                limit=limit,
+                score_threshold=profile.dense_score_threshold,
+                params=search_params
+            )
+
+        return models.Prefetch(
+            prefetch=models.Prefetch(
+                query=truncate_vector(query_vector, self.coarse_dimension),
+                using=QdrantVectorType.DENSE_COARSE.value,
+                limit=limit * self.coarse_multiplier,
+                params=search_params
+            ),
+            query=query_vector,
+            using=QdrantVectorType.DENSE.value,
+            limit=limit,
+            score_threshold=profile.dense_score_threshold
+        )
+
+    async def create_payload_indexes(self, collection_name: str):
+        # Keyword index so entity filters do not scan every payload
+        try:
+            await self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name="entity_ids",
+                field_schema=models.PayloadSchemaType.KEYWORD
+            )
+        except Exception as e:
+            self.logger.error(f"Error while creating payload indexes: {e}")
+
+    async def insert_one(self, collection_name: str, text: str, vector: list, entity_ids: list = None, point_id: str = None):
 
         if not await self.is_collection_exists(collection_name):
             self.logger.error(f"Collection {collection_name} does not exist.")
             return False
 
         point = models.PointStruct(
-            id=id,
-            vector=vector,
+            id=point_id or sentence_id(text),
+            vector=self.build_point_vectors(text, vector, coarse=await self.has_coarse_vectors(collection_name)),
             payload={
                 "text": text,
-                "entity_id": entity_ids
+                "entity_ids": entity_ids or []
             }
         )
 
-        self.client.upsert(
+        await self.client.upsert(
             collection_name=collection_name,
             points=[point]
         )
 
         return True
 
-    async def insert_many(self, collection_name: str, texts: list, vectors: list, entity_ids: list = None, batch_size: int = 50):
+    async def insert_many(self, collection_name: str, texts: list, vectors: list, entity_ids: list = None, ids: list = None,
+                          sparse_vectors: list = None, batch_size: int = 50):
 
         if not await self.is_collection_exists(collection_name):
             self.logger.error(f"Collection {collection_name} does not exist.")
             return False
 
+        coarse = await self.has_coarse_vectors(collection_name)
+
         for start_idx in range(0, len(texts), batch_size):
 
             batch_text = texts[start_idx: start_idx + batch_size]
             batch_vectors = vectors[start_idx: start_idx + batch_size]
             batch_entity_ids = entity_ids[start_idx: start_idx + batch_size]
+            batch_ids = ids[start_idx: start_idx + batch_size] if ids else [sentence_id(text) for text in batch_text]
+            batch_sparse_vectors = sparse_vectors[start_idx: start_idx + batch_size] if sparse_vectors else [None] * len(batch_text)
 
             batch_points = [
                 models.PointStruct(
-                    id=str(uuid.uuid4()),
-                    vector={
-                        QdrantVectorType.DENSE.value: batch_vectors[x],
-                        QdrantVectorType.SPARSE.value: models.Document(
-                            text=batch_text[x],
-                            model="Qdrant/bm25",
-                        ),
-                    },
+                    id=batch_ids[x],
+                    vector=self.build_point_vectors(batch_text[x], batch_vectors[x], batch_sparse_vectors[x], coarse),
                     payload={
                         "text": batch_text[x],
                         "entity_ids": batch_entity_ids[x]
@@ -191,10 +568,15 @@ class QdrantDBProvider(VectorDBInterface):
             ]
 
             try:
-                self.client.upsert(
-                    collection_name=collection_name,
-                    points=batch_points
-                )
+                with self.tracer.start_as_current_span("qdrant.upsert", attributes={
+                    "db.system": "qdrant",
+                    "db.collection.name": collection_name,
+                    "db.operation.batch.size": len(batch_points)
+                }):
+                    await self.client.upsert(
+                        collection_name=collection_name,
+                        points=batch_points
+                    )
 
             except Exception as e:
                 self.logger.error(f"Error while inserting batch: {e}")
@@ -202,31 +584,159 @@ class QdrantDBProvider(VectorDBInterface):
 
         return True
 
-    async def search_by_vector(self, collection_name: str, text: str, query_vector: List, limit: int):
+    async def get_point_payloads(self, collection_name: str, payload_keys: list = None) -> dict:
 
-        results = self.client.query_points(
-            collection_name=collection_name,
-            prefetch=[
-                models.Prefetch(
-                    query=query_vector,
-                    using=QdrantVectorType.DENSE.value,
-                    limit=limit,
-                ),
-                models.Prefetch(
-                    query=models.Document(
-                        text=text,
-                        model="Qdrant/bm25",
-                    ),
-                    using=QdrantVectorType.SPARSE.value,
-                    limit=limit,
-                )
-            ],
-            query=models.FusionQuery(
-                fusion=models.Fusion.DBSF
-            ),
-            limit=limit
+        payloads = {}
+        offset = None
+
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=collection_name,
+                with_payload=payload_keys if payload_keys else True,
+                with_vectors=False,
+                limit=1000,
+                offset=offset
+            )
+            payloads.update(
+                (str(point.id), point.payload or {}) for point in points
+            )
+            if offset is None:
+                break
+
+        return payloads
+
+    async def delete_points(self, collection_name: str, ids: list) -> bool:
+
+        try:
+            await self.client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=ids)
+            )
+        except Exception as e:
+            self.logger.error(f"Error while deleting points: {e}")
+            return False
+
+        return True
+
+    async def update_payloads(self, collection_name: str, payloads: dict) -> bool:
+
+        operations = [
+            models.SetPayloadOperation(
+                set_payload=models.SetPayload(payload=payload, points=[point_id])
+            )
+            for point_id, payload in payloads.items()
+        ]
+
+        try:
+            await self.client.batch_update_points(
+                collection_name=collection_name,
+                update_operations=operations
+            )
+        except Exception as e:
+            self.logger.error(f"Error while updating payloads: {e}")
+            return False
+
+        return True
+
+    @staticmethod
+    def get_index_version_alias_prefix(collection_name: str) -> str:
+        return f"{collection_name}__index_version_"
+
+    async def get_index_version(self, collection_name: str) -> str:
+        """Version of the indexed corpus, kept in a collection alias so every
+        process reading the collection agrees on it, cached for a short TTL."""
+        cached = self.index_versions.get(collection_name)
+        if cached and time.time() - cached[1] < self.index_version_ttl_seconds:
+            return cached[0]
+
+        prefix = self.get_index_version_alias_prefix(collection_name)
+        try:
+            result = await self.client.get_collection_aliases(collection_name=collection_name)
+        except Exception as e:
+            self.logger.error(f"Error while reading the index version of {collection_name}: {e}")
+            return cached[0] if cached else None
+
+        index_version = next(
+            (alias.alias_name[len(prefix):] for alias in result.aliases if alias.alias_name.startswith(prefix)),
+            None
         )
+        self.index_versions[collection_name] = (index_version, time.time())
+
+        return index_version
+
+    async def set_index_version(self, collection_name: str, index_version: str) -> bool:
+
+        prefix = self.get_index_version_alias_prefix(collection_name)
+
+        try:
+            result = await self.client.get_collection_aliases(collection_name=collection_name)
+
+            # The old alias is dropped and the new one created in one atomic update
+            operations = [
+                models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias.alias_name))
+                for alias in result.aliases if alias.alias_name.startswith(prefix)
+            ]
+            operations.append(models.CreateAliasOperation(
+                create_alias=models.CreateAlias(collection_name=collection_name, alias_name=f"{prefix}{index_version}")
+            ))
+            await self.client.update_collection_aliases(change_aliases_operations=operations)
+        except Exception as e:
+            self.logger.error(f"Error while setting the index version of {collection_name}: {e}")
+            return False
+
+        self.index_versions[collection_name] = (index_version, time.time())
+        return True
+
+    def has_pending_writes(self, collection_name: str) -> bool:
+        # Every write is applied by the server before the call returns
+        return False
+
+    async def flush(self, collection_name: str) -> bool:
+        return True
+
+    async def search_by_vector(self, collection_name: str, text: str, query_vector: List, limit: int,
+                               profile: RetrievalProfile = None):
+
+        profile = profile or RETRIEVAL_PROFILES[RetrievalProfileEnums.BALANCED.value]
+
+        fusion = models.Fusion.RRF if profile.fusion == FusionMethodEnums.RRF.value else models.Fusion.DBSF
+        coarse = await self.has_coarse_vectors(collection_name)
+
+        with stage_timer("qdrant_hybrid_query", "qdrant", collection_name) as span:
+            span.set_attributes({
+                "db.system": "qdrant",
+                "db.collection.name": collection_name,
+                "qdrant.limit": limit,
+                "qdrant.dense_prefetch_limit": limit * profile.dense_prefetch_multiplier,
+                "qdrant.sparse_prefetch_limit": limit * profile.sparse_prefetch_multiplier,
+                "qdrant.fusion": profile.fusion
+            })
+            results = await self.client.query_points(
+                collection_name=collection_name,
+                prefetch=[
+                    self.build_dense_prefetch(
+                        query_vector=query_vector,
+                        limit=limit * profile.dense_prefetch_multiplier,
+                        profile=profile,
+                        coarse=coarse
+                    ),
+                    models.Prefetch(
+                        query=models.Document(
+                            text=text,
+                            model="Qdrant/bm25",
+                        ),
+                        using=QdrantVectorType.SPARSE.value,
+                        limit=limit * profile.sparse_prefetch_multiplier,
+                    )
+                ],
+                query=models.FusionQuery(
+                    fusion=fusion
+                ),
+                limit=limit
+            )
+            span.set_attribute("db.response.returned_rows", len(results.points))
 
+        # Applied here rather than in the query so it behaves the same in local mode
         results = [
              SearchResultSchema(**{
                 "score": res.score,
@@ -234,6 +744,7 @@ class QdrantDBProvider(VectorDBInterface):
                 "entity_ids": res.payload["entity_ids"]
             })
             for res in results.points
+            if profile.score_threshold is None or res.score >= profile.score_threshold
         ]
         
         return results
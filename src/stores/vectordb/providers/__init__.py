@@ -1 +1,2 @@
 from .QdrantDBProvider import QdrantDBProvider
+from .NumpyDBProvider import NumpyDBProvider
@@ -0,0 +1,13 @@
+import uuid
+from .text_normalization import normalize_text
+
+# Fixed namespace so IDs stay stable across runs and machines
+GRAPHRAG_NAMESPACE = uuid.UUID("c6822c23-b290-4cd9-ade2-1575b2803601")
+
+
+def sentence_id(text: str) -> str:
+    return str(uuid.uuid5(GRAPHRAG_NAMESPACE, f"sentence:{text.strip()}"))
+
+
+def entity_id(name: str) -> str:
+    return str(uuid.uuid5(GRAPHRAG_NAMESPACE, f"entity:{normalize_text(name)}"))
@@ -0,0 +1,120 @@
+from collections import deque
+from typing import Dict, List, Tuple
+from .text_normalization import normalize_text
+
+
+class EntityMatcher:
+    """Aho-Corasick automaton over entity names.
+
+    Built once from a `{name: value}` mapping (usually the node name -> node id
+    map from Neo4j) and then scans any text in a single pass, so matching cost
+    no longer grows with the number of entities.
+    """
+
+    def __init__(self, entities: Dict[str, str], normalize: bool = True, normalize_arabic: bool = True):
+
+        self.normalize = normalize
+        self.normalize_arabic = normalize_arabic
+
+        # Trie stored as parallel lists indexed by state id
+        self.transitions: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[int]] = [[]]
+
+        # Pattern id -> (pattern length, [(entity name, value), ...])
+        self.patterns: List[Tuple[int, List[Tuple[str, str]]]] = []
+        pattern_ids: Dict[str, int] = {}
+
+        for name, value in entities.items():
+            pattern = self.prepare(name)
+            if not pattern:
+                continue
+
+            if pattern not in pattern_ids:
+                pattern_ids[pattern] = len(self.patterns)
+                self.patterns.append((len(pattern), []))
+                self.add_pattern(pattern, pattern_ids[pattern])
+
+            self.patterns[pattern_ids[pattern]][1].append((name, value))
+
+        self.build_failure_links()
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def prepare(self, text: str) -> str:
+
+        if not text:
+            return ""
+
+        if self.normalize:
+            return normalize_text(text, arabic=self.normalize_arabic)
+
+        return text
+
+    def add_pattern(self, pattern: str, pattern_id: int):
+
+        state = 0
+        for char in pattern:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+                self.transitions[state][char] = next_state
+            state = next_state
+
+        self.outputs[state].append(pattern_id)
+
+    def build_failure_links(self):
+
+        queue = deque(self.transitions[0].values())
+
+        while queue:
+            state = queue.popleft()
+
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+
+                target = self.transitions[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+
+                # Inherit matches of the longest proper suffix
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str, str]]:
+        """Return every `(start, end, name, value)` occurrence in `text`.
+
+        Offsets refer to the prepared (normalized) text.
+        """
+        matches = []
+        text = self.prepare(text)
+        transitions, fail, outputs = self.transitions, self.fail, self.outputs
+
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+
+            for pattern_id in outputs[state]:
+                length, entries = self.patterns[pattern_id]
+                for name, value in entries:
+                    matches.append((position - length + 1, position + 1, name, value))
+
+        return matches
+
+    def match_values(self, text: str) -> List[str]:
+        """Distinct values of the entities found in `text`, in order of first occurrence."""
+        seen = dict()
+
+        for _, _, _, value in self.find_all(text):
+            if value not in seen:
+                seen[value] = None
+
+        return list(seen.keys())
@@ -0,0 +1,114 @@
+from .text_normalization import normalize_query
+from .token_estimation import estimate_tokens
+import math
+
+
+class GraphContextBuilder:
+    """Ranks subgraph edges for a query and packs them into a token budget.
+
+    Each edge is scored from its hop distance to the seed entities, the
+    lexical overlap of its triple with the query and the degree of the node
+    it reaches (hubs are less specific). Edges are taken in score order
+    until the budget is spent and rendered as de-duplicated triples, with
+    the targets of a shared `source relationship` grouped on one line.
+    """
+
+    def __init__(self, token_budget: int = None, depth_weight: float = 1.0,
+                 similarity_weight: float = 1.0, degree_weight: float = 0.5):
+
+        self.token_budget = token_budget
+        self.depth_weight = depth_weight
+        self.similarity_weight = similarity_weight
+        self.degree_weight = degree_weight
+
+    @staticmethod
+    def tokenize(text: str) -> set:
+        return set(normalize_query(text.replace("_", " ")).split())
+
+    @staticmethod
+    def tokens_match(query_token: str, edge_token: str) -> bool:
+        # Containment absorbs Arabic clitics and English inflections (ال/بال, -s)
+        if query_token == edge_token:
+            return True
+
+        shorter, longer = sorted((query_token, edge_token), key=len)
+        return len(shorter) >= 3 and shorter in longer
+
+    def similarity(self, query_tokens: set, edge_tokens: set) -> float:
+
+        if not query_tokens or not edge_tokens:
+            return 0.0
+
+        matched = sum(
+            1 for query_token in query_tokens
+            if any(self.tokens_match(query_token, edge_token) for edge_token in edge_tokens)
+        )
+
+        return matched / len(query_tokens)
+
+    def score(self, entry: dict, query_tokens: set) -> float:
+
+        depth = entry.get("depth") or 1
+        degree = entry.get("degree") or 0
+        edge_tokens = self.tokenize(f"{entry['source']} {entry['relationship']} {entry['target']}")
+
+        return (
+            self.depth_weight / depth
+            + self.similarity_weight * self.similarity(query_tokens, edge_tokens)
+            + self.degree_weight / (1.0 + math.log1p(degree))
+        )
+
+    def rank(self, subgraph: list, query: str) -> list:
+
+        query_tokens = self.tokenize(query or "")
+
+        unique_edges = dict()
+        for entry in subgraph:
+            edge_key = (entry["source"], entry["relationship"], entry["target"])
+            # The same triple can be reached over several paths, keep its best score
+            edge_score = self.score(entry, query_tokens)
+            if edge_score > unique_edges.get(edge_key, -1.0):
+                unique_edges[edge_key] = edge_score
+
+        return sorted(unique_edges, key=lambda edge_key: unique_edges[edge_key], reverse=True)
+
+    def build(self, subgraph: list, query: str = None) -> dict:
+
+        nodes = dict()
+        groups = dict()
+        used_tokens, kept, dropped = 0, 0, 0
+
+        for source, relationship, target in self.rank(subgraph, query):
+
+            group_key = (source, relationship)
+            new_nodes = [node for node in (source, target) if node not in nodes]
+
+            # A grouped target costs its name and separator, a new group a whole line
+            if group_key in groups:
+                cost = estimate_tokens(f", {target}")
+            else:
+                cost = estimate_tokens(f"{source} {relationship}: {target}\n")
+            cost += sum(estimate_tokens(f"{node}, ") for node in new_nodes)
+
+            if self.token_budget and used_tokens + cost > self.token_budget:
+                dropped += 1
+                continue
+
+            used_tokens += cost
+            kept += 1
+            for node in new_nodes:
+                nodes[node] = None
+            groups.setdefault(group_key, []).append(target)
+
+        edges = [
+            f"{source} {relationship}: {', '.join(targets)}"
+            for (source, relationship), targets in groups.items()
+        ]
+
+        return {
+            "nodes": list(nodes),
+            "edges": edges,
+            "kept_edges": kept,
+            "dropped_edges": dropped,
+            "estimated_tokens": used_tokens
+        }
@@ -0,0 +1,92 @@
+import json
+import time
+import os
+
+
+class StageStats:
+    """Items processed and busy time of one pipeline stage."""
+
+    def __init__(self, name: str):
+
+        self.name = name
+        self.items = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.busy_seconds = 0.0
+
+    def record(self, items: int, seconds: float):
+
+        self.items += items
+        self.batches += 1
+        self.busy_seconds += seconds
+
+    def report(self, wall_seconds: float) -> dict:
+
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "busy_seconds": round(self.busy_seconds, 3),
+            # Throughput against wall time, so concurrent workers add up
+            "items_per_second": round(self.items / wall_seconds, 2) if wall_seconds else 0.0
+        }
+
+
+class IndexingCheckpoint:
+    """Append-only record of the point IDs already upserted by an indexing run.
+
+    The first line identifies the run; a checkpoint written by a different run
+    (another corpus or entity mapping) is ignored.
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self.file = None
+
+    def load(self, run_id: str) -> set:
+
+        if not os.path.exists(self.path):
+            return set()
+
+        done = set()
+        with open(self.path, "r", encoding="utf-8") as f:
+            header = f.readline()
+            if not header or json.loads(header).get("run_id") != run_id:
+                return set()
+
+            for line in f:
+                try:
+                    done.update(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn last line from an interrupted write
+                    break
+
+        return done
+
+    def open(self, run_id: str, resume: bool):
+
+        if resume and os.path.exists(self.path):
+            self.file = open(self.path, "a", encoding="utf-8")
+            return
+
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.file.write(json.dumps({"run_id": run_id, "started_at": time.time()}) + "\n")
+        self.file.flush()
+
+    def append(self, point_ids: list):
+
+        self.file.write(json.dumps(point_ids) + "\n")
+        self.file.flush()
+
+    def close(self):
+
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+
+    def clear(self):
+
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from threading import Lock
+from .metrics import QUERY_CACHE_REQUESTS, QUERY_CACHE_ENTRIES
+
+
+class LRUCache:
+    """Size-bounded in-process LRU map with hit/miss accounting."""
+
+    def __init__(self, name: str, max_size: int = 1024):
+
+        self.name = name
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                QUERY_CACHE_REQUESTS.labels(tier=self.name, result="miss").inc()
+                return default
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            QUERY_CACHE_REQUESTS.labels(tier=self.name, result="hit").inc()
+            return self.entries[key]
+
+    def put(self, key, value):
+
+        if not self.max_size:
+            return
+
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+            QUERY_CACHE_ENTRIES.labels(tier=self.name).set(len(self.entries))
+
+    def clear(self):
+
+        with self.lock:
+            self.entries.clear()
+            QUERY_CACHE_ENTRIES.labels(tier=self.name).set(0)
+
+    def stats(self):
+
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
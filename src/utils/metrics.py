@@ -1,12 +1,69 @@
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
 from fastapi import FastAPI, Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 import time
+import os
+
+# Under several uvicorn workers every process has its own metric values. With
+# PROMETHEUS_MULTIPROC_DIR set (before this module is imported) they are kept in
+# shared files and merged on scrape; gauges declare how worker values combine.
 
 # Define metrics
 REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP Requests', ['method', 'endpoint', 'status'])
 REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP Request Latency', ['method', 'endpoint'])
 
+# Semantic cache lifecycle
+SEMANTIC_CACHE_ENTRIES = Gauge(
+    'semantic_cache_entries', 'Entries currently held in the semantic cache', ['cache'],
+    multiprocess_mode='mostrecent'
+)
+SEMANTIC_CACHE_EVICTIONS = Counter('semantic_cache_evictions_total', 'Semantic cache entries removed', ['cache', 'reason'])
+
+# In-process query caches
+QUERY_CACHE_REQUESTS = Counter('query_cache_requests_total', 'In-process query cache lookups', ['tier', 'result'])
+QUERY_CACHE_ENTRIES = Gauge(
+    'query_cache_entries', 'Entries currently held in an in-process query cache', ['tier'],
+    multiprocess_mode='livesum'
+)
+
+# Embedding batcher
+EMBEDDING_REQUESTS = Counter('embedding_requests_total', 'Embedding API calls', ['provider', 'outcome'])
+EMBEDDING_RETRIES = Counter('embedding_retries_total', 'Embedding API calls retried after an error', ['provider', 'reason'])
+EMBEDDING_TEXTS = Counter('embedding_texts_total', 'Texts embedded', ['provider'])
+EMBEDDING_TOKENS = Counter('embedding_tokens_estimated_total', 'Estimated tokens sent for embedding', ['provider'])
+EMBEDDING_BATCH_SIZE = Gauge(
+    'embedding_batch_size', 'Current adaptive embedding batch size (texts)', ['provider'],
+    multiprocess_mode='liveall'
+)
+EMBEDDING_RATE_LIMIT_WAIT = Counter('embedding_rate_limit_wait_seconds_total', 'Time spent waiting on the client-side rate limit', ['provider'])
+EMBEDDING_REQUEST_LATENCY = Histogram('embedding_request_duration_seconds', 'Embedding API call latency', ['provider'])
+
+# Answer path stages
+STAGE_LATENCY = Histogram(
+    'graph_rag_stage_duration_seconds', 'Latency of a stage of the GraphRAG request path',
+    ['stage', 'provider', 'model'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+ANSWER_CACHE_REQUESTS = Counter('answer_cache_requests_total', 'Answer cache lookups on the answer path', ['tier', 'result'])
+SUBGRAPH_SIZE = Histogram(
+    'graph_rag_subgraph_size', 'Size of the subgraph fetched for a query', ['kind'],
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+)
+PROMPT_SIZE = Histogram(
+    'graph_rag_prompt_size', 'Size of the assembled generation prompt', ['unit'],
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000)
+)
+ENTITY_FAST_PATH_REQUESTS = Counter('entity_fast_path_requests_total', 'Seed entity source used for graph expansion', ['path'])
+
+# LLM token usage and cost
+LLM_CALLS = Counter('llm_calls_total', 'LLM API calls that returned a response', ['provider', 'model', 'endpoint'])
+LLM_TOKENS = Counter(
+    'llm_tokens_total', 'LLM tokens consumed, as reported by the provider or estimated when absent',
+    ['provider', 'model', 'endpoint', 'direction', 'source']
+)
+LLM_COST = Counter('llm_cost_usd_total', 'Estimated LLM spend in USD from LLM_TOKEN_PRICES', ['provider', 'model', 'endpoint'])
+
 class PrometheusMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
 
@@ -23,10 +80,28 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
         return response
 
 
+def get_metrics_registry():
+
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+
+    # Aggregates the files written by every worker, whichever one serves the scrape
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+
+    return registry
+
+
+def mark_metrics_process_dead():
+    # Drops the live gauges of this worker so a restarted worker does not double count
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
+
+
 def setup_metrics(app: FastAPI):
 
     app.add_middleware(PrometheusMiddleware)
 
     @app.get("/TrhBVe_m5gg2002_E5VVqS", include_in_schema=False)
     def metrics():
-        return Response(generate_latest(),media_type=CONTENT_TYPE_LATEST)
\ No newline at end of file
+        return Response(generate_latest(get_metrics_registry()),media_type=CONTENT_TYPE_LATEST)
\ No newline at end of file
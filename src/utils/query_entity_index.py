@@ -0,0 +1,153 @@
+from collections import defaultdict
+from difflib import SequenceMatcher
+from .entity_matcher import EntityMatcher
+from .text_normalization import PUNCTUATION
+import re
+
+TOKEN = re.compile(r"\S+")
+
+
+class QueryEntityIndex:
+    """In-memory index of entity names for spotting entities named in a query.
+
+    Exact occurrences come from the Aho-Corasick `EntityMatcher` and are kept
+    when they cover most of the query tokens they fall in, so a prefixed
+    "بالسكري" still matches "السكري" while short names inside longer words
+    do not. Query n-grams left uncovered are then matched fuzzily: entity
+    names sharing character trigrams are shortlisted and confirmed with a
+    similarity ratio.
+    """
+
+    def __init__(self, entities: dict, normalize_arabic: bool = True, fuzzy_threshold: float = 0.88,
+                 min_coverage: float = 0.6, min_fuzzy_chars: int = 4, max_ngram: int = 3,
+                 max_candidates: int = 20):
+
+        self.matcher = EntityMatcher(entities, normalize_arabic=normalize_arabic)
+        self.fuzzy_threshold = fuzzy_threshold
+        self.min_coverage = min_coverage
+        self.min_fuzzy_chars = min_fuzzy_chars
+        self.max_ngram = max_ngram
+        self.max_candidates = max_candidates
+
+        # Prepared name -> [(entity name, value), ...], plus a trigram inverted index over names
+        self.names = []
+        self.entries = []
+        self.trigrams = defaultdict(list)
+        name_ids = dict()
+
+        for name, value in entities.items():
+            prepared = self.prepare(name)
+            if not prepared:
+                continue
+
+            if prepared not in name_ids:
+                name_ids[prepared] = len(self.names)
+                self.names.append(prepared)
+                self.entries.append([])
+                for trigram in self.get_trigrams(prepared):
+                    self.trigrams[trigram].append(name_ids[prepared])
+
+            self.entries[name_ids[prepared]].append((name, value))
+
+    def __len__(self):
+        return len(self.names)
+
+    def prepare(self, text: str) -> str:
+        return self.matcher.prepare(text)
+
+    @staticmethod
+    def get_trigrams(text: str) -> set:
+        return {text[idx: idx + 3] for idx in range(len(text) - 2)}
+
+    def find_exact(self, prepared_query: str, tokens: list) -> list:
+
+        accepted = []
+
+        # Longest first so names nested in an accepted match are dropped
+        matches = sorted(self.matcher.find_all(prepared_query), key=lambda match: match[0] - match[1])
+        for start, end, name, value in matches:
+
+            # Names sharing the exact span (several entities, same name) are all kept
+            if any(start >= other[0] and end <= other[1] and (start, end) != other[:2] for other in accepted):
+                continue
+
+            covered = [idx for idx, (token_start, token_end) in enumerate(tokens)
+                       if token_start < end and token_end > start]
+            if not covered:
+                continue
+
+            span = tokens[covered[-1]][1] - tokens[covered[0]][0]
+            if (end - start) / span < self.min_coverage:
+                continue
+
+            accepted.append((start, end, name, value, 1.0, covered))
+
+        return accepted
+
+    def find_fuzzy(self, prepared_query: str, tokens: list, covered: set) -> list:
+
+        accepted = []
+        words = [PUNCTUATION.sub("", prepared_query[start:end]) for start, end in tokens]
+
+        for size in range(self.max_ngram, 0, -1):
+            for first in range(len(tokens) - size + 1):
+
+                span = range(first, first + size)
+                if any(idx in covered or not words[idx] for idx in span):
+                    continue
+
+                ngram = " ".join(words[idx] for idx in span)
+                if len(ngram) < self.min_fuzzy_chars:
+                    continue
+
+                match = self.best_fuzzy_match(ngram)
+                if match is None:
+                    continue
+
+                name_id, ratio = match
+                for name, value in self.entries[name_id]:
+                    accepted.append((tokens[first][0], tokens[first + size - 1][1], name, value, ratio, list(span)))
+                covered.update(span)
+
+        return accepted
+
+    def best_fuzzy_match(self, ngram: str):
+
+        shared = defaultdict(int)
+        for trigram in self.get_trigrams(ngram):
+            for name_id in self.trigrams.get(trigram, ()):
+                shared[name_id] += 1
+
+        candidates = sorted(shared, key=shared.get, reverse=True)[:self.max_candidates]
+
+        best = None
+        for name_id in candidates:
+            ratio = SequenceMatcher(None, ngram, self.names[name_id]).ratio()
+            if ratio >= self.fuzzy_threshold and (best is None or ratio > best[1]):
+                best = (name_id, ratio)
+
+        return best
+
+    def match(self, query: str) -> list:
+        """`(name, value, score)` for entities named in `query`, in query order; exact matches score 1.0."""
+        prepared_query = self.prepare(query)
+        if not prepared_query:
+            return []
+
+        tokens = [token.span() for token in TOKEN.finditer(prepared_query)]
+
+        matches = self.find_exact(prepared_query, tokens)
+        covered = {idx for match in matches for idx in match[5]}
+        matches += self.find_fuzzy(prepared_query, tokens, covered)
+
+        return [(name, value, score) for _, _, name, value, score, _ in sorted(matches, key=lambda match: match[0])]
+
+    def match_values(self, query: str) -> list:
+        """Distinct values of the entities named in `query`, in query order."""
+        seen = dict()
+
+        for _, value, _ in self.match(query):
+            if value not in seen:
+                seen[value] = None
+
+        return list(seen.keys())
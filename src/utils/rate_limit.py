@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `rate_per_minute`.
+
+    Waiters are served in arrival order; a request larger than the bucket is
+    clamped to its capacity so it can still go through.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self):
+
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens, sleeping until they are available; returns the wait in seconds."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+
+        async with self.lock:
+            self.refill()
+            while self.tokens < amount:
+                delay = (amount - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self.refill()
+
+            self.tokens -= amount
+
+        return waited
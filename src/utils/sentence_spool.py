@@ -0,0 +1,50 @@
+import os
+
+
+class SentenceSpool:
+    """File-backed, re-iterable sequence of sentences.
+
+    Filled once from a streaming source (`tee` / `write`) and then read as many
+    times as needed, one line at a time. The spool file only appears once it
+    has been written completely.
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self.count = 0
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def tee(self, sentences):
+        """Yield `sentences` unchanged while writing them to the spool."""
+        tmp_path = f"{self.path}.tmp"
+        self.count = 0
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for sentence in sentences:
+                # One sentence per line, so embedded newlines are flattened
+                f.write(sentence.replace("\n", " ") + "\n")
+                self.count += 1
+                yield sentence
+
+        os.replace(tmp_path, self.path)
+
+    def write(self, sentences):
+
+        for _ in self.tee(sentences):
+            pass
+
+        return self
+
+    def __iter__(self):
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if line:
+                    yield line
+
+    def __len__(self):
+        return self.count
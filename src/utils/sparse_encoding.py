@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import asyncio
+
+# One model per worker process, loaded by the pool initializer
+_sparse_model = None
+
+
+def _load_sparse_model(model_name: str):
+    global _sparse_model
+    from fastembed import SparseTextEmbedding
+    _sparse_model = SparseTextEmbedding(model_name=model_name)
+
+
+def _encode_batch(texts: list):
+    return [
+        {"indices": embedding.indices.tolist(), "values": embedding.values.tolist()}
+        for embedding in _sparse_model.embed(texts)
+    ]
+
+
+class SparseEncoderPool:
+    """Encode documents into sparse BM25 vectors in worker processes.
+
+    Produces the same vectors qdrant-client computes inline for
+    `models.Document(model=...)`, without holding the event loop's process
+    on CPU-bound tokenization.
+    """
+
+    def __init__(self, model_name: str = "Qdrant/bm25", workers: int = 2):
+
+        self.model_name = model_name
+        self.workers = workers
+        self.executor = None
+
+    def start(self):
+
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_load_sparse_model,
+                initargs=(self.model_name,)
+            )
+
+    def close(self):
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        self.executor = None
+
+    async def encode(self, texts: list):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _encode_batch, list(texts))
@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .metrics import STAGE_LATENCY
+from .tracing import get_tracer
+import time
+
+tracer = get_tracer(__name__)
+
+current_stage_timings: ContextVar = ContextVar("stage_timings", default=None)
+
+
+class StageTimings:
+    """Per-request collector of stage durations.
+
+    Activated for the current request context with `start_stage_timings()`;
+    `stage_timer` records into it when one is active, so providers deep in
+    the call stack report without it being passed down.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages = dict()
+
+    def record(self, stage: str, seconds: float):
+        # Repeated stages (retries, several searches) accumulate
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def as_dict(self) -> dict:
+
+        timings = {stage: round(seconds * 1000, 2) for stage, seconds in self.stages.items()}
+        timings["total"] = round((time.perf_counter() - self.started_at) * 1000, 2)
+
+        return timings
+
+
+def start_stage_timings() -> StageTimings:
+
+    stage_timings = StageTimings()
+    current_stage_timings.set(stage_timings)
+
+    return stage_timings
+
+
+def get_stage_timings():
+    return current_stage_timings.get()
+
+
+def record_stage(stage: str, seconds: float, provider: str = None, model: str = None):
+
+    STAGE_LATENCY.labels(stage=stage, provider=provider or "", model=model or "").observe(seconds)
+
+    stage_timings = current_stage_timings.get()
+    if stage_timings is not None:
+        stage_timings.record(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str, provider: str = None, model: str = None):
+    """Time the enclosed block into the stage histogram and the active collector.
+
+    The block also runs inside a `graph_rag.<stage>` span, which is yielded
+    so callers can attach attributes.
+    """
+    attributes = {"graph_rag.provider": provider or "", "graph_rag.model": model or ""}
+
+    with tracer.start_as_current_span(f"graph_rag.{stage}", attributes=attributes) as span:
+        started_at = time.perf_counter()
+        try:
+            yield span
+        finally:
+            record_stage(stage, time.perf_counter() - started_at, provider, model)
@@ -0,0 +1,49 @@
+import re
+import unicodedata
+
+# Harakat, tanween, shadda, sukun, superscript alef and Quranic marks
+ARABIC_DIACRITICS = re.compile(r"[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED]")
+ARABIC_TATWEEL = "\u0640"
+
+ARABIC_CHAR_MAP = str.maketrans({
+    "\u0622": "\u0627",  # آ -> ا
+    "\u0623": "\u0627",  # أ -> ا
+    "\u0625": "\u0627",  # إ -> ا
+    "\u0671": "\u0627",  # ٱ -> ا
+    "\u0649": "\u064A",  # ى -> ي
+    "\u0629": "\u0647",  # ة -> ه
+})
+
+WHITESPACE = re.compile(r"\s+")
+PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_arabic(text: str) -> str:
+
+    text = ARABIC_DIACRITICS.sub("", text)
+    text = text.replace(ARABIC_TATWEEL, "")
+
+    return text.translate(ARABIC_CHAR_MAP)
+
+
+def normalize_text(text: str, arabic: bool = True) -> str:
+    """Case-fold, unify unicode forms and collapse whitespace.
+
+    With `arabic=True`, diacritics and tatweel are dropped and the
+    alef / ya / ta-marbuta variants are folded to a single letter.
+    """
+    if not text:
+        return ""
+
+    text = unicodedata.normalize("NFKC", text).casefold()
+
+    if arabic:
+        text = normalize_arabic(text)
+
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def normalize_query(text: str) -> str:
+    """Normalize a user query for exact-match lookups (punctuation insensitive)."""
+    text = normalize_text(text)
+    return WHITESPACE.sub(" ", PUNCTUATION.sub(" ", text)).strip()
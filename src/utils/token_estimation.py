@@ -0,0 +1,13 @@
+import math
+
+# Conservative average for mixed Arabic/English text; Arabic tokenizes denser
+# than English, so this over-estimates rather than under-estimates.
+CHARS_PER_TOKEN = 3
+
+
+def estimate_tokens(text: str) -> int:
+
+    if not text:
+        return 0
+
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -0,0 +1,99 @@
+from contextvars import ContextVar
+from opentelemetry import trace
+from .metrics import LLM_TOKENS, LLM_CALLS, LLM_COST
+from .token_estimation import estimate_tokens
+
+current_token_usage: ContextVar = ContextVar("token_usage", default=None)
+
+
+class TokenUsage:
+    """Per-request token and cost totals, grouped by provider/model/endpoint."""
+
+    def __init__(self):
+        self.entries = dict()
+
+    def record(self, provider: str, model: str, endpoint: str, input_tokens: int, output_tokens: int,
+               estimated: bool, cost: float = None):
+
+        entry = self.entries.setdefault((provider, model, endpoint), {
+            "provider": provider,
+            "model": model,
+            "endpoint": endpoint,
+            "calls": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "estimated": False,
+            "cost_usd": None
+        })
+
+        entry["calls"] += 1
+        entry["input_tokens"] += input_tokens
+        entry["output_tokens"] += output_tokens
+        entry["estimated"] = entry["estimated"] or estimated
+        if cost is not None:
+            entry["cost_usd"] = (entry["cost_usd"] or 0.0) + cost
+
+    def as_dict(self) -> dict:
+
+        entries = list(self.entries.values())
+        costs = [entry["cost_usd"] for entry in entries if entry["cost_usd"] is not None]
+
+        return {
+            "input_tokens": sum(entry["input_tokens"] for entry in entries),
+            "output_tokens": sum(entry["output_tokens"] for entry in entries),
+            "cost_usd": round(sum(costs), 6) if costs else None,
+            "calls": entries
+        }
+
+
+def start_token_usage() -> TokenUsage:
+
+    token_usage = TokenUsage()
+    current_token_usage.set(token_usage)
+
+    return token_usage
+
+
+def get_token_usage():
+    return current_token_usage.get()
+
+
+def estimate_cost(token_prices: dict, model: str, input_tokens: int, output_tokens: int):
+    """Cost in USD from `{model: {"input": usd_per_1m, "output": usd_per_1m}}`, None if unpriced."""
+    prices = (token_prices or {}).get(model)
+    if not prices:
+        return None
+
+    return (input_tokens * prices.get("input", 0.0) + output_tokens * prices.get("output", 0.0)) / 1_000_000
+
+
+def record_token_usage(provider: str, model: str, endpoint: str, input_tokens: int = None,
+                       output_tokens: int = None, input_text: str = None, output_text: str = None,
+                       token_prices: dict = None):
+    """Account one LLM call; counts the provider did not report are estimated from the texts.
+
+    Attributes are set on the current span, so call it inside the call's span.
+    """
+    estimated = input_tokens is None or output_tokens is None
+    input_tokens = int(input_tokens) if input_tokens is not None else estimate_tokens(input_text)
+    output_tokens = int(output_tokens) if output_tokens is not None else estimate_tokens(output_text)
+    model = model or ""
+
+    cost = estimate_cost(token_prices, model, input_tokens, output_tokens)
+    source = "estimated" if estimated else "reported"
+
+    LLM_CALLS.labels(provider=provider, model=model, endpoint=endpoint).inc()
+    LLM_TOKENS.labels(provider=provider, model=model, endpoint=endpoint, direction="input", source=source).inc(input_tokens)
+    LLM_TOKENS.labels(provider=provider, model=model, endpoint=endpoint, direction="output", source=source).inc(output_tokens)
+    if cost is not None:
+        LLM_COST.labels(provider=provider, model=model, endpoint=endpoint).inc(cost)
+
+    trace.get_current_span().set_attributes({
+        "gen_ai.usage.input_tokens": input_tokens,
+        "gen_ai.usage.output_tokens": output_tokens,
+        "gen_ai.usage.estimated": estimated
+    })
+
+    token_usage = current_token_usage.get()
+    if token_usage is not None:
+        token_usage.record(provider, model, endpoint, input_tokens, output_tokens, estimated, cost)
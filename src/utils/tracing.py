@@ -0,0 +1,89 @@
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from enum import Enum
+import threading
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class TracingExporterEnums(Enum):
+    OTLP = "otlp"
+    FILE = "file"
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """Appends finished spans to a JSON-lines file, one span per line."""
+
+    def __init__(self, path: str):
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans) -> SpanExportResult:
+
+        try:
+            with self.lock:
+                for span in spans:
+                    self.file.write(span.to_json(indent=None) + "\n")
+                self.file.flush()
+        except (OSError, ValueError) as e:
+            logger.error(f"Error while writing spans to {self.path}: {e}")
+            return SpanExportResult.FAILURE
+
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+def get_tracer(name: str):
+    # Proxy tracer: spans are no-ops until `setup_tracing` installs a provider
+    return trace.get_tracer(name)
+
+
+def setup_tracing(settings):
+    """Install the global tracer provider described by the TRACING_* settings.
+
+    Returns the provider so it can be flushed on shutdown, or None when
+    tracing is disabled.
+    """
+    if not settings.TRACING_ENABLED:
+        return None
+
+    if settings.TRACING_EXPORTER == TracingExporterEnums.OTLP.value:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    elif settings.TRACING_EXPORTER == TracingExporterEnums.FILE.value:
+        exporter = JsonFileSpanExporter(settings.TRACING_FILE_PATH)
+    else:
+        logger.error(f"Unknown tracing exporter '{settings.TRACING_EXPORTER}', tracing disabled")
+        return None
+
+    # Root spans are sampled at the configured ratio, children follow their parent
+    tracer_provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO))
+    )
+    tracer_provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(tracer_provider)
+
+    return tracer_provider
+
+
+def shutdown_tracing(tracer_provider):
+
+    if tracer_provider is not None:
+        tracer_provider.shutdown()
@@ -0,0 +1,12 @@
+import math
+
+
+def truncate_vector(vector, dimension: int) -> list:
+    """Matryoshka prefix of `vector`, renormalized to unit length."""
+    prefix = [float(value) for value in vector[:dimension]]
+    norm = math.sqrt(sum(value * value for value in prefix))
+
+    if not norm:
+        return prefix
+
+    return [value / norm for value in prefix]